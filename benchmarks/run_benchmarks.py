@@ -0,0 +1,252 @@
+"""Throughput benchmarks for obj_det_metrics on seeded synthetic data.
+
+Run benchmarks and save results as JSON:
+    python benchmarks/run_benchmarks.py run --n-images 2000 --output results.json
+
+Compare two runs, exiting with status 1 if any benchmark got slower by more than the tolerance:
+    python benchmarks/run_benchmarks.py compare baseline.json results.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from obj_det_metrics import __version__
+from obj_det_metrics.ap_map import _voc_ap_array, compute_ap_map
+from obj_det_metrics.ingest import (
+    generate_dt_dict_list_from_txts,
+    generate_gt_dict_list_from_txts,
+)
+from obj_det_metrics.synthetic import (
+    SCORE_DISTRIBUTIONS,
+    generate_synthetic_dict_lists,
+    write_dict_lists_to_txts,
+)
+from obj_det_metrics.utils import (
+    _compute_iou,
+    _generate_dt_objs,
+    _generate_gt_objs,
+    _get_best_gt_bbox,
+)
+from obj_det_metrics.variables import COCO_IOU_THRESHOLDS, BoundingBox
+
+
+def measure(name: str, fn: Callable[[], Any], n_boxes: int, repeat: int) -> Dict[str, Any]:
+    """Time a benchmark function, keeping the best of `repeat` runs, then run it once more under tracemalloc to
+    record its peak traced memory
+
+    Args:
+        name (str): Name of benchmark
+        fn (Callable[[], Any]): Function to benchmark
+        n_boxes (int): Number of boxes processed by one call of `fn`, to compute throughput
+        repeat (int): Number of timed runs
+
+    Returns:
+        Dict[str, Any]: Benchmark result
+    """
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        wall_times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    wall_time = min(wall_times)
+    result = {
+        "name": name,
+        "wall_time_s": wall_time,
+        "n_boxes": n_boxes,
+        "boxes_per_s": n_boxes / wall_time if wall_time > 0 else float("inf"),
+        "peak_memory_bytes": peak_memory,
+        "peak_memory_bytes_per_box": peak_memory / n_boxes if n_boxes > 0 else 0.0,
+    }
+    print(f"{name:<44} {wall_time:>10.4f}s {result['boxes_per_s']:>14,.0f} boxes/s {peak_memory / 2**20:>10.1f} MiB")
+    return result
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate a synthetic dataset and run all benchmarks on it
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+
+    Returns:
+        Dict[str, Any]: Metadata and results of all benchmarks
+    """
+    params = {
+        "n_images": args.n_images,
+        "boxes_per_image": args.boxes_per_image,
+        "n_classes": args.n_classes,
+        "score_distribution": args.score_distribution,
+        "jitter": args.jitter,
+        "seed": args.seed,
+    }
+    ground_truth_dict_list, detections_dict_list = generate_synthetic_dict_lists(**params)
+    n_gt = sum(len(gt_dict["class_labels"]) for gt_dict in ground_truth_dict_list)
+    n_dt = sum(len(dt_dict["class_labels"]) for dt_dict in detections_dict_list)
+    print(f"Synthetic dataset: {args.n_images} images, {n_gt} ground truths, {n_dt} detections")
+
+    results: List[Dict[str, Any]] = []
+    n_boxes = n_gt + n_dt
+    for engine in ("python", "numpy"):
+        results.append(
+            measure(
+                f"compute_ap_map[{engine}]",
+                lambda: compute_ap_map(ground_truth_dict_list, detections_dict_list, engine=engine),
+                n_boxes,
+                args.repeat,
+            )
+        )
+    results.append(
+        measure(
+            "compute_ap_map[coco_thresholds]",
+            lambda: compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS),
+            n_boxes,
+            args.repeat,
+        )
+    )
+
+    rng = np.random.default_rng(args.seed)
+    n_points = max(n_dt, 1)
+    rec = np.sort(rng.random(n_points))
+    prec = rng.random(n_points)
+    results.append(measure("_voc_ap_array", lambda: _voc_ap_array(rec, prec), n_points, args.repeat))
+
+    dt_coordinates = [coords for dt_dict in detections_dict_list for coords in dt_dict["coordinates"]]
+    gt_coordinates = [coords for gt_dict in ground_truth_dict_list for coords in gt_dict["coordinates"]]
+    pairs = list(zip(dt_coordinates, gt_coordinates * (len(dt_coordinates) // max(len(gt_coordinates), 1) + 1)))
+    results.append(measure("_compute_iou", lambda: [_compute_iou(dt, gt) for dt, gt in pairs], len(pairs), args.repeat))
+
+    all_coordinates = gt_coordinates + dt_coordinates
+    results.append(
+        measure(
+            "BoundingBox",
+            lambda: [BoundingBox(coords, class_name="class", file_id="image") for coords in all_coordinates],
+            len(all_coordinates),
+            args.repeat,
+        )
+    )
+    gt_count_per_class, gt_bboxes_dict = _generate_gt_objs(ground_truth_dict_list, detections_dict_list)
+    gt_file_ids = set(gt_dict["file_id"] for gt_dict in ground_truth_dict_list)
+    dt_bboxes_dict = _generate_dt_objs(sorted(gt_count_per_class.keys()), detections_dict_list, gt_file_ids)
+    dt_bboxes = [dt_bbox for class_dt_bboxes in dt_bboxes_dict.values() for dt_bbox in class_dt_bboxes]
+    results.append(
+        measure(
+            "_get_best_gt_bbox",
+            lambda: [_get_best_gt_bbox(dt_bbox, dt_bbox.class_name, gt_bboxes_dict) for dt_bbox in dt_bboxes],
+            len(dt_bboxes),
+            args.repeat,
+        )
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gt_txt_dir, dt_txt_dir = f"{tmp_dir}/ground_truths", f"{tmp_dir}/detections"
+        write_dict_lists_to_txts(ground_truth_dict_list, detections_dict_list, gt_txt_dir, dt_txt_dir)
+        for suffix, n_threads in (("", None), ("[threaded]", args.n_threads)):
+            results.append(
+                measure(
+                    f"generate_gt_dict_list_from_txts{suffix}",
+                    lambda: generate_gt_dict_list_from_txts(gt_txt_dir, n_threads=n_threads),
+                    n_gt,
+                    args.repeat,
+                )
+            )
+            results.append(
+                measure(
+                    f"generate_dt_dict_list_from_txts{suffix}",
+                    lambda: generate_dt_dict_list_from_txts(dt_txt_dir, n_threads=n_threads),
+                    n_dt,
+                    args.repeat,
+                )
+            )
+
+    return {
+        "metadata": {
+            "obj_det_metrics": __version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "params": params,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare the wall times of two benchmark runs
+
+    Args:
+        baseline (Dict[str, Any]): Results of baseline run
+        current (Dict[str, Any]): Results of current run
+        tolerance (float): Relative slowdown above which a benchmark is flagged as a regression
+
+    Returns:
+        List[str]: Names of benchmarks that regressed
+    """
+    if baseline["metadata"]["params"] != current["metadata"]["params"]:
+        print("Warning: runs were made with different dataset parameters")
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"{'benchmark':<44} {'baseline':>10} {'current':>10} {'ratio':>8}")
+    for result in current["results"]:
+        if result["name"] not in baseline_results:
+            continue
+        baseline_time = baseline_results[result["name"]]["wall_time_s"]
+        ratio = result["wall_time_s"] / baseline_time if baseline_time > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(result["name"])
+            flag = "  REGRESSION"
+        print(f"{result['name']:<44} {baseline_time:>9.4f}s {result['wall_time_s']:>9.4f}s {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("--n-images", type=int, default=1000)
+    run_parser.add_argument("--boxes-per-image", type=float, default=10.0)
+    run_parser.add_argument("--n-classes", type=int, default=20)
+    run_parser.add_argument("--score-distribution", choices=SCORE_DISTRIBUTIONS, default="beta")
+    run_parser.add_argument("--jitter", type=float, default=0.1)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--n-threads", type=int, default=8)
+    run_parser.add_argument("--output", help="path of JSON file to write results to")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        output = run_benchmarks(args)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(output, f, indent=2)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare_results(baseline, current, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) found")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
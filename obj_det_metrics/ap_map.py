@@ -1,15 +1,22 @@
 # Adapted from https://github.com/Cartucho/mAP
 
 from collections import defaultdict
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-import pipe
+import numpy as np
 
+from obj_det_metrics.columnar import ColumnarDataset, ColumnarDetections
+from obj_det_metrics.ground_truth_index import GroundTruthIndex
+from obj_det_metrics.parallel import _match_detections_parallel
+from obj_det_metrics.profiling import PipelineStats, _profile_stage
+from obj_det_metrics.spatial_index import _build_gt_index
 from obj_det_metrics.utils import (
-    _compute_counts_cumsum,
     _generate_dt_objs,
     _generate_gt_objs,
     _get_best_gt_bbox,
+    _match_detections,
+    _match_detections_per_area_range,
+    _select_detections,
 )
 from obj_det_metrics.variables import (
     ClassName,
@@ -19,115 +26,889 @@ from obj_det_metrics.variables import (
 )
 
 
-def _voc_ap(rec: List[float], prec: List[float]) -> Tuple[float, List[float], List[float]]:
-    """Calculate the AP given the recall and precision array
-    1st) We compute a version of the measured precision/recall curve with
-        precision monotonically decreasing
-    2nd) We compute the AP as the area under this curve by numerical integration.
-
-    --- Official matlab code VOC2012---
-    mrec=[0 ; rec ; 1];
-    mpre=[0 ; prec ; 0];
-    for i=numel(mpre)-1:-1:1
-            mpre(i)=max(mpre(i),mpre(i+1));
-    end
-    i=find(mrec(2:end)~=mrec(1:end-1))+1;
-    ap=sum((mrec(i)-mrec(i-1)).*mpre(i));
+def _voc_ap_array(rec: np.ndarray, prec: np.ndarray) -> Tuple[float, np.ndarray, np.ndarray]:
+    """Calculate the AP given the recall and precision arrays, following the official VOC2012 matlab code without Python
+    loops: the precision envelope is a running maximum over the reversed precision values, and the area is summed over
+    the masked recall differences.
+    The inputs are not modified, and the padded curves are written once into newly allocated arrays, which are
+    returned without further copies.
 
     Args:
-        rec (List[float]): List of recall values for all detections
-        prec (List[float]): List of precision values for all detections
+        rec (np.ndarray): Array of recall values for all detections, sorted by descending confidence score
+        prec (np.ndarray): Array of precision values for all detections, sorted by descending confidence score
 
     Returns:
-        Tuple[float, List[float], List[float]]: Contains AP, approximated recall values
-            and approximated precision values
+        Tuple[float, np.ndarray, np.ndarray]: Contains AP, interpolated recall values and interpolated precision values,
+            padded with 0.0 and 1.0 recall, and 0.0 precision at both ends
     """
-    rec.insert(0, 0.0)  # insert 0.0 at begining of list
-    rec.append(1.0)  # insert 1.0 at end of list
-    mrec = rec[:]
-    prec.insert(0, 0.0)  # insert 0.0 at begining of list
-    prec.append(0.0)  # insert 0.0 at end of list
-    mpre = prec[:]
-    #  This part makes the precision monotonically decreasing
-    #     (goes from the end to the beginning)
+    n_points = len(rec)
+    mrec = np.empty(n_points + 2)
+    mrec[0] = 0.0
+    mrec[1:-1] = rec
+    mrec[-1] = 1.0
+    # fill the precision values back to front, so that the running maximum is an in-place forward accumulation,
     #     matlab: for i=numel(mpre)-1:-1:1
     #                 mpre(i)=max(mpre(i),mpre(i+1));
+    reversed_mpre = np.empty(n_points + 2)
+    reversed_mpre[0] = 0.0
+    reversed_mpre[1:-1] = prec[::-1]
+    reversed_mpre[-1] = 0.0
+    np.maximum.accumulate(reversed_mpre, out=reversed_mpre)
+    mpre = reversed_mpre[::-1]
 
-    # matlab indexes start in 1 but python in 0, so I have to do:
-    #     range(start=(len(mpre) - 2), end=0, step=-1)
-    # also the python function range excludes the end, resulting in:
-    #     range(start=(len(mpre) - 2), end=-1, step=-1)
-    for i in range(len(mpre) - 2, -1, -1):
-        mpre[i] = max(mpre[i], mpre[i + 1])
-
-    #  where() pipe compoment creates a generator of indexes where the recall changes
     #     matlab: i=find(mrec(2:end)~=mrec(1:end-1))+1;
-    #  The Average Precision (AP) is the area under the curve
-    #     (numerical integration)
-    #     matlab: ap=sum((mrec(i)-mrec(i-1)).*mpre(i));
-    ap_slices = (
-        range(1, len(mrec))
-        | pipe.where(lambda i: mrec[i] != mrec[i - 1])
-        | pipe.select(lambda i: (mrec[i] - mrec[i - 1]) * mpre[i])
-    )
-    ap = sum(ap_slices)
+    #             ap=sum((mrec(i)-mrec(i-1)).*mpre(i));
+    rec_diffs = np.diff(mrec)
+    changed = rec_diffs != 0.0
+    ap_slices = rec_diffs[changed] * mpre[1:][changed]
+    # cumsum adds up the slices sequentially, in the same order as a Python loop over the slices
+    ap = float(np.cumsum(ap_slices)[-1]) if len(ap_slices) else 0.0
     return ap, mrec, mpre
 
 
+def _compute_sampled_ap(rec: np.ndarray, prec: np.ndarray, recall_thresholds: np.ndarray) -> float:
+    """Helper function to compute AP as the mean interpolated precision at fixed recall thresholds, where the
+    interpolated precision at a recall threshold is the highest precision at any recall at least as high, or 0 if the
+    threshold is never reached
+
+    Args:
+        rec (np.ndarray): Array of recall values for all detections, sorted by descending confidence score
+        prec (np.ndarray): Array of precision values for all detections, sorted by descending confidence score
+        recall_thresholds (np.ndarray): Recall thresholds to sample interpolated precision at
+
+    Returns:
+        float: AP
+    """
+    # running maximum over the reversed precision values, with a trailing 0 for unreached thresholds
+    envelope = np.zeros(len(prec) + 1)
+    envelope[:-1] = np.maximum.accumulate(prec[::-1])[::-1]
+    return float(np.mean(envelope[np.searchsorted(rec, recall_thresholds, side="left")]))
+
+
+def _compute_voc2012_ap(rec: np.ndarray, prec: np.ndarray) -> float:
+    """Helper function to compute AP by VOC2012 all-point interpolation
+
+    Args:
+        rec (np.ndarray): Array of recall values for all detections, sorted by descending confidence score
+        prec (np.ndarray): Array of precision values for all detections, sorted by descending confidence score
+
+    Returns:
+        float: AP
+    """
+    ap, _, _ = _voc_ap_array(rec, prec)
+    return ap
+
+
+def _compute_coco101_ap(rec: np.ndarray, prec: np.ndarray) -> float:
+    """Helper function to compute AP by COCO 101-point interpolation, at recall thresholds 0, 0.01, ..., 1
+
+    Args:
+        rec (np.ndarray): Array of recall values for all detections, sorted by descending confidence score
+        prec (np.ndarray): Array of precision values for all detections, sorted by descending confidence score
+
+    Returns:
+        float: AP
+    """
+    return _compute_sampled_ap(rec, prec, _COCO101_RECALL_THRESHOLDS)
+
+
+def _compute_voc07_ap(rec: np.ndarray, prec: np.ndarray) -> float:
+    """Helper function to compute AP by VOC2007 11-point interpolation, at recall thresholds 0, 0.1, ..., 1
+
+    Args:
+        rec (np.ndarray): Array of recall values for all detections, sorted by descending confidence score
+        prec (np.ndarray): Array of precision values for all detections, sorted by descending confidence score
+
+    Returns:
+        float: AP
+    """
+    return _compute_sampled_ap(rec, prec, _VOC07_RECALL_THRESHOLDS)
+
+
+# recall thresholds as generated by the official COCO and VOC2007 evaluation code
+_COCO101_RECALL_THRESHOLDS = np.linspace(0.0, 1.00, int(np.round((1.00 - 0.0) / 0.01)) + 1)
+_VOC07_RECALL_THRESHOLDS = np.arange(0.0, 1.1, 0.1)
+
+# functions computing AP of a class from its recall and precision values, for each interpolation mode
+_AP_INTEGRATORS: Dict[str, Callable[[np.ndarray, np.ndarray], float]] = {
+    "voc2012": _compute_voc2012_ap,
+    "coco101": _compute_coco101_ap,
+    "voc07": _compute_voc07_ap,
+}
+
+
+def _compute_pr_curve(tp: np.ndarray, gt_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Helper function to compute the recall and precision values of a single class after each detection, from the
+    true positive flags of its detections
+
+    Args:
+        tp (np.ndarray): Array flagging true positive detections, sorted by descending confidence score
+        gt_count (int): Number of ground truth bounding boxes of the class
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Contains recall values and precision values
+    """
+    tp_cumsum = np.cumsum(tp, dtype=np.int64)
+    rec = tp_cumsum / gt_count
+    prec = tp_cumsum / np.arange(1, len(tp_cumsum) + 1)
+    return rec, prec
+
+
+def _compute_operating_points(scores: np.ndarray, rec: np.ndarray, prec: np.ndarray) -> Dict[str, Any]:
+    """Helper function to compute the precision, recall and F1 score of a single class at each confidence score
+    threshold, i.e. when only detections scoring at least the threshold are kept. Detections with equal scores are
+    kept or dropped together, so each threshold is a distinct score and its values are those after the last of them.
+
+    Args:
+        scores (np.ndarray): Array of confidence scores of the detections of the class, sorted in descending order
+        rec (np.ndarray): Array of recall values after each detection
+        prec (np.ndarray): Array of precision values after each detection
+
+    Returns:
+        Dict[str, Any]: Dict containing arrays of "score_thresholds" (in descending order), "precision", "recall"
+            and "f1" of each operating point, plus the highest threshold with the best F1 score under
+            "best_threshold" (None if the class has no detections) and that F1 score under "best_f1"
+    """
+    last_idxs = np.flatnonzero(np.append(scores[1:] != scores[:-1], True)) if len(scores) else np.array([], int)
+    precision, recall = prec[last_idxs], rec[last_idxs]
+    sum_pr = precision + recall
+    f1 = np.divide(2 * precision * recall, sum_pr, out=np.zeros_like(sum_pr), where=sum_pr > 0)
+    best_idx = int(f1.argmax()) if len(f1) else None
+    return {
+        "score_thresholds": scores[last_idxs],
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "best_threshold": None if best_idx is None else float(scores[last_idxs[best_idx]]),
+        "best_f1": 0.0 if best_idx is None else float(f1[best_idx]),
+    }
+
+
+def _compute_outputs_dicts_per_interpolation(
+    class_names: Sequence[ClassName],
+    gt_counts: Sequence[int],
+    class_tps: Sequence[np.ndarray],
+    interpolations: Sequence[str],
+    class_scores: Optional[Sequence[np.ndarray]] = None,
+) -> Dict[str, List[OutputsDict]]:
+    """Helper function to compute APs and mAP for each interpolation mode and each IoU threshold from the true
+    positive flags of each class. The recall and precision values of each class are computed once and shared by all
+    interpolation modes.
+
+    Args:
+        class_names (Sequence[ClassName]): Sorted class names of ground truth
+        gt_counts (Sequence[int]): Number of ground truth bounding boxes of each class
+        class_tps (Sequence[np.ndarray]): Boolean arrays of shape (n_thr, n_dt) flagging true positive detections of
+            each class for each IoU threshold, sorted by descending confidence score
+        interpolations (Sequence[str]): Interpolation modes, keys of `_AP_INTEGRATORS`
+        class_scores (Optional[Sequence[np.ndarray]], optional): If given, arrays of confidence scores of the
+            detections of each class, sorted in descending order, to add the operating points of each class (see
+            `_compute_operating_points`) under "operating_points". They do not depend on the interpolation mode, so
+            they are shared by the outputs of all modes. Defaults to None.
+
+    Returns:
+        Dict[str, List[OutputsDict]]: Dicts containing APs for each class, and mAP, one for each IoU threshold, for
+            each interpolation mode
+    """
+    n_classes = len(class_names)
+    n_thresholds = len(class_tps[0]) if n_classes else 1
+    outputs_dict_lists: Dict[str, List[OutputsDict]] = {interpolation: [] for interpolation in interpolations}
+    for thr_idx in range(n_thresholds):
+        outputs_dicts: Dict[str, Dict[str, Any]] = {interpolation: {"ap": {}} for interpolation in interpolations}
+        operating_points = {}
+        for class_idx, (class_name, gt_count, class_tp) in enumerate(zip(class_names, gt_counts, class_tps)):
+            rec, prec = _compute_pr_curve(class_tp[thr_idx], gt_count)
+            for interpolation in interpolations:
+                outputs_dicts[interpolation]["ap"][class_name] = _AP_INTEGRATORS[interpolation](rec, prec)
+            if class_scores is not None:
+                operating_points[class_name] = _compute_operating_points(class_scores[class_idx], rec, prec)
+        for interpolation, outputs_dict in outputs_dicts.items():
+            sum_ap = 0.0
+            for ap in outputs_dict["ap"].values():
+                sum_ap += ap
+            outputs_dict["map"] = sum_ap / n_classes if n_classes else float("nan")
+            if class_scores is not None:
+                outputs_dict["operating_points"] = operating_points
+            outputs_dict_lists[interpolation].append(outputs_dict)
+    return outputs_dict_lists
+
+
+def _compute_outputs_dicts(
+    class_names: Sequence[ClassName],
+    gt_counts: Sequence[int],
+    class_tps: Sequence[np.ndarray],
+    interpolation: str = "voc2012",
+) -> List[OutputsDict]:
+    """Helper function to compute APs and mAP for each IoU threshold from the true positive flags of each class
+
+    Args:
+        class_names (Sequence[ClassName]): Sorted class names of ground truth
+        gt_counts (Sequence[int]): Number of ground truth bounding boxes of each class
+        class_tps (Sequence[np.ndarray]): Boolean arrays of shape (n_thr, n_dt) flagging true positive detections of
+            each class for each IoU threshold, sorted by descending confidence score
+        interpolation (str, optional): Interpolation mode, a key of `_AP_INTEGRATORS`. Defaults to "voc2012".
+
+    Returns:
+        List[OutputsDict]: Dicts containing APs for each class, and mAP, one for each IoU threshold
+    """
+    return _compute_outputs_dicts_per_interpolation(class_names, gt_counts, class_tps, [interpolation])[interpolation]
+
+
+def _compute_ap_map_columnar(
+    dataset: ColumnarDataset,
+    iou_thresholds: Sequence[float],
+    n_workers: int = 1,
+    stats: Optional[PipelineStats] = None,
+    interpolations: Sequence[str] = ("voc2012",),
+    operating_points: bool = False,
+) -> Dict[str, List[OutputsDict]]:
+    """Helper function to compute APs and mAP with the NumPy engine. Detections are matched image by image against
+    batched IoU matrices, which are computed once and shared by all IoU thresholds. For each threshold, the outputs
+    are bit-for-bit identical to the pure-Python engine for the same coordinates and scores.
+
+    Args:
+        dataset (ColumnarDataset): Columnar dataset containing ground truths and detections
+        iou_thresholds (Sequence[float]): IoU thresholds to determine if detection is true positive
+        n_workers (int, optional): Number of worker processes to match images in. Defaults to 1.
+        stats (Optional[PipelineStats], optional): Stats to record the "match" and "integrate" stages in, or None
+            to disable profiling. Defaults to None.
+        interpolations (Sequence[str], optional): Interpolation modes, keys of `_AP_INTEGRATORS`. Defaults to
+            ("voc2012",).
+        operating_points (bool, optional): Flag to add the operating points of each class to the outputs. Defaults
+            to False.
+
+    Returns:
+        Dict[str, List[OutputsDict]]: Dicts containing APs for each class, and mAP, one for each IoU threshold, for
+            each interpolation mode
+    """
+    n_classes = dataset.n_classes
+    gt_matched = np.zeros((len(iou_thresholds), len(dataset.gt_matched)), dtype=bool)
+    dt_ignored = None
+    if dataset.gt_ignore is not None:
+        dt_ignored = np.zeros((len(iou_thresholds), len(dataset.dt_scores)), dtype=bool)
+    arrays = (
+        dataset.dt_coordinates,
+        dataset.dt_scores,
+        dataset.dt_class_codes,
+        dataset.dt_image_codes,
+        dataset.gt_coordinates,
+        dataset.gt_class_codes,
+        dataset.gt_image_codes,
+        np.asarray(iou_thresholds, dtype=np.float64),
+    )
+    with _profile_stage(stats, "match") as stage:
+        if n_workers > 1:
+            tp = _match_detections_parallel(
+                *arrays, gt_matched=gt_matched, n_workers=n_workers, gt_ignore=dataset.gt_ignore, dt_ignored=dt_ignored
+            )
+        else:
+            tp = _match_detections(
+                *arrays,
+                gt_matched=gt_matched,
+                gt_areas=dataset.gt_areas,
+                gt_ignore=dataset.gt_ignore,
+                dt_ignored=dt_ignored,
+            )
+        dataset.gt_matched[:] = gt_matched[0]
+        stage.n_items = len(dataset.dt_scores)
+        stage.nbytes = tp.nbytes + gt_matched.nbytes
+
+    with _profile_stage(stats, "integrate") as stage:
+        outputs_dict_lists = _integrate_columnar(dataset, tp, interpolations, operating_points, dt_ignored=dt_ignored)
+        stage.n_items = n_classes * len(iou_thresholds)
+    return outputs_dict_lists
+
+
+def _integrate_columnar(
+    dataset: ColumnarDataset,
+    tp: np.ndarray,
+    interpolations: Sequence[str],
+    operating_points: bool = False,
+    dt_mask: Optional[np.ndarray] = None,
+    gt_mask: Optional[np.ndarray] = None,
+    dt_ignored: Optional[np.ndarray] = None,
+) -> Dict[str, List[OutputsDict]]:
+    """Helper function to compute APs and mAP from the true positive flags of the detections of a columnar dataset,
+    or of a subset of its boxes. Ignored ground truths are not counted, and if the dataset has any, only classes with
+    counted ground truths are evaluated.
+
+    Args:
+        dataset (ColumnarDataset): Columnar dataset containing ground truths and detections
+        tp (np.ndarray): Boolean array of shape (n_thr, n_dt) flagging true positive detections, in input order
+        interpolations (Sequence[str]): Interpolation modes, keys of `_AP_INTEGRATORS`
+        operating_points (bool, optional): Flag to add the operating points of each class to the outputs. Defaults
+            to False.
+        dt_mask (Optional[np.ndarray], optional): Boolean array of shape (n_dt,) flagging the detections to evaluate,
+            or None for all of them. Defaults to None.
+        gt_mask (Optional[np.ndarray], optional): Boolean array of shape (n_gt,) flagging the ground truths to
+            evaluate, or None for all of them. If given, only classes with ground truths in the subset are evaluated,
+            as if the subset were evaluated alone. Defaults to None.
+        dt_ignored (Optional[np.ndarray], optional): Boolean array of shape (n_thr, n_dt) flagging detections absorbed
+            by an ignored ground truth, which are left out of the precision/recall curve of each threshold, or None
+            if no detection is ignored. Defaults to None.
+
+    Returns:
+        Dict[str, List[OutputsDict]]: Dicts containing APs for each class, and mAP, one for each IoU threshold, for
+            each interpolation mode. The mAP is NaN if the subset has no ground truths.
+    """
+    n_classes = dataset.n_classes
+    if gt_mask is None and dataset.gt_counts is not None:
+        gt_count_per_class = dataset.gt_counts
+    else:
+        gt_counted = np.ones(len(dataset.gt_class_codes), dtype=bool) if gt_mask is None else gt_mask
+        if dataset.gt_ignore is not None:
+            gt_counted = gt_counted & ~dataset.gt_ignore
+        gt_count_per_class = np.bincount(dataset.gt_class_codes[gt_counted], minlength=n_classes)
+    skip_empty_classes = gt_mask is not None or dataset.gt_ignore is not None
+    dt_idxs = np.arange(len(dataset.dt_scores)) if dt_mask is None else np.flatnonzero(dt_mask)
+    dt_class_codes = dataset.dt_class_codes[dt_idxs]
+    # group detections by class, sorted by descending score; lexsort is stable so ties keep their input order
+    dt_order = dt_idxs[np.lexsort((-dataset.dt_scores[dt_idxs], dt_class_codes))]
+    class_bounds = np.searchsorted(dataset.dt_class_codes[dt_order], np.arange(n_classes + 1))
+
+    class_names, gt_counts, class_orders = [], [], []
+    for code in range(n_classes):
+        if skip_empty_classes and gt_count_per_class[code] == 0:
+            continue
+        start, end = class_bounds[code], class_bounds[code + 1]
+        class_names.append(dataset.class_names[code])
+        gt_counts.append(int(gt_count_per_class[code]))
+        class_orders.append(dt_order[start:end])
+    if len(class_names) == 0:
+        empty_outputs_dict: OutputsDict = {"ap": {}, "map": float("nan")}
+        if operating_points:
+            empty_outputs_dict["operating_points"] = {}
+        return {interpolation: [dict(empty_outputs_dict) for _ in range(len(tp))] for interpolation in interpolations}
+    if dt_ignored is None:
+        return _compute_outputs_dicts_per_interpolation(
+            class_names,
+            gt_counts,
+            [tp[:, class_order] for class_order in class_orders],
+            interpolations,
+            [dataset.dt_scores[class_order] for class_order in class_orders] if operating_points else None,
+        )
+    return _integrate_columnar_per_threshold(
+        dataset, tp, class_names, gt_counts, class_orders, interpolations, operating_points, dt_ignored
+    )
+
+
+def _integrate_columnar_per_threshold(
+    dataset: ColumnarDataset,
+    tp: np.ndarray,
+    class_names: Sequence[ClassName],
+    gt_counts: Sequence[int],
+    class_orders: Sequence[np.ndarray],
+    interpolations: Sequence[str],
+    operating_points: bool,
+    dt_ignored: np.ndarray,
+) -> Dict[str, List[OutputsDict]]:
+    """Helper function to compute APs and mAP one IoU threshold at a time, since the detections absorbed by an
+    ignored ground truth, which are left out of the precision/recall curves, differ between thresholds
+
+    Args:
+        dataset (ColumnarDataset): Columnar dataset containing ground truths and detections
+        tp (np.ndarray): Boolean array of shape (n_thr, n_dt) flagging true positive detections, in input order
+        class_names (Sequence[ClassName]): Class names to evaluate
+        gt_counts (Sequence[int]): Number of counted ground truth bounding boxes of each class
+        class_orders (Sequence[np.ndarray]): Indices of the detections of each class, sorted by descending confidence
+            score
+        interpolations (Sequence[str]): Interpolation modes, keys of `_AP_INTEGRATORS`
+        operating_points (bool): Flag to add the operating points of each class to the outputs
+        dt_ignored (np.ndarray): Boolean array of shape (n_thr, n_dt) flagging ignored detections
+
+    Returns:
+        Dict[str, List[OutputsDict]]: Dicts containing APs for each class, and mAP, one for each IoU threshold, for
+            each interpolation mode
+    """
+    outputs_dict_lists: Dict[str, List[OutputsDict]] = {interpolation: [] for interpolation in interpolations}
+    for thr_idx in range(len(tp)):
+        kept_orders = [class_order[~dt_ignored[thr_idx, class_order]] for class_order in class_orders]
+        threshold_outputs_dict_lists = _compute_outputs_dicts_per_interpolation(
+            class_names,
+            gt_counts,
+            [tp[thr_idx, kept_order][None, :] for kept_order in kept_orders],
+            interpolations,
+            [dataset.dt_scores[kept_order] for kept_order in kept_orders] if operating_points else None,
+        )
+        for interpolation, outputs_dict_list in threshold_outputs_dict_lists.items():
+            outputs_dict_lists[interpolation].extend(outputs_dict_list)
+    return outputs_dict_lists
+
+
+def _compute_ap_map_columnar_per_area_range(
+    dataset: ColumnarDataset,
+    iou_thresholds: Sequence[float],
+    area_ranges: Dict[str, Tuple[float, float]],
+    stats: Optional[PipelineStats] = None,
+    interpolations: Sequence[str] = ("voc2012",),
+    operating_points: bool = False,
+) -> Tuple[Dict[str, List[OutputsDict]], Dict[str, Dict[str, List[OutputsDict]]]]:
+    """Helper function to compute APs and mAP with the NumPy engine, both over all boxes and separately for the
+    boxes of each area range, as if the ground truths and detections with an area in the range were evaluated alone.
+    The IoU matrix of each image is computed once and shared by all area ranges and IoU thresholds.
+
+    Args:
+        dataset (ColumnarDataset): Columnar dataset containing ground truths and detections
+        iou_thresholds (Sequence[float]): IoU thresholds to determine if detection is true positive
+        area_ranges (Dict[str, Tuple[float, float]]): Dict mapping the name of each area range to its (lower,
+            upper) bounds, a box being in the range if lower <= area < upper
+        stats (Optional[PipelineStats], optional): Stats to record the "match" and "integrate" stages in, or None
+            to disable profiling. Defaults to None.
+        interpolations (Sequence[str], optional): Interpolation modes, keys of `_AP_INTEGRATORS`. Defaults to
+            ("voc2012",).
+        operating_points (bool, optional): Flag to add the operating points of each class to the outputs. Defaults
+            to False.
+
+    Returns:
+        Tuple[Dict[str, List[OutputsDict]], Dict[str, Dict[str, List[OutputsDict]]]]: Contains outputs over all
+            boxes, and outputs of each area range, each as dicts containing APs for each class, and mAP, one for
+            each IoU threshold, for each interpolation mode
+    """
+    dt_coordinates = dataset.dt_coordinates.astype(np.float64)
+    dt_areas = (dt_coordinates[:, 2] - dt_coordinates[:, 0] + 1) * (dt_coordinates[:, 3] - dt_coordinates[:, 1] + 1)
+    gt_areas = dataset.gt_areas
+    if gt_areas is None:
+        gt_coordinates = dataset.gt_coordinates.astype(np.float64)
+        gt_areas = (gt_coordinates[:, 2] - gt_coordinates[:, 0] + 1) * (gt_coordinates[:, 3] - gt_coordinates[:, 1] + 1)
+    # the first subset holds all boxes, so that overall outputs come from the same matching pass
+    dt_range_masks = np.ones((len(area_ranges) + 1, len(dt_areas)), dtype=bool)
+    dt_ignored = None
+    if dataset.gt_ignore is not None:
+        dt_ignored = np.zeros((len(dt_range_masks), len(iou_thresholds), len(dt_areas)), dtype=bool)
+    gt_range_masks = np.ones((len(area_ranges) + 1, len(gt_areas)), dtype=bool)
+    for range_idx, (lower, upper) in enumerate(area_ranges.values(), 1):
+        dt_range_masks[range_idx] = (dt_areas >= lower) & (dt_areas < upper)
+        gt_range_masks[range_idx] = (gt_areas >= lower) & (gt_areas < upper)
+
+    with _profile_stage(stats, "match") as stage:
+        tp = _match_detections_per_area_range(
+            dataset.dt_coordinates,
+            dataset.dt_scores,
+            dataset.dt_class_codes,
+            dataset.dt_image_codes,
+            dataset.gt_coordinates,
+            dataset.gt_class_codes,
+            dataset.gt_image_codes,
+            np.asarray(iou_thresholds, dtype=np.float64),
+            dt_range_masks,
+            gt_range_masks,
+            gt_areas,
+            dataset.gt_ignore,
+            dt_ignored,
+        )
+        stage.n_items = len(dataset.dt_scores)
+        stage.nbytes = tp.nbytes + dt_range_masks.nbytes + gt_range_masks.nbytes
+
+    with _profile_stage(stats, "integrate") as stage:
+        outputs_dict_lists = _integrate_columnar(
+            dataset, tp[0], interpolations, operating_points, dt_ignored=None if dt_ignored is None else dt_ignored[0]
+        )
+        range_outputs_dict_lists = {
+            range_name: _integrate_columnar(
+                dataset,
+                tp[range_idx],
+                interpolations,
+                operating_points,
+                dt_range_masks[range_idx],
+                gt_range_masks[range_idx],
+                None if dt_ignored is None else dt_ignored[range_idx],
+            )
+            for range_idx, range_name in enumerate(area_ranges, 1)
+        }
+        stage.n_items = dataset.n_classes * len(iou_thresholds) * len(dt_range_masks)
+    return outputs_dict_lists, range_outputs_dict_lists
+
+
+def _average_outputs_dicts(iou_thresholds: Sequence[float], outputs_dict_list: List[OutputsDict]) -> OutputsDict:
+    """Helper function to average APs and mAPs over IoU thresholds, COCO-style
+
+    Args:
+        iou_thresholds (Sequence[float]): IoU thresholds that the outputs were computed with
+        outputs_dict_list (List[OutputsDict]): Dicts containing APs for each class, and mAP, one for each IoU threshold
+
+    Returns:
+        OutputsDict: Dict containing averaged APs for each class and averaged mAP, plus the outputs for each threshold
+            under "per_threshold"
+    """
+    n_thresholds = len(iou_thresholds)
+    class_names = outputs_dict_list[0]["ap"].keys()
+    return {
+        "ap": {
+            class_name: sum(outputs_dict["ap"][class_name] for outputs_dict in outputs_dict_list) / n_thresholds
+            for class_name in class_names
+        },
+        "map": sum(outputs_dict["map"] for outputs_dict in outputs_dict_list) / n_thresholds,
+        "per_threshold": dict(zip(iou_thresholds, outputs_dict_list)),
+    }
+
+
+def _get_interpolations(interpolation: Union[str, Sequence[str]]) -> List[str]:
+    """Helper function to validate the interpolation modes requested from `compute_ap_map`
+
+    Args:
+        interpolation (Union[str, Sequence[str]]): Interpolation mode, or modes
+
+    Returns:
+        List[str]: Interpolation modes, without duplicates
+    """
+    # drop duplicate modes, keeping their order
+    interpolations = list(dict.fromkeys([interpolation] if isinstance(interpolation, str) else interpolation))
+    if len(interpolations) == 0:
+        raise ValueError("interpolation must contain at least one mode")
+    for mode in interpolations:
+        if mode not in _AP_INTEGRATORS:
+            raise ValueError(f"Unknown interpolation {mode}, expected one of {list(_AP_INTEGRATORS)}")
+    return interpolations
+
+
 def compute_ap_map(
-    ground_truth_dict_list: List[GroundTruthDict],
-    detections_dict_list: List[DetectionsDict],
+    ground_truth_dict_list: Union[List[GroundTruthDict], ColumnarDataset, GroundTruthIndex],
+    detections_dict_list: Optional[Union[List[DetectionsDict], ColumnarDetections]] = None,
     iou_threshold: float = 0.5,
+    engine: str = "python",
+    iou_thresholds: Optional[Sequence[float]] = None,
+    n_workers: int = 1,
+    spatial_index_min_boxes: Optional[int] = 32,
+    stats: Optional[PipelineStats] = None,
+    interpolation: Union[str, Sequence[str]] = "voc2012",
+    max_detections_per_image: Optional[int] = None,
+    min_score: Optional[float] = None,
+    operating_points: bool = False,
+    area_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
 ) -> OutputsDict:
     """Overall function to compute APs and mAP
 
+    Ground truth dicts may contain an optional "ignore_flags" list, parallel to "class_labels", flagging ignored
+    ground truths such as crowd regions, COCO-style. Ignored ground truths are never matched and not counted in
+    recall. A detection that does not match a regular ground truth, but whose intersection with an ignored ground
+    truth of its class covers at least the IoU threshold of its own area, is absorbed by it: it counts as neither a
+    true nor a false positive. Classes with only ignored ground truths are not evaluated. Ground truths with ignore
+    flags are always evaluated with the "numpy" engine.
+
+    Args:
+        ground_truth_dict_list (Union[List[GroundTruthDict], ColumnarDataset, GroundTruthIndex]): List of dicts
+            containing ground truth coordinates, class labels and file IDs, a `ColumnarDataset` containing both ground
+            truths and detections, or a `GroundTruthIndex` of ground truth prepared once to evaluate several sets of
+            detections against (always evaluated with the "numpy" engine)
+        detections_dict_list (Optional[Union[List[DetectionsDict], ColumnarDetections]], optional): List of dicts
+            containing detection coordinates, class labels, confidence scores and file IDs, or `ColumnarDetections`
+            (e.g. memory-mapped from a detections file, which is evaluated with the "numpy" engine without copying its
+            coordinates and scores). Must be None if a `ColumnarDataset` is given. Defaults to None.
+        iou_threshold (float, optional): IoU threshold to determine if detection is true positive. Defaults to 0.5.
+        engine (str, optional): Matching engine to use, either "python" (one detection at a time) or "numpy"
+            (batched IoU matrices per image). Both engines give identical outputs. A `ColumnarDataset` is always
+            evaluated with the "numpy" engine. Defaults to "python".
+        iou_thresholds (Optional[Sequence[float]], optional): If given, overrides `iou_threshold` and evaluates all
+            thresholds in a single matching pass with the "numpy" engine, e.g. `variables.COCO_IOU_THRESHOLDS` for
+            COCO mAP@[.5:.95]. The returned APs and mAP are then averaged over thresholds, and the outputs for each
+            threshold are added under "per_threshold". Defaults to None.
+        n_workers (int, optional): If greater than 1, images are sharded across a pool of `n_workers` processes and
+            matched with the "numpy" engine. Outputs are identical to the serial ones. Defaults to 1.
+        spatial_index_min_boxes (Optional[int], optional): With the "python" engine and a positive IoU threshold,
+            ground truths of a class in an image are spatially indexed when there are at least this many of them, so
+            that each detection is only compared with ground truths that can overlap it. Outputs are identical to
+            the exhaustive search. None disables the index. Defaults to 32.
+        stats (Optional[PipelineStats], optional): If given, the wall time, item count and allocation size of each
+            stage (building box objects or columnar arrays, matching and AP integration) are recorded in it. Defaults
+            to None.
+        interpolation (Union[str, Sequence[str]], optional): Interpolation of the precision/recall curve to compute
+            AP with, either "voc2012" (all-point, as in the VOC2012 devkit), "coco101" (101 recall thresholds, as in
+            the COCO API) or "voc07" (11 recall thresholds, as in the VOC2007 devkit). If several modes are given,
+            they all share a single matching pass; the returned APs and mAP are those of the first mode, and the
+            outputs of each mode are added under "per_interpolation". Defaults to "voc2012".
+        max_detections_per_image (Optional[int], optional): If given, only the highest scoring detections of each
+            image, up to this many, are evaluated, as in COCO-style protocols. Only detections of ground truth classes
+            are counted, and detections with equal scores at the cut-off are kept in input order. Detections are
+            pruned by partial selection before any bounding box object is built or IoU computed. Defaults to None.
+        min_score (Optional[float], optional): If given, detections scoring lower are dropped before evaluation,
+            and before `max_detections_per_image` is applied. Defaults to None.
+        operating_points (bool, optional): Flag to also return, from the same matching pass, the operating points of
+            each class under "operating_points": a dict keyed by class name, containing arrays of "score_thresholds"
+            (the distinct confidence scores of its detections, in descending order) and of the "precision",
+            "recall" and "f1" obtained when keeping only detections scoring at least each threshold, plus the
+            F1-optimal "best_threshold" (the highest one on ties, or None without detections) and its "best_f1".
+            With `iou_thresholds`, operating points are added to the outputs of each threshold under
+            "per_threshold". Defaults to False.
+        area_ranges (Optional[Dict[str, Tuple[float, float]]], optional): If given, outputs are also computed
+            separately for the boxes of each area range, and added under "per_area_range" keyed by range name, e.g.
+            `variables.COCO_AREA_RANGES` for small, medium and large objects. Each range is given as (lower, upper)
+            bounds, a box being in the range if lower <= area < upper, with areas computed as in `_compute_iou`. The
+            outputs of a range are those of evaluating only the ground truths and detections in the range, and only
+            include classes with ground truths in the range. All ranges are evaluated in the same matching pass as
+            the overall outputs, with the "numpy" engine in a single process. Defaults to None.
+
+    Returns:
+        OutputsDict: Dict containing APs for each class, and mAP
+    """
+    if engine not in ("python", "numpy"):
+        raise ValueError(f"Unknown engine {engine}, expected 'python' or 'numpy'")
+    if n_workers < 1:
+        raise ValueError(f"n_workers must be at least 1, but got {n_workers}")
+    interpolations = _get_interpolations(interpolation)
+    if iou_thresholds is not None and len(iou_thresholds) == 0:
+        raise ValueError("iou_thresholds must contain at least one threshold")
+    if max_detections_per_image is not None and max_detections_per_image < 1:
+        raise ValueError(f"max_detections_per_image must be at least 1, but got {max_detections_per_image}")
+    _check_area_ranges(area_ranges)
+    if isinstance(ground_truth_dict_list, ColumnarDataset):
+        if detections_dict_list is not None:
+            raise ValueError("detections_dict_list must be None when a ColumnarDataset is given")
+        dataset = ground_truth_dict_list
+    elif detections_dict_list is None:
+        raise ValueError("detections_dict_list is required when ground truth dicts are given")
+    elif (
+        engine == "python"
+        and iou_thresholds is None
+        and n_workers == 1
+        and area_ranges is None
+        and not isinstance(ground_truth_dict_list, GroundTruthIndex)
+        and not isinstance(detections_dict_list, ColumnarDetections)
+        and not _has_ignore_flags(ground_truth_dict_list)
+    ):
+        outputs_dict_lists = _compute_ap_map_python(
+            ground_truth_dict_list,
+            detections_dict_list,
+            iou_threshold,
+            spatial_index_min_boxes,
+            stats,
+            interpolations,
+            max_detections_per_image,
+            min_score,
+            operating_points,
+        )
+        return _select_outputs_dict(interpolation, outputs_dict_lists, None)
+    else:
+        dataset = _build_dataset(ground_truth_dict_list, detections_dict_list, stats)
+    dataset = _prune_dataset(dataset, max_detections_per_image, min_score, stats)
+
+    thresholds = [iou_threshold] if iou_thresholds is None else iou_thresholds
+    if area_ranges is None:
+        outputs_dict_lists = _compute_ap_map_columnar(
+            dataset, thresholds, n_workers, stats, interpolations, operating_points
+        )
+        return _select_outputs_dict(interpolation, outputs_dict_lists, iou_thresholds)
+    outputs_dict_lists, range_outputs_dict_lists = _compute_ap_map_columnar_per_area_range(
+        dataset, thresholds, area_ranges, stats, interpolations, operating_points
+    )
+    outputs_dict = _select_outputs_dict(interpolation, outputs_dict_lists, iou_thresholds)
+    outputs_dict["per_area_range"] = {
+        range_name: _select_outputs_dict(interpolation, range_outputs_dict_list, iou_thresholds)
+        for range_name, range_outputs_dict_list in range_outputs_dict_lists.items()
+    }
+    return outputs_dict
+
+
+def _has_ignore_flags(ground_truth_dict_list: List[GroundTruthDict]) -> bool:
+    """Helper function to check if any ground truth is flagged as ignored, which only the "numpy" engine supports
+
+    Args:
+        ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+            class labels, file IDs and optionally ignore flags
+
+    Returns:
+        bool: True if any ground truth is ignored
+    """
+    return any(np.any(gt_dict.get("ignore_flags", False)) for gt_dict in ground_truth_dict_list)
+
+
+def _check_area_ranges(area_ranges: Optional[Dict[str, Tuple[float, float]]]):
+    """Helper function to validate the area ranges requested from `compute_ap_map`
+
+    Args:
+        area_ranges (Optional[Dict[str, Tuple[float, float]]]): Dict mapping the name of each area range to its
+            (lower, upper) bounds, or None
+    """
+    if area_ranges is None:
+        return
+    if len(area_ranges) == 0:
+        raise ValueError("area_ranges must contain at least one range")
+    for range_name, (lower, upper) in area_ranges.items():
+        if not lower < upper:
+            raise ValueError(f"Area range {range_name} must have a lower bound below its upper bound")
+
+
+def _build_dataset(
+    ground_truth: Union[List[GroundTruthDict], GroundTruthIndex],
+    detections: Union[List[DetectionsDict], ColumnarDetections],
+    stats: Optional[PipelineStats],
+) -> ColumnarDataset:
+    """Helper function to build a columnar dataset from ground truths and detections, at full float64 precision
+    unless detections are columnar
+
+    Args:
+        ground_truth (Union[List[GroundTruthDict], GroundTruthIndex]): List of dicts containing ground truth
+            coordinates, class labels and file IDs, or prepared ground truth
+        detections (Union[List[DetectionsDict], ColumnarDetections]): List of dicts containing detection
+            coordinates, class labels, confidence scores and file IDs, or columnar detections
+        stats (Optional[PipelineStats]): Stats to record the "build_dataset" stage in, or None to disable profiling
+
+    Returns:
+        ColumnarDataset: Columnar dataset containing all ground truths and detections
+    """
+    with _profile_stage(stats, "build_dataset") as stage:
+        if isinstance(ground_truth, GroundTruthIndex):
+            dataset = ground_truth.build_dataset(detections)
+        elif isinstance(detections, ColumnarDetections):
+            dataset = ColumnarDataset.from_detections(ground_truth, detections)
+        else:
+            dataset = ColumnarDataset.from_dicts(ground_truth, detections, dtype=np.float64)
+        stage.n_items = len(dataset.gt_class_codes) + len(dataset.dt_class_codes)
+        stage.nbytes = dataset.nbytes
+    return dataset
+
+
+def _prune_dataset(
+    dataset: ColumnarDataset,
+    max_detections_per_image: Optional[int],
+    min_score: Optional[float],
+    stats: Optional[PipelineStats],
+) -> ColumnarDataset:
+    """Helper function to drop the detections of a columnar dataset that are not kept by `_select_detections`,
+    counting only detections of ground truth classes
+
+    Args:
+        dataset (ColumnarDataset): Columnar dataset containing ground truths and detections
+        max_detections_per_image (Optional[int]): Maximum number of detections kept in each image, or None for no
+            limit
+        min_score (Optional[float]): Minimum confidence score of kept detections, or None for no minimum
+        stats (Optional[PipelineStats]): Stats to record the "prune_detections" stage in, or None to disable
+            profiling
+
+    Returns:
+        ColumnarDataset: The dataset itself if nothing is pruned, or else a dataset with the kept detections only
+    """
+    if max_detections_per_image is None and min_score is None:
+        return dataset
+    with _profile_stage(stats, "prune_detections") as stage:
+        keep = _select_detections(
+            dataset.dt_scores, dataset.dt_image_codes, max_detections_per_image, min_score, dataset.dt_class_codes >= 0
+        )
+        if keep is not None:
+            dataset = dataset.select_detections(keep)
+        stage.n_items = len(dataset.dt_scores)
+    return dataset
+
+
+def _select_outputs_dict(
+    interpolation: Union[str, Sequence[str]],
+    outputs_dict_lists: Dict[str, List[OutputsDict]],
+    iou_thresholds: Optional[Sequence[float]],
+) -> OutputsDict:
+    """Helper function to assemble the outputs of `compute_ap_map` from the outputs of each interpolation mode and
+    each IoU threshold
+
+    Args:
+        interpolation (Union[str, Sequence[str]]): Interpolation mode, or modes, requested from `compute_ap_map`
+        outputs_dict_lists (Dict[str, List[OutputsDict]]): Dicts containing APs for each class, and mAP, one for each
+            IoU threshold, for each interpolation mode
+        iou_thresholds (Optional[Sequence[float]]): IoU thresholds requested from `compute_ap_map`, if any
+
+    Returns:
+        OutputsDict: Dict containing APs for each class, and mAP
+    """
+    outputs_dicts = {
+        mode: (
+            outputs_dict_list[0]
+            if iou_thresholds is None
+            else _average_outputs_dicts(iou_thresholds, outputs_dict_list)
+        )
+        for mode, outputs_dict_list in outputs_dict_lists.items()
+    }
+    if isinstance(interpolation, str):
+        return outputs_dicts[interpolation]
+    outputs_dict = dict(outputs_dicts[next(iter(outputs_dicts))])
+    outputs_dict["per_interpolation"] = outputs_dicts
+    return outputs_dict
+
+
+def _compute_ap_map_python(
+    ground_truth_dict_list: List[GroundTruthDict],
+    detections_dict_list: List[DetectionsDict],
+    iou_threshold: float,
+    spatial_index_min_boxes: Optional[int] = None,
+    stats: Optional[PipelineStats] = None,
+    interpolations: Sequence[str] = ("voc2012",),
+    max_detections_per_image: Optional[int] = None,
+    min_score: Optional[float] = None,
+    operating_points: bool = False,
+) -> Dict[str, List[OutputsDict]]:
+    """Helper function to compute APs and mAP with the pure-Python engine, matching one detection at a time
+
     Args:
         ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
             class labels and file IDs
         detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
             class labels, confidence scores and file IDs
-        iou_threshold (float, optional): IoU threshold to determine if detection is true positive. Defaults to 0.5.
+        iou_threshold (float): IoU threshold to determine if detection is true positive
+        spatial_index_min_boxes (Optional[int], optional): Minimum number of ground truths of a class in an image to
+            spatially index them, or None to disable the index. Defaults to None.
+        stats (Optional[PipelineStats], optional): Stats to record the stages in, or None to disable profiling.
+            Matching runs once per class, and is summed up over classes. Defaults to None.
+        interpolations (Sequence[str], optional): Interpolation modes, keys of `_AP_INTEGRATORS`. Defaults to
+            ("voc2012",).
+        max_detections_per_image (Optional[int], optional): Maximum number of detections of ground truth classes
+            kept in each image, by descending confidence score. Defaults to None.
+        min_score (Optional[float], optional): Minimum confidence score of kept detections. Defaults to None.
+        operating_points (bool, optional): Flag to add the operating points of each class to the outputs. Defaults
+            to False.
 
     Returns:
-        OutputsDict: Dict containing APs for each class, and mAP
+        Dict[str, List[OutputsDict]]: Dicts containing APs for each class, and mAP, in a list of a single IoU
+            threshold, for each interpolation mode
     """
     gt_file_ids = set([gt_dict["file_id"] for gt_dict in ground_truth_dict_list])
 
-    gt_count_per_class, gt_bboxes_dict = _generate_gt_objs(ground_truth_dict_list, detections_dict_list)
+    with _profile_stage(stats, "build_gt_objects") as stage:
+        gt_count_per_class, gt_bboxes_dict = _generate_gt_objs(ground_truth_dict_list, detections_dict_list)
+        if stats is not None:
+            stage.n_items = sum(gt_count_per_class.values())
+    # ground truths missed by the index have an IoU of 0, which can only be a match with a non-positive threshold
+    gt_index = None
+    if spatial_index_min_boxes is not None and iou_threshold > 0:
+        with _profile_stage(stats, "build_spatial_index") as stage:
+            gt_index = _build_gt_index(gt_bboxes_dict, spatial_index_min_boxes)
+            if stats is not None:
+                stage.n_items = sum(len(file_index) for file_index in gt_index.values())
     gt_classes = sorted(gt_count_per_class.keys())
     n_classes = len(gt_classes)
 
-    dt_bboxes_dict = _generate_dt_objs(gt_classes, detections_dict_list, gt_file_ids)
+    with _profile_stage(stats, "build_dt_objects") as stage:
+        dt_bboxes_dict = _generate_dt_objs(
+            gt_classes, detections_dict_list, gt_file_ids, max_detections_per_image, min_score
+        )
+        if stats is not None:
+            stage.n_items = sum(len(dt_bboxes) for dt_bboxes in dt_bboxes_dict.values())
 
-    sum_ap = 0.0
-    outputs_dict: Dict[str, Any] = {"ap": {}}
     true_positive_counts: Dict[ClassName, int] = defaultdict(lambda: 0)
+    class_tps = []
+    class_scores = []
 
     for class_name in gt_classes:
         dt_bboxes = dt_bboxes_dict[class_name]
         num_detections = len(dt_bboxes)
-        # create arrays of zeros of size `num_detections`
-        tp = [0] * num_detections
-        fp = [0] * num_detections
-        for idx, dt_bbox in enumerate(dt_bboxes):
-            # Get corresponding ground truth bounding boxes
-            gt_match, max_iou = _get_best_gt_bbox(dt_bbox, class_name, gt_bboxes_dict)
-            if max_iou >= iou_threshold and not gt_match.matched:
-                tp[idx] = 1
-                gt_match.set_matched(True)
-                true_positive_counts[class_name] += 1
-            else:
-                # false positive (multiple detections or low iou score)
-                fp[idx] = 1
-
-        _compute_counts_cumsum(fp)
-        _compute_counts_cumsum(tp)
-        rec = [val / gt_count_per_class[class_name] for val in tp]
-        prec = [tp_val / (tp_val + fp_val) for tp_val, fp_val in zip(tp, fp)]
-
-        ap, _, _ = _voc_ap(rec[:], prec[:])
-        sum_ap += ap
-        outputs_dict["ap"][class_name] = ap
-    map_score = sum_ap / n_classes
-    outputs_dict["map"] = map_score
-    return outputs_dict
+        with _profile_stage(stats, "match") as stage:
+            # create array of zeros of size `num_detections`
+            tp = [0] * num_detections
+            for idx, dt_bbox in enumerate(dt_bboxes):
+                # Get corresponding ground truth bounding boxes
+                gt_match, max_iou = _get_best_gt_bbox(dt_bbox, class_name, gt_bboxes_dict, gt_index)
+                if gt_match is not None and max_iou >= iou_threshold and not gt_match._matched:
+                    tp[idx] = 1
+                    gt_match.set_matched(True)
+                    true_positive_counts[class_name] += 1
+            stage.n_items = num_detections
+        # detections that are not true positives are false positives (multiple detections or low iou score)
+        class_tps.append(np.array([tp], dtype=bool))
+        if operating_points:
+            class_scores.append(np.array([dt_bbox.conf_score for dt_bbox in dt_bboxes], dtype=np.float64))
+
+    with _profile_stage(stats, "integrate") as stage:
+        outputs_dict_lists = _compute_outputs_dicts_per_interpolation(
+            gt_classes,
+            [gt_count_per_class[class_name] for class_name in gt_classes],
+            class_tps,
+            interpolations,
+            class_scores if operating_points else None,
+        )
+        stage.n_items = n_classes
+    return outputs_dict_lists
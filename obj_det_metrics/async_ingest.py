@@ -0,0 +1,223 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from obj_det_metrics.evaluator import APEvaluator
+from obj_det_metrics.ingest import (
+    _read_dt_txt,
+    _read_gt_txt,
+    _scan_txt_files_by_file_id,
+)
+from obj_det_metrics.variables import DetectionsDict, GroundTruthDict, OutputsDict
+
+InputDict = TypeVar("InputDict")
+
+
+async def _iter_txts_async(
+    txt_dir: str, read_fn: Callable[[str], InputDict], max_concurrency: int
+) -> AsyncIterator[InputDict]:
+    """Helper function to read the text files of a directory in a pool of threads, off the event loop, and yield
+    them in file ID order. At most `max_concurrency` files are read ahead of the consumer, so memory stays bounded
+    when the consumer is slower than reading.
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+        read_fn (Callable[[str], InputDict]): Function reading a single text file
+        max_concurrency (int): Maximum number of files read at the same time
+
+    Yields:
+        InputDict: Output of `read_fn` for each text file, sorted by file ID
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, but got {max_concurrency}")
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    pending: Deque["asyncio.Future[InputDict]"] = deque()
+    try:
+        txt_files = await loop.run_in_executor(executor, _scan_txt_files_by_file_id, txt_dir)
+        for _, filepath in txt_files:
+            if len(pending) == max_concurrency:
+                yield await pending.popleft()
+            pending.append(loop.run_in_executor(executor, read_fn, filepath))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # files read ahead for a consumer that stopped early are discarded
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def generate_gt_dicts_from_txts_async(txt_dir: str, max_concurrency: int = 8) -> AsyncIterator[GroundTruthDict]:
+    """Overall function to stream the ground truth dicts of the text files of a directory as an async iterator,
+    without blocking the event loop. Files are listed and read in a pool of `max_concurrency` threads, and dicts are
+    yielded in file ID order as soon as they are read.
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+        max_concurrency (int, optional): Maximum number of files read at the same time, and read ahead of the
+            consumer. Defaults to 8.
+
+    Returns:
+        AsyncIterator[GroundTruthDict]: Async iterator over ground truth dicts, sorted by file ID
+    """
+    return _iter_txts_async(txt_dir, _read_gt_txt, max_concurrency)
+
+
+def generate_dt_dicts_from_txts_async(txt_dir: str, max_concurrency: int = 8) -> AsyncIterator[DetectionsDict]:
+    """Overall function to stream the detections dicts of the text files of a directory as an async iterator,
+    without blocking the event loop. Files are listed and read in a pool of `max_concurrency` threads, and dicts are
+    yielded in file ID order as soon as they are read.
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+        max_concurrency (int, optional): Maximum number of files read at the same time, and read ahead of the
+            consumer. Defaults to 8.
+
+    Returns:
+        AsyncIterator[DetectionsDict]: Async iterator over detections dicts, sorted by file ID
+    """
+    return _iter_txts_async(txt_dir, _read_dt_txt, max_concurrency)
+
+
+async def _iter_batches_async(
+    gt_dicts: AsyncIterable[GroundTruthDict], dt_dicts: AsyncIterable[DetectionsDict], batch_size: int
+) -> AsyncIterator[Tuple[List[GroundTruthDict], List[DetectionsDict]]]:
+    """Helper function to group two async iterables of ground truth and detections dicts of the same images, in the
+    same order, into batches
+
+    Args:
+        gt_dicts (AsyncIterable[GroundTruthDict]): Ground truth dicts
+        dt_dicts (AsyncIterable[DetectionsDict]): Detections dicts, with the same file IDs in the same order
+        batch_size (int): Number of images in each batch
+
+    Yields:
+        Tuple[List[GroundTruthDict], List[DetectionsDict]]: Ground truth and detections dicts of a batch of images
+    """
+    gt_iterator, dt_iterator = gt_dicts.__aiter__(), dt_dicts.__aiter__()
+    gt_batch: List[GroundTruthDict] = []
+    dt_batch: List[DetectionsDict] = []
+    while True:
+        gt_dict = await _next_or_none(gt_iterator)
+        dt_dict = await _next_or_none(dt_iterator)
+        if gt_dict is None and dt_dict is None:
+            break
+        # check that both iterables hold the same images in the same order
+        gt_file_id = None if gt_dict is None else gt_dict["file_id"]
+        dt_file_id = None if dt_dict is None else dt_dict["file_id"]
+        if gt_dict is None or dt_dict is None or gt_file_id != dt_file_id:
+            raise ValueError(
+                f"File ID {gt_file_id} of ground truth list does not match file ID {dt_file_id} of detections list"
+            )
+        gt_batch.append(gt_dict)
+        dt_batch.append(dt_dict)
+        if len(gt_batch) == batch_size:
+            yield gt_batch, dt_batch
+            gt_batch, dt_batch = [], []
+    if gt_batch:
+        yield gt_batch, dt_batch
+
+
+async def _next_or_none(iterator: AsyncIterator[InputDict]) -> Optional[InputDict]:
+    """Helper function to get the next item of an async iterator, or None if it is exhausted
+
+    Args:
+        iterator (AsyncIterator[InputDict]): Async iterator
+
+    Returns:
+        Optional[InputDict]: Next item, or None
+    """
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def update_evaluator_async(
+    evaluator: APEvaluator,
+    gt_dicts: AsyncIterable[GroundTruthDict],
+    dt_dicts: AsyncIterable[DetectionsDict],
+    batch_size: int = 256,
+) -> APEvaluator:
+    """Overall function to feed streams of ground truth and detections dicts to an evaluator batch by batch. Each
+    batch is matched in a worker thread, off the event loop, while the next batch is being read, so ingestion and
+    matching overlap. At most one batch waits for matching, which bounds memory. If reading fails, the pending batch
+    is cancelled without blocking the event loop, but it may still be matched into the evaluator if it had started.
+
+    Args:
+        evaluator (APEvaluator): Evaluator to update
+        gt_dicts (AsyncIterable[GroundTruthDict]): Ground truth dicts, e.g. from `generate_gt_dicts_from_txts_async`
+        dt_dicts (AsyncIterable[DetectionsDict]): Detections dicts of the same images in the same order, e.g. from
+            `generate_dt_dicts_from_txts_async`
+        batch_size (int, optional): Number of images in each batch. Defaults to 256.
+
+    Returns:
+        APEvaluator: The evaluator, after all batches are matched
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, but got {batch_size}")
+    loop = asyncio.get_running_loop()
+    # a single worker thread keeps batches in order
+    executor = ThreadPoolExecutor(max_workers=1)
+    update: Optional["asyncio.Future[None]"] = None
+    try:
+        async for gt_batch, dt_batch in _iter_batches_async(gt_dicts, dt_dicts, batch_size):
+            if update is not None:
+                await update
+            update = loop.run_in_executor(executor, evaluator.update, gt_batch, dt_batch)
+        if update is not None:
+            await update
+    finally:
+        # only reached with a pending update on errors, which must not wait for it on the event loop thread
+        if update is not None and not update.done():
+            update.cancel()
+        executor.shutdown(wait=False)
+    return evaluator
+
+
+async def compute_ap_map_from_txts_async(
+    gt_txt_dir: str,
+    dt_txt_dir: str,
+    iou_threshold: float = 0.5,
+    iou_thresholds: Optional[Sequence[float]] = None,
+    batch_size: int = 256,
+    max_concurrency: int = 8,
+) -> OutputsDict:
+    """Overall function to compute APs and mAP from text files of ground truths and detections inside an asyncio
+    application, without blocking the event loop. Files are streamed with `generate_gt_dicts_from_txts_async` and
+    `generate_dt_dicts_from_txts_async`, and matched batch by batch with `update_evaluator_async`. Outputs are
+    identical to those of `compute_ap_map` with the "numpy" engine.
+
+    Args:
+        gt_txt_dir (str): Directory containing text files of ground truths
+        dt_txt_dir (str): Directory containing text files of detections, one for each ground truth file
+        iou_threshold (float, optional): IoU threshold to determine if detection is true positive. Defaults to 0.5.
+        iou_thresholds (Optional[Sequence[float]], optional): If given, overrides `iou_threshold`, as in
+            `compute_ap_map`. Defaults to None.
+        batch_size (int, optional): Number of images in each batch. Defaults to 256.
+        max_concurrency (int, optional): Maximum number of files of each directory read at the same time. Defaults
+            to 8.
+
+    Returns:
+        OutputsDict: Dict containing APs for each class, and mAP
+    """
+    evaluator = APEvaluator(iou_threshold=iou_threshold, iou_thresholds=iou_thresholds)
+    await update_evaluator_async(
+        evaluator,
+        generate_gt_dicts_from_txts_async(gt_txt_dir, max_concurrency),
+        generate_dt_dicts_from_txts_async(dt_txt_dir, max_concurrency),
+        batch_size,
+    )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, evaluator.compute)
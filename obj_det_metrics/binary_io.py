@@ -0,0 +1,94 @@
+import json
+import os
+import struct
+import threading
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+# File layout: magic bytes, header length as little-endian uint64, JSON header, then the raw bytes of each array.
+# The header holds free-form metadata and the dtype, shape and offset of each array. Arrays start at multiples of
+# `_ALIGNMENT` bytes, so they can be memory-mapped with `numpy.memmap`.
+_MAGIC = b"ODMARRS1"
+_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    """Helper function to round an offset up to the next multiple of `_ALIGNMENT`
+
+    Args:
+        offset (int): Offset in bytes
+
+    Returns:
+        int: Aligned offset in bytes
+    """
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _write_array_file(filepath: str, arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]):
+    """Helper function to write arrays and JSON-serializable metadata to a single binary file. The file is written
+    to a temporary path first and then renamed, so readers never see a partially written file, and concurrent writers
+    of the same file, in other processes or threads, each replace it with a complete file.
+
+    Args:
+        filepath (str): Path of file to write
+        arrays (Dict[str, np.ndarray]): Arrays to write, by name
+        metadata (Dict[str, Any]): JSON-serializable metadata to write in the header
+    """
+    contiguous_arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    array_specs = {}
+    offset = 0
+    for name, array in contiguous_arrays.items():
+        array_specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({"metadata": metadata, "arrays": array_specs}).encode("utf-8")
+    data_start = _align(len(_MAGIC) + 8 + len(header))
+
+    # the temporary path is unique per thread, so that threads writing the same file never share a temporary file
+    tmp_filepath = f"{filepath}.tmp{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp_filepath, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, array in contiguous_arrays.items():
+                f.seek(data_start + array_specs[name]["offset"])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_filepath, filepath)
+    except BaseException:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        raise
+
+
+def _read_array_file(filepath: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Helper function to read arrays and metadata written by `_write_array_file`
+
+    Args:
+        filepath (str): Path of file to read
+        mmap (bool, optional): Flag to memory-map the arrays read-only instead of reading them into memory.
+            Defaults to True.
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], Dict[str, Any]]: Contains arrays by name, and metadata
+    """
+    with open(filepath, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{filepath} is not an obj-det-metrics array file")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+        data_start = _align(len(_MAGIC) + 8 + header_length)
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            offset = data_start + spec["offset"]
+            if int(np.prod(shape)) == 0:
+                # numpy.memmap cannot map zero bytes
+                arrays[name] = np.empty(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=shape)
+            else:
+                f.seek(offset)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+    return arrays, header["metadata"]
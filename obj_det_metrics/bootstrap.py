@@ -0,0 +1,252 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from obj_det_metrics.ap_map import (
+    _COCO101_RECALL_THRESHOLDS,
+    _VOC07_RECALL_THRESHOLDS,
+    _build_dataset,
+)
+from obj_det_metrics.columnar import ColumnarDataset, ColumnarDetections
+from obj_det_metrics.ground_truth_index import GroundTruthIndex
+from obj_det_metrics.parallel import _match_detections_parallel
+from obj_det_metrics.utils import _match_detections
+from obj_det_metrics.variables import DetectionsDict, GroundTruthDict
+
+# recall thresholds of the interpolation modes that sample precision, None for all-point interpolation
+_RECALL_THRESHOLDS: Dict[str, Optional[np.ndarray]] = {
+    "voc2012": None,
+    "coco101": _COCO101_RECALL_THRESHOLDS,
+    "voc07": _VOC07_RECALL_THRESHOLDS,
+}
+
+# approximate number of array elements allocated per class for a chunk of resamples
+_CHUNK_ELEMENTS = 2**22
+
+# Records of a class: image codes and true positive flags of its detections sorted by descending confidence score,
+# and image codes of its ground truths
+ClassRecords = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _compute_ap_batch(rec: np.ndarray, prec: np.ndarray, recall_thresholds: Optional[np.ndarray]) -> np.ndarray:
+    """Helper function to compute the APs of a batch of precision/recall curves of equal length. Each curve follows
+    the same interpolation as `_AP_INTEGRATORS`, with the areas summed in one batched operation.
+
+    Args:
+        rec (np.ndarray): Array of shape (n_curves, n_dt) of recall values, sorted by descending confidence score
+        prec (np.ndarray): Array of shape (n_curves, n_dt) of precision values, sorted by descending confidence score
+        recall_thresholds (Optional[np.ndarray]): Recall thresholds to sample interpolated precision at, or None for
+            all-point interpolation
+
+    Returns:
+        np.ndarray: Array of shape (n_curves,) of APs
+    """
+    envelope = np.zeros((rec.shape[0], rec.shape[1] + 1))
+    envelope[:, :-1] = np.maximum.accumulate(prec[:, ::-1], axis=1)[:, ::-1]
+    if recall_thresholds is None:
+        # the trailing recall step up to 1 has a precision of 0, so it does not add to the area
+        rec_diffs = np.diff(rec, axis=1, prepend=0.0)
+        return (rec_diffs * envelope[:, :-1]).sum(axis=1)
+    aps = np.empty(rec.shape[0])
+    for idx in range(rec.shape[0]):
+        aps[idx] = np.mean(envelope[idx, np.searchsorted(rec[idx], recall_thresholds, side="left")])
+    return aps
+
+
+def _bootstrap_class(
+    weights: np.ndarray, class_records: ClassRecords, recall_thresholds: Optional[np.ndarray]
+) -> np.ndarray:
+    """Helper function to compute the APs of a class for a batch of resamples, given as image weights. A detection
+    in an image drawn k times counts as k detections in a row, which gives the same interpolated curve as k tied
+    copies of it.
+
+    Args:
+        weights (np.ndarray): Array of shape (n_resamples, n_images) of the number of times each image is drawn
+        class_records (ClassRecords): Records of the class
+        recall_thresholds (Optional[np.ndarray]): Recall thresholds to sample interpolated precision at, or None for
+            all-point interpolation
+
+    Returns:
+        np.ndarray: Array of shape (n_resamples,) of APs, NaN for resamples without ground truths of the class
+    """
+    dt_image_codes, tp, gt_image_codes = class_records
+    gt_counts = weights[:, gt_image_codes].sum(axis=1).astype(np.float64)
+    dt_weights = weights[:, dt_image_codes].astype(np.float64)
+    tp_cumsum = np.cumsum(dt_weights * tp, axis=1)
+    dt_cumsum = np.cumsum(dt_weights, axis=1)
+    # leading detections of images not drawn have no precision, and no recall either
+    prec = np.divide(tp_cumsum, dt_cumsum, out=np.zeros_like(tp_cumsum), where=dt_cumsum > 0)
+    rec = np.divide(tp_cumsum, gt_counts[:, None], out=np.zeros_like(tp_cumsum), where=gt_counts[:, None] > 0)
+    aps = _compute_ap_batch(rec, prec, recall_thresholds)
+    aps[gt_counts == 0] = np.nan
+    return aps
+
+
+def _bootstrap_chunks(
+    task: Tuple[List[ClassRecords], int, List[Tuple[int, np.random.SeedSequence]], Optional[np.ndarray]],
+) -> np.ndarray:
+    """Helper function, run in worker processes if any, to compute the APs of all classes for chunks of resamples.
+    Each chunk draws its image weights from its own seed, so that the resamples do not depend on how chunks are
+    split between workers.
+
+    Args:
+        task (Tuple[List[ClassRecords], int, List[Tuple[int, np.random.SeedSequence]], Optional[np.ndarray]]):
+            Contains records of each class, number of images, number of resamples and seed of each chunk, and
+            recall thresholds of the interpolation mode
+
+    Returns:
+        np.ndarray: Array of shape (n_resamples, n_classes) of APs of the resamples of all chunks
+    """
+    records, n_images, chunks, recall_thresholds = task
+    chunk_aps = []
+    for n_resamples, seed_sequence in chunks:
+        rng = np.random.default_rng(seed_sequence)
+        weights = rng.multinomial(n_images, np.full(n_images, 1.0 / n_images), size=n_resamples)
+        chunk_aps.append(
+            np.stack([_bootstrap_class(weights, class_records, recall_thresholds) for class_records in records], 1)
+        )
+    return np.concatenate(chunk_aps, axis=0)
+
+
+def _build_class_records(dataset: ColumnarDataset, iou_threshold: float, n_workers: int) -> List[ClassRecords]:
+    """Helper function to match all detections once, and to keep the records of each class needed to resample images.
+    Ignored ground truths and the detections they absorb are left out of the records.
+
+    Args:
+        dataset (ColumnarDataset): Columnar dataset containing ground truths and detections
+        iou_threshold (float): IoU threshold to determine if detection is true positive
+        n_workers (int): Number of worker processes to match images in
+
+    Returns:
+        List[ClassRecords]: Records of each class, indexed by class code
+    """
+    gt_matched = np.zeros((1, len(dataset.gt_matched)), dtype=bool)
+    dt_ignored = np.zeros((1, len(dataset.dt_scores)), dtype=bool)
+    arrays = (
+        dataset.dt_coordinates,
+        dataset.dt_scores,
+        dataset.dt_class_codes,
+        dataset.dt_image_codes,
+        dataset.gt_coordinates,
+        dataset.gt_class_codes,
+        dataset.gt_image_codes,
+        np.array([iou_threshold], dtype=np.float64),
+    )
+    if n_workers > 1:
+        tp = _match_detections_parallel(
+            *arrays, gt_matched=gt_matched, n_workers=n_workers, gt_ignore=dataset.gt_ignore, dt_ignored=dt_ignored
+        )[0]
+    else:
+        tp = _match_detections(
+            *arrays,
+            gt_matched=gt_matched,
+            gt_areas=dataset.gt_areas,
+            gt_ignore=dataset.gt_ignore,
+            dt_ignored=dt_ignored,
+        )[0]
+
+    # group detections by class, sorted by descending score; lexsort is stable so ties keep their input order
+    dt_order = np.lexsort((-dataset.dt_scores, dataset.dt_class_codes))
+    dt_order = dt_order[~dt_ignored[0, dt_order]]
+    dt_bounds = np.searchsorted(dataset.dt_class_codes[dt_order], np.arange(dataset.n_classes + 1))
+    gt_order = np.argsort(dataset.gt_class_codes, kind="stable")
+    if dataset.gt_ignore is not None:
+        gt_order = gt_order[~dataset.gt_ignore[gt_order]]
+    gt_bounds = np.searchsorted(dataset.gt_class_codes[gt_order], np.arange(dataset.n_classes + 1))
+    records = []
+    for code in range(dataset.n_classes):
+        dt_start, dt_end = dt_bounds[code], dt_bounds[code + 1]
+        gt_start, gt_end = gt_bounds[code], gt_bounds[code + 1]
+        dt_idxs = dt_order[dt_start:dt_end]
+        records.append(
+            (dataset.dt_image_codes[dt_idxs], tp[dt_idxs], dataset.gt_image_codes[gt_order[gt_start:gt_end]])
+        )
+    return records
+
+
+def compute_bootstrap_intervals(
+    ground_truth_dict_list: Union[List[GroundTruthDict], ColumnarDataset, GroundTruthIndex],
+    detections_dict_list: Optional[Union[List[DetectionsDict], ColumnarDetections]] = None,
+    iou_threshold: float = 0.5,
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    interpolation: str = "voc2012",
+    n_workers: int = 1,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Overall function to compute bootstrap confidence intervals of APs and mAP over images. Detections are matched
+    once, and each resample draws images with replacement; since images are matched independently, the APs of a
+    resample are computed from the matches of the drawn images, reweighted by the number of times each is drawn,
+    without matching again.
+
+    Args:
+        ground_truth_dict_list (Union[List[GroundTruthDict], ColumnarDataset, GroundTruthIndex]): List of dicts
+            containing ground truth coordinates, class labels and file IDs, a `ColumnarDataset` containing both
+            ground truths and detections, or prepared ground truth
+        detections_dict_list (Optional[Union[List[DetectionsDict], ColumnarDetections]], optional): List of dicts
+            containing detection coordinates, class labels, confidence scores and file IDs, or `ColumnarDetections`.
+            Must be None if a `ColumnarDataset` is given. Defaults to None.
+        iou_threshold (float, optional): IoU threshold to determine if detection is true positive. Defaults to 0.5.
+        n_resamples (int, optional): Number of bootstrap resamples. Defaults to 1000.
+        confidence (float, optional): Confidence level of the percentile intervals. Defaults to 0.95.
+        interpolation (str, optional): Interpolation mode, as in `compute_ap_map`. Defaults to "voc2012".
+        n_workers (int, optional): If greater than 1, matching and resamples are split across a pool of `n_workers`
+            processes. Outputs do not depend on the number of workers. Defaults to 1.
+        seed (int, optional): Seed of the resamples. Defaults to 0.
+
+    Returns:
+        Dict[str, Any]: Dict containing (lower, upper) intervals of the AP of each class under "ap" and of mAP under
+            "map", and the mAP of each resample under "map_samples". Resamples without ground truths of a class
+            are left out of its interval, and of the mAP of that resample.
+    """
+    if n_resamples < 1:
+        raise ValueError(f"n_resamples must be at least 1, but got {n_resamples}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, but got {confidence}")
+    if interpolation not in _RECALL_THRESHOLDS:
+        raise ValueError(f"Unknown interpolation {interpolation}, expected one of {list(_RECALL_THRESHOLDS)}")
+    if n_workers < 1:
+        raise ValueError(f"n_workers must be at least 1, but got {n_workers}")
+    if isinstance(ground_truth_dict_list, ColumnarDataset):
+        if detections_dict_list is not None:
+            raise ValueError("detections_dict_list must be None when a ColumnarDataset is given")
+        dataset = ground_truth_dict_list
+    elif detections_dict_list is None:
+        raise ValueError("detections_dict_list is required when ground truth dicts are given")
+    else:
+        dataset = _build_dataset(ground_truth_dict_list, detections_dict_list, None)
+
+    records = _build_class_records(dataset, iou_threshold, n_workers)
+    max_length = max([dataset.n_images] + [len(class_records[0]) for class_records in records])
+    chunk_size = max(1, min(n_resamples, _CHUNK_ELEMENTS // max(max_length, 1)))
+    chunk_sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    chunks = list(zip(chunk_sizes, np.random.SeedSequence(seed).spawn(len(chunk_sizes))))
+    recall_thresholds = _RECALL_THRESHOLDS[interpolation]
+    if n_workers > 1 and len(chunks) > 1:
+        # contiguous groups of chunks keep resamples in the same order as the serial loop
+        chunk_bounds = np.linspace(0, len(chunks), min(n_workers, len(chunks)) + 1).astype(int)
+        tasks = [
+            (records, dataset.n_images, chunks[start:end], recall_thresholds)
+            for start, end in zip(chunk_bounds[:-1], chunk_bounds[1:])
+        ]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            aps = np.concatenate(list(executor.map(_bootstrap_chunks, tasks)), axis=0)
+    else:
+        aps = _bootstrap_chunks((records, dataset.n_images, chunks, recall_thresholds))
+
+    # classes with only ignored ground truths are not evaluated, as in `compute_ap_map`
+    codes = [code for code, class_records in enumerate(records) if len(class_records[2])]
+    aps = aps[:, codes]
+    map_samples = np.nanmean(aps, axis=1)
+    percentiles = [50 * (1 - confidence), 50 * (1 + confidence)]
+    ap_intervals = np.nanpercentile(aps, percentiles, axis=0)
+    map_interval = np.nanpercentile(map_samples, percentiles)
+    return {
+        "ap": {
+            dataset.class_names[code]: (float(ap_intervals[0, idx]), float(ap_intervals[1, idx]))
+            for idx, code in enumerate(codes)
+        },
+        "map": (float(map_interval[0]), float(map_interval[1])),
+        "map_samples": map_samples,
+    }
@@ -0,0 +1,641 @@
+import csv
+import json
+import re
+from array import array
+from itertools import islice
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from obj_det_metrics.columnar import ColumnarDataset
+from obj_det_metrics.variables import ClassName, DetectionsDict, GroundTruthDict
+
+# image codes of shape (n,), label codes of shape (n,), coordinates of shape (n, 4), optional confidence scores and
+# optional ignore flags, with codes indexing into tables of file IDs and class labels shared by ground truths and
+# detections
+BoxColumns = Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]
+
+# number of characters read at a time when streaming JSON files
+_JSON_CHUNK_SIZE = 1 << 20
+# number of rows parsed at a time when reading CSV files
+_CSV_CHUNK_ROWS = 1 << 16
+_CSV_COORDINATE_FIELDS = ["x1", "y1", "x2", "y2"]
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+# characters which may continue a number, e.g. when a chunk boundary falls in the exponent of "1.5e-3"
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class _JsonStream:
+    def __init__(self, f: IO[str], chunk_size: int = _JSON_CHUNK_SIZE) -> None:
+        """Initialize class variables. JSON values are decoded one at a time from a buffer holding a few chunks of
+        the file at most, so that arrays with millions of entries are never loaded as a whole.
+
+        Args:
+            f (IO[str]): JSON file opened in text mode
+            chunk_size (int, optional): Number of characters read at a time. Defaults to _JSON_CHUNK_SIZE.
+        """
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read_chunk(self) -> bool:
+        """Append the next chunk of the file to the buffer, dropping its already decoded part
+
+        Returns:
+            bool: True if a chunk was read, False at the end of the file
+        """
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        start = self._pos
+        self._buffer = self._buffer[start:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespaces and return the next character, without consuming it
+
+        Returns:
+            str: Next non-whitespace character, or an empty string at the end of the file
+        """
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buffer[self._pos]
+            self._pos = len(self._buffer)
+            if not self._read_chunk():
+                return ""
+
+    def expect(self, char: str):
+        """Consume the next non-whitespace character, which must be `char`
+
+        Args:
+            char (str): Expected character
+        """
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON file")
+        self._pos += 1
+
+    def decode_value(self) -> Any:
+        """Decode the next JSON value. Before the end of the file, a value is only accepted if it is followed by a
+        character which cannot continue a number, since a number could be cut by the chunk boundary.
+
+        Returns:
+            Any: Decoded value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                if self._eof or (end < len(self._buffer) and self._buffer[end] not in _NUMBER_CHARS):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read_chunk()
+
+    def _expect_separator(self, closing_char: str) -> bool:
+        """Consume the separator after an item of an array or object
+
+        Args:
+            closing_char (str): Character closing the array or object
+
+        Returns:
+            bool: True if there are more items, False if the array or object is closed
+        """
+        char = self.peek()
+        if char not in (",", closing_char):
+            raise ValueError(f"Expected ',' or '{closing_char}' in JSON file")
+        self._pos += 1
+        return char == ","
+
+    def iter_array(self) -> Iterator[Any]:
+        """Decode the items of the next JSON array one at a time
+
+        Yields:
+            Iterator[Any]: Decoded items
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        has_next = True
+        while has_next:
+            yield self.decode_value()
+            has_next = self._expect_separator("]")
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Decode the keys of the next JSON object. The caller must consume the value of each yielded key, e.g. with
+        `decode_value` or `iter_array`, before requesting the next key.
+
+        Yields:
+            Iterator[str]: Keys of object
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        has_next = True
+        while has_next:
+            key = self.decode_value()
+            self.expect(":")
+            yield key
+            has_next = self._expect_separator("}")
+
+
+def _sort_ranks(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Helper function to stably sort an array of values
+
+    Args:
+        values (np.ndarray): Array of shape (n,) of values
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Contains the sorting order, and the rank of each value in the sorted order
+    """
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return order, ranks
+
+
+class _CodeTable:
+    def __init__(self) -> None:
+        """Initialize class variables. String values are encoded in order of first appearance, one chunk of values
+        at a time, so that columns are kept as integer codes instead of string arrays.
+        """
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, column: np.ndarray) -> np.ndarray:
+        """Encode a column of string values
+
+        Args:
+            column (np.ndarray): Array of shape (n,) of string values
+
+        Returns:
+            np.ndarray: Array of shape (n,) of codes
+        """
+        uniques, inverse = np.unique(column, return_inverse=True)
+        unique_codes = np.empty(len(uniques), dtype=np.int64)
+        for idx, value in enumerate(uniques.tolist()):
+            if value not in self._codes:
+                self._codes[value] = len(self.values)
+                self.values.append(value)
+            unique_codes[idx] = self._codes[value]
+        return unique_codes[inverse.reshape(-1)]
+
+    def sort(self) -> Tuple[List[str], np.ndarray]:
+        """Sort the encoded values
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Contains the sorted values and an array mapping each code to its rank in
+                the sorted values
+        """
+        order, ranks = _sort_ranks(np.array(self.values, dtype=str))
+        return [self.values[idx] for idx in order], ranks
+
+
+def _concatenate(chunks: List[np.ndarray], shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+    """Helper function to concatenate chunks of a column, which may be empty
+
+    Args:
+        chunks (List[np.ndarray]): Chunks of column
+        shape (Tuple[int, ...]): Shape of an empty column
+        dtype (Any): Dtype of column
+
+    Returns:
+        np.ndarray: Concatenated column
+    """
+    return np.concatenate([np.empty(shape, dtype=dtype)] + chunks).astype(dtype)
+
+
+def _iter_csv_chunks(reader: Iterator[List[str]], chunk_rows: int) -> Iterator[List[List[str]]]:
+    """Helper function to group the rows of a CSV reader into chunks, skipping blank rows, e.g. a trailing empty line
+
+    Args:
+        reader (Iterator[List[str]]): CSV reader
+        chunk_rows (int): Number of rows read at a time
+
+    Yields:
+        Iterator[List[List[str]]]: Non-empty chunks of non-blank rows
+    """
+    while True:
+        rows = list(islice(reader, chunk_rows))
+        if not rows:
+            return
+        rows = [row for row in rows if any(field.strip() for field in row)]
+        if rows:
+            yield rows
+
+
+def _read_csv_columns(
+    csv_path: str, file_table: _CodeTable, label_table: _CodeTable, chunk_rows: int = _CSV_CHUNK_ROWS
+) -> BoxColumns:
+    """Helper function to read a CSV file of boxes with a header row. Rows are read in chunks, and each chunk is
+    parsed column-wise as a single string array. File IDs and class labels are encoded through the inputted tables.
+
+    Args:
+        csv_path (str): Path of CSV file, with columns "file_id", "class", "x1", "y1", "x2" and "y2", plus "score"
+            for detections and optionally "ignore" for ground truths
+        file_table (_CodeTable): Table encoding file IDs
+        label_table (_CodeTable): Table encoding class labels
+        chunk_rows (int, optional): Number of rows parsed at a time. Defaults to _CSV_CHUNK_ROWS.
+
+    Returns:
+        BoxColumns: Columns of boxes, with image and label codes given by the tables
+    """
+    # "utf-8-sig" strips the byte order mark of e.g. spreadsheet exports, which would otherwise prefix the first column
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = [field.strip() for field in next(reader, [])]
+        missing_fields = [field for field in ["file_id", "class"] + _CSV_COORDINATE_FIELDS if field not in header]
+        if missing_fields:
+            raise ValueError(f"CSV file {csv_path} is missing columns {missing_fields}")
+        coordinate_idxs = [header.index(field) for field in _CSV_COORDINATE_FIELDS]
+        columns: Dict[str, List[np.ndarray]] = {"image": [], "label": [], "coordinates": [], "score": [], "ignore": []}
+        for rows in _iter_csv_chunks(reader, chunk_rows):
+            try:
+                table = np.array(rows, dtype=str).reshape(len(rows), len(header))
+            except ValueError as error:
+                raise ValueError(f"Rows of CSV file {csv_path} must have {len(header)} fields") from error
+            columns["image"].append(file_table.encode(np.char.strip(table[:, header.index("file_id")])))
+            columns["label"].append(label_table.encode(np.char.strip(table[:, header.index("class")])))
+            columns["coordinates"].append(table[:, coordinate_idxs].astype(np.float64))
+            if "score" in header:
+                columns["score"].append(table[:, header.index("score")].astype(np.float64))
+            if "ignore" in header:
+                ignore_column = np.char.lower(np.char.strip(table[:, header.index("ignore")]))
+                columns["ignore"].append(np.isin(ignore_column, ["1", "true"]))
+    return (
+        _concatenate(columns["image"], (0,), np.int64),
+        _concatenate(columns["label"], (0,), np.int64),
+        _concatenate(columns["coordinates"], (0, 4), np.float64),
+        _concatenate(columns["score"], (0,), np.float64) if "score" in header else None,
+        _concatenate(columns["ignore"], (0,), bool) if "ignore" in header else None,
+    )
+
+
+def _read_csv_pair(gt_csv_path: str, dt_csv_path: str) -> Tuple[List[str], List[str], BoxColumns, BoxColumns]:
+    """Helper function to read CSV files of ground truths and detections with shared tables of file IDs and class
+    labels, sorted so that codes follow the sorted order
+
+    Args:
+        gt_csv_path (str): Path of CSV file of ground truths
+        dt_csv_path (str): Path of CSV file of detections
+
+    Returns:
+        Tuple[List[str], List[str], BoxColumns, BoxColumns]: Contains sorted file IDs, sorted class labels, and
+            columns of ground truths and detections
+    """
+    file_table, label_table = _CodeTable(), _CodeTable()
+    gt_columns = _read_csv_columns(gt_csv_path, file_table, label_table)
+    dt_columns = _read_csv_columns(dt_csv_path, file_table, label_table)
+    if dt_columns[3] is None:
+        raise ValueError(f"CSV file {dt_csv_path} of detections is missing column 'score'")
+    file_ids, file_ranks = file_table.sort()
+    labels, label_ranks = label_table.sort()
+    gt_columns = (file_ranks[gt_columns[0]], label_ranks[gt_columns[1]]) + gt_columns[2:]
+    dt_columns = (file_ranks[dt_columns[0]], label_ranks[dt_columns[1]]) + dt_columns[2:]
+    return file_ids, labels, gt_columns, dt_columns
+
+
+def _read_coco_images(stream: _JsonStream, columns: Dict[str, Any]):
+    """Helper function to stream the "images" array of a COCO annotations file
+
+    Args:
+        stream (_JsonStream): Stream positioned at the array
+        columns (Dict[str, Any]): Typed buffers of annotations file, filled in-memory
+    """
+    for image in stream.iter_array():
+        columns["image_ids"].append(image["id"])
+
+
+def _read_coco_annotation_entries(stream: _JsonStream, columns: Dict[str, Any]):
+    """Helper function to stream the "annotations" array of a COCO annotations file
+
+    Args:
+        stream (_JsonStream): Stream positioned at the array
+        columns (Dict[str, Any]): Typed buffers of annotations file, filled in-memory
+    """
+    for annotation in stream.iter_array():
+        columns["gt_image_ids"].append(annotation["image_id"])
+        columns["gt_category_ids"].append(annotation["category_id"])
+        columns["gt_bboxes"].extend(annotation["bbox"])
+        columns["gt_iscrowd"].append(annotation.get("iscrowd", 0))
+
+
+def _read_coco_categories(stream: _JsonStream, columns: Dict[str, Any]):
+    """Helper function to stream the "categories" array of a COCO annotations file
+
+    Args:
+        stream (_JsonStream): Stream positioned at the array
+        columns (Dict[str, Any]): Typed buffers of annotations file, filled in-memory
+    """
+    for category in stream.iter_array():
+        columns["category_ids"].append(category["id"])
+        columns["category_names"].append(category["name"])
+
+
+_COCO_ARRAY_READERS = {
+    "images": _read_coco_images,
+    "annotations": _read_coco_annotation_entries,
+    "categories": _read_coco_categories,
+}
+
+
+def _read_coco_annotations(annotations_path: str) -> Dict[str, Any]:
+    """Helper function to stream a COCO annotations file into typed buffers, one entry at a time
+
+    Args:
+        annotations_path (str): Path of COCO annotations file
+
+    Returns:
+        Dict[str, Any]: Buffers of image IDs, annotation image IDs, category IDs, boxes and crowd flags, and
+            category IDs and names
+    """
+    columns: Dict[str, Any] = {
+        "image_ids": array("q"),
+        "gt_image_ids": array("q"),
+        "gt_category_ids": array("q"),
+        "gt_bboxes": array("d"),
+        "gt_iscrowd": array("b"),
+        "category_ids": array("q"),
+        "category_names": [],
+    }
+    with open(annotations_path, "r", encoding="utf-8-sig") as f:
+        stream = _JsonStream(f)
+        for key in stream.iter_object_keys():
+            if key in _COCO_ARRAY_READERS:
+                _COCO_ARRAY_READERS[key](stream, columns)
+            else:
+                stream.decode_value()
+    return columns
+
+
+def _read_coco_results(results_path: str) -> Tuple[array, array, array, array]:
+    """Helper function to stream a COCO results file into typed buffers, one entry at a time
+
+    Args:
+        results_path (str): Path of COCO results file, holding an array of detections
+
+    Returns:
+        Tuple[array, array, array, array]: Contains buffers of image IDs, category IDs, flattened boxes and
+            confidence scores
+    """
+    image_ids, category_ids, bboxes, scores = array("q"), array("q"), array("d"), array("d")
+    with open(results_path, "r", encoding="utf-8-sig") as f:
+        for result in _JsonStream(f).iter_array():
+            image_ids.append(result["image_id"])
+            category_ids.append(result["category_id"])
+            bboxes.extend(result["bbox"])
+            scores.append(result["score"])
+    return image_ids, category_ids, bboxes, scores
+
+
+def _coco_bboxes_to_coordinates(bboxes: array) -> np.ndarray:
+    """Helper function to convert flattened COCO boxes [x, y, width, height] to coordinates [xmin, ymin, xmax, ymax].
+    Since coordinates are inclusive pixel indices, xmax is x + width - 1, which keeps the area of boxes.
+
+    Args:
+        bboxes (array): Flattened COCO boxes
+
+    Returns:
+        np.ndarray: Array of shape (n, 4) of coordinates
+    """
+    coordinates = np.frombuffer(bboxes, dtype=np.float64).reshape(-1, 4).copy()
+    coordinates[:, 2:] += coordinates[:, :2] - 1
+    return coordinates
+
+
+def _encode_coco_ids(id_buffer: array, sorted_ids: np.ndarray, ranks: np.ndarray, id_name: str) -> np.ndarray:
+    """Helper function to encode COCO IDs by the rank of their index in an array of known sorted IDs
+
+    Args:
+        id_buffer (array): Buffer of IDs
+        sorted_ids (np.ndarray): Sorted array of known IDs
+        ranks (np.ndarray): Code of each known ID
+        id_name (str): Name of IDs for error messages
+
+    Returns:
+        np.ndarray: Array of shape (n,) of codes
+    """
+    ids = np.frombuffer(id_buffer, dtype=np.int64)
+    idxs = np.minimum(np.searchsorted(sorted_ids, ids), max(len(sorted_ids) - 1, 0))
+    unknown = sorted_ids[idxs] != ids if len(sorted_ids) else np.ones(len(ids), dtype=bool)
+    if unknown.any():
+        raise ValueError(f"{id_name} {ids[unknown][0]} not found in annotations file")
+    return ranks[idxs]
+
+
+def _read_coco_pair(annotations_path: str, results_path: str) -> Tuple[List[str], List[str], BoxColumns, BoxColumns]:
+    """Helper function to read a COCO annotations file and a COCO results file into columns of boxes. File IDs are
+    image IDs as strings, and class labels are category names.
+
+    Args:
+        annotations_path (str): Path of COCO annotations file
+        results_path (str): Path of COCO results file
+
+    Returns:
+        Tuple[List[str], List[str], BoxColumns, BoxColumns]: Contains sorted file IDs, sorted class labels, and
+            columns of ground truths and detections
+    """
+    annotations = _read_coco_annotations(annotations_path)
+    dt_image_ids, dt_category_ids, dt_bboxes, dt_scores = _read_coco_results(results_path)
+
+    # images are sorted by file ID, i.e. by image ID as a string, and categories by name
+    image_ids = np.unique(np.frombuffer(annotations["image_ids"], dtype=np.int64))
+    file_ids_array = image_ids.astype(str)
+    file_order, file_ranks = _sort_ranks(file_ids_array)
+    category_ids = np.frombuffer(annotations["category_ids"], dtype=np.int64)
+    category_order = np.argsort(category_ids, kind="stable")
+    labels_array = np.array(annotations["category_names"], dtype=str)[category_order]
+    label_order, label_ranks = _sort_ranks(labels_array)
+    category_ids = category_ids[category_order]
+
+    gt_columns = (
+        _encode_coco_ids(annotations["gt_image_ids"], image_ids, file_ranks, "Image ID"),
+        _encode_coco_ids(annotations["gt_category_ids"], category_ids, label_ranks, "Category ID"),
+        _coco_bboxes_to_coordinates(annotations["gt_bboxes"]),
+        None,
+        np.frombuffer(annotations["gt_iscrowd"], dtype=np.int8) != 0,
+    )
+    dt_columns = (
+        _encode_coco_ids(dt_image_ids, image_ids, file_ranks, "Image ID"),
+        _encode_coco_ids(dt_category_ids, category_ids, label_ranks, "Category ID"),
+        _coco_bboxes_to_coordinates(dt_bboxes),
+        np.frombuffer(dt_scores, dtype=np.float64).copy(),
+        None,
+    )
+    return file_ids_array[file_order].tolist(), labels_array[label_order].tolist(), gt_columns, dt_columns
+
+
+def _build_dict_list(file_ids: List[str], labels: Sequence[ClassName], columns: BoxColumns) -> List[Dict[str, Any]]:
+    """Helper function to group columns of boxes into one dict per image, with a stable sort on image codes, so that
+    boxes keep their input order within each image
+
+    Args:
+        file_ids (List[str]): File IDs of all images, indexed by image code
+        labels (Sequence[ClassName]): Class labels, indexed by label code
+        columns (BoxColumns): Columns of boxes
+
+    Returns:
+        List[Dict[str, Any]]: One ground truth dict, or detections dict if scores are given, per image
+    """
+    image_codes, label_codes, coordinates, scores, ignore_flags = columns
+    order = np.argsort(image_codes, kind="stable")
+    bounds = np.searchsorted(image_codes[order], np.arange(len(file_ids) + 1))
+    label_list = np.array(labels, dtype=object)[label_codes[order]].tolist()
+    coordinates_list = coordinates[order].tolist()
+    scores_list = None if scores is None else scores[order].tolist()
+    ignore_array = None if ignore_flags is None or not ignore_flags.any() else ignore_flags[order]
+
+    dict_list: List[Dict[str, Any]] = []
+    for image_code, file_id in enumerate(file_ids):
+        start, end = bounds[image_code], bounds[image_code + 1]
+        box_dict: Dict[str, Any] = {
+            "coordinates": coordinates_list[start:end],
+            "class_labels": label_list[start:end],
+            "file_id": file_id,
+        }
+        if scores_list is not None:
+            box_dict["conf_scores"] = scores_list[start:end]
+        if ignore_array is not None and ignore_array[start:end].any():
+            box_dict["ignore_flags"] = ignore_array[start:end].tolist()
+        dict_list.append(box_dict)
+    return dict_list
+
+
+def _build_dataset(
+    file_ids: List[str], labels: List[str], gt_columns: BoxColumns, dt_columns: BoxColumns, dtype: Any
+) -> ColumnarDataset:
+    """Helper function to build a `ColumnarDataset` from columns of ground truths and detections. Boxes are stably
+    sorted by image code, so that they are in the same order as in `ColumnarDataset.from_dicts` on the dicts of
+    `_build_dict_list`. Class codes index into the sorted class labels of ground truth, and detections with a class
+    label not found in ground truth are dropped.
+
+    Args:
+        file_ids (List[str]): Sorted file IDs of all images
+        labels (List[str]): Sorted class labels of ground truths and detections
+        gt_columns (BoxColumns): Columns of ground truths
+        dt_columns (BoxColumns): Columns of detections
+        dtype (Any): Float dtype of coordinates and scores
+
+    Returns:
+        ColumnarDataset: Columnar dataset containing all ground truths and detections
+    """
+    gt_order = np.argsort(gt_columns[0], kind="stable")
+    dt_order = np.argsort(dt_columns[0], kind="stable")
+    gt_image_codes, gt_label_codes, gt_coordinates = (column[gt_order] for column in gt_columns[:3])
+    dt_image_codes, dt_label_codes, dt_coordinates = (column[dt_order] for column in dt_columns[:3])
+    gt_ignore, dt_scores = gt_columns[4], dt_columns[3]
+    # labels are sorted, so the labels found in ground truth keep their sorted order as class codes
+    gt_label_set = np.unique(gt_label_codes)
+    class_codes = np.full(len(labels), -1, dtype=np.int32)
+    class_codes[gt_label_set] = np.arange(len(gt_label_set))
+    dt_class_codes = class_codes[dt_label_codes]
+    keep = dt_class_codes >= 0
+    if dt_scores is None:
+        raise ValueError("Detections have no confidence scores")
+    dt_scores = dt_scores[dt_order]
+
+    dataset = ColumnarDataset(
+        gt_coordinates.astype(dtype),
+        class_codes[gt_label_codes],
+        gt_image_codes.astype(np.int32),
+        dt_coordinates[keep].astype(dtype),
+        dt_scores[keep].astype(dtype),
+        dt_class_codes[keep],
+        dt_image_codes[keep].astype(np.int32),
+        [labels[code] for code in gt_label_set],
+        file_ids,
+    )
+    if gt_ignore is not None and gt_ignore.any():
+        dataset.gt_ignore = gt_ignore[gt_order]
+    return dataset
+
+
+def generate_dict_lists_from_csvs(
+    gt_csv_path: str, dt_csv_path: str
+) -> Tuple[List[GroundTruthDict], List[DetectionsDict]]:
+    """Overall function to read in a CSV file of ground truths and a CSV file of detections, each holding the boxes
+    of all images with one box per row, and group them into one dict per image. Both files need a header row with
+    columns "file_id", "class", "x1", "y1", "x2" and "y2", in any order. Detections also need a "score" column, and
+    ground truths may have an "ignore" column of 0/1 or true/false flags, as with "ignore_flags" in
+    `compute_ap_map`. Since images without boxes have no rows, both lists hold the union of file IDs of both files.
+
+    Args:
+        gt_csv_path (str): Path of CSV file of ground truths
+        dt_csv_path (str): Path of CSV file of detections
+
+    Returns:
+        Tuple[List[GroundTruthDict], List[DetectionsDict]]: Contains lists of ground truth dicts and detections
+            dicts, sorted by file ID
+    """
+    file_ids, labels, gt_columns, dt_columns = _read_csv_pair(gt_csv_path, dt_csv_path)
+    return (
+        _build_dict_list(file_ids, labels, gt_columns),
+        _build_dict_list(file_ids, labels, dt_columns),
+    )
+
+
+def generate_columnar_dataset_from_csvs(gt_csv_path: str, dt_csv_path: str, dtype: Any = np.float32) -> ColumnarDataset:
+    """Overall function to read in a CSV file of ground truths and a CSV file of detections, as in
+    `generate_dict_lists_from_csvs`, straight into a `ColumnarDataset`, without building intermediate dicts
+
+    Args:
+        gt_csv_path (str): Path of CSV file of ground truths
+        dt_csv_path (str): Path of CSV file of detections
+        dtype (Any, optional): Float dtype of coordinates and scores. Defaults to np.float32.
+
+    Returns:
+        ColumnarDataset: Columnar dataset containing all ground truths and detections
+    """
+    return _build_dataset(*_read_csv_pair(gt_csv_path, dt_csv_path), dtype)
+
+
+def generate_dict_lists_from_coco_json(
+    annotations_path: str, results_path: str
+) -> Tuple[List[GroundTruthDict], List[DetectionsDict]]:
+    """Overall function to read in a COCO annotations file and a COCO results file, and group their boxes into one
+    dict per image. Both files are streamed one entry at a time, so that their size in memory is that of compact
+    columns rather than of the whole decoded JSON. File IDs are image IDs as strings, class labels are category
+    names, crowd annotations are flagged in "ignore_flags", and [x, y, width, height] boxes are converted to
+    inclusive [xmin, ymin, xmax, ymax] coordinates.
+
+    Args:
+        annotations_path (str): Path of COCO annotations file, with "images", "annotations" and "categories" arrays
+        results_path (str): Path of COCO results file, holding an array of detections with "image_id",
+            "category_id", "bbox" and "score" fields
+
+    Returns:
+        Tuple[List[GroundTruthDict], List[DetectionsDict]]: Contains lists of ground truth dicts and detections
+            dicts of all images of the annotations file, sorted by file ID
+    """
+    file_ids, labels, gt_columns, dt_columns = _read_coco_pair(annotations_path, results_path)
+    return (
+        _build_dict_list(file_ids, labels, gt_columns),
+        _build_dict_list(file_ids, labels, dt_columns),
+    )
+
+
+def generate_columnar_dataset_from_coco_json(
+    annotations_path: str, results_path: str, dtype: Any = np.float32
+) -> ColumnarDataset:
+    """Overall function to read in a COCO annotations file and a COCO results file, as in
+    `generate_dict_lists_from_coco_json`, straight into a `ColumnarDataset`, without building intermediate dicts
+
+    Args:
+        annotations_path (str): Path of COCO annotations file
+        results_path (str): Path of COCO results file
+        dtype (Any, optional): Float dtype of coordinates and scores. Defaults to np.float32.
+
+    Returns:
+        ColumnarDataset: Columnar dataset containing all ground truths and detections
+    """
+    return _build_dataset(*_read_coco_pair(annotations_path, results_path), dtype)
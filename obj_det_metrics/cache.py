@@ -0,0 +1,94 @@
+import hashlib
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from obj_det_metrics.binary_io import _read_array_file, _write_array_file
+
+# file IDs, class names, class codes, coordinates of shape (n_gt, 4), number of boxes in each file, ignore flags
+GtTable = Tuple[List[str], List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+_CACHE_VERSION = 2
+
+
+def _fingerprint_txt_dir(txt_dir: str) -> str:
+    """Helper function to fingerprint the text files of a directory by their names, sizes and modification times,
+    without reading their contents
+
+    Args:
+        txt_dir (str): Directory containing text files
+
+    Returns:
+        str: Hex digest identifying the current state of the directory
+    """
+    hasher = hashlib.sha256(os.path.realpath(txt_dir).encode("utf-8"))
+    with os.scandir(txt_dir) as entries:
+        txt_entries = sorted(
+            (entry for entry in entries if ".txt" in entry.name.lower() and entry.is_file()), key=lambda e: e.name
+        )
+        for entry in txt_entries:
+            stat = entry.stat()
+            hasher.update(f"\0{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _get_cache_filepath(cache_dir: str, fingerprint: str) -> str:
+    """Helper function to get the path of the cache file of a fingerprint
+
+    Args:
+        cache_dir (str): Directory containing cache files
+        fingerprint (str): Fingerprint of ground truth directory
+
+    Returns:
+        str: Path of cache file
+    """
+    return os.path.join(cache_dir, f"gt_{fingerprint}.odm")
+
+
+def _read_cached_gt_table(cache_dir: str, fingerprint: str) -> Optional[GtTable]:
+    """Helper function to load a cached ground truth table, memory-mapping its arrays
+
+    Args:
+        cache_dir (str): Directory containing cache files
+        fingerprint (str): Fingerprint of ground truth directory
+
+    Returns:
+        Optional[GtTable]: Cached ground truth table, or None if there is no cache file for the fingerprint
+    """
+    filepath = _get_cache_filepath(cache_dir, fingerprint)
+    if not os.path.exists(filepath):
+        return None
+    arrays, metadata = _read_array_file(filepath)
+    if metadata.get("version") != _CACHE_VERSION:
+        return None
+    return (
+        metadata["file_ids"],
+        metadata["class_names"],
+        arrays["class_codes"],
+        arrays["coordinates"],
+        arrays["box_counts"],
+        arrays["ignore_flags"],
+    )
+
+
+def _write_cached_gt_table(cache_dir: str, fingerprint: str, gt_table: GtTable):
+    """Helper function to save a ground truth table to a cache file
+
+    Args:
+        cache_dir (str): Directory containing cache files
+        fingerprint (str): Fingerprint of ground truth directory
+        gt_table (GtTable): Ground truth table to save
+    """
+    file_ids, class_names, class_codes, coordinates, box_counts, ignore_flags = gt_table
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_array_file(
+        _get_cache_filepath(cache_dir, fingerprint),
+        {
+            "class_codes": class_codes,
+            "coordinates": coordinates,
+            "box_counts": box_counts,
+            "ignore_flags": ignore_flags,
+        },
+        {"version": _CACHE_VERSION, "file_ids": file_ids, "class_names": class_names},
+    )
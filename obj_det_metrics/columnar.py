@@ -0,0 +1,396 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from obj_det_metrics.variables import ClassName, DetectionsDict, GroundTruthDict
+
+
+class ColumnarDataset:
+    def __init__(
+        self,
+        gt_coordinates: np.ndarray,
+        gt_class_codes: np.ndarray,
+        gt_image_codes: np.ndarray,
+        dt_coordinates: np.ndarray,
+        dt_scores: np.ndarray,
+        dt_class_codes: np.ndarray,
+        dt_image_codes: np.ndarray,
+        class_names: Sequence[ClassName],
+        file_ids: Sequence[str],
+    ) -> None:
+        """Initialize class variables. Ground truths and detections are stored as contiguous arrays instead of one
+        `BoundingBox` object per box, with class names and file IDs replaced by integer codes indexing into
+        `class_names` and `file_ids`.
+
+        Args:
+            gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates, in the form
+                [xmin, ymin, xmax, ymax]
+            gt_class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+            gt_image_codes (np.ndarray): Array of shape (n_gt,) of ground truth image codes
+            dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates, in the form
+                [xmin, ymin, xmax, ymax]
+            dt_scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+            dt_class_codes (np.ndarray): Array of shape (n_dt,) of detection class codes. Detections with a class
+                code of -1 are ignored
+            dt_image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+            class_names (Sequence[ClassName]): Sorted class names of ground truth, indexed by class code
+            file_ids (Sequence[str]): File IDs of images, indexed by image code
+        """
+        self.gt_coordinates = gt_coordinates
+        self.gt_class_codes = gt_class_codes
+        self.gt_image_codes = gt_image_codes
+        self.dt_coordinates = dt_coordinates
+        self.dt_scores = dt_scores
+        self.dt_class_codes = dt_class_codes
+        self.dt_image_codes = dt_image_codes
+        self.class_names = list(class_names)
+        self.file_ids = list(file_ids)
+        # counterpart of `BoundingBox.matched`, one flag per ground truth box
+        self.gt_matched = np.zeros(len(gt_class_codes), dtype=bool)
+        # precomputed ground truth areas, e.g. set by `GroundTruthIndex`, or None to compute them while matching
+        self.gt_areas: Optional[np.ndarray] = None
+        # flags of ignored ground truths, e.g. crowd regions, or None if no ground truth is ignored
+        self.gt_ignore: Optional[np.ndarray] = None
+        # precomputed number of counted ground truths of each class, e.g. set by `GroundTruthIndex`, or None to count
+        # them while integrating
+        self.gt_counts: Optional[np.ndarray] = None
+
+    @property
+    def n_classes(self) -> int:
+        """Returns number of ground truth classes
+
+        Returns:
+            int: Number of ground truth classes
+        """
+        return len(self.class_names)
+
+    @property
+    def n_images(self) -> int:
+        """Returns number of images
+
+        Returns:
+            int: Number of images
+        """
+        return len(self.file_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Returns total size of the arrays held by the dataset
+
+        Returns:
+            int: Total size in bytes of all arrays
+        """
+        arrays: List[Any] = [
+            self.gt_coordinates,
+            self.gt_class_codes,
+            self.gt_image_codes,
+            self.dt_coordinates,
+            self.dt_scores,
+            self.dt_class_codes,
+            self.dt_image_codes,
+            self.gt_matched,
+        ]
+        if self.gt_ignore is not None:
+            arrays.append(self.gt_ignore)
+        return sum(array.nbytes for array in arrays)
+
+    def select_detections(self, keep: np.ndarray) -> "ColumnarDataset":
+        """Returns a dataset with a subset of the detections. Ground truth arrays, including `gt_matched`, are shared
+        with this dataset.
+
+        Args:
+            keep (np.ndarray): Boolean array of shape (n_dt,) flagging detections to keep
+
+        Returns:
+            ColumnarDataset: Columnar dataset containing all ground truths and the kept detections
+        """
+        dataset = ColumnarDataset(
+            self.gt_coordinates,
+            self.gt_class_codes,
+            self.gt_image_codes,
+            self.dt_coordinates[keep],
+            self.dt_scores[keep],
+            self.dt_class_codes[keep],
+            self.dt_image_codes[keep],
+            self.class_names,
+            self.file_ids,
+        )
+        dataset.gt_matched = self.gt_matched
+        dataset.gt_areas = self.gt_areas
+        dataset.gt_ignore = self.gt_ignore
+        dataset.gt_counts = self.gt_counts
+        return dataset
+
+    @classmethod
+    def from_dicts(
+        cls,
+        ground_truth_dict_list: List[GroundTruthDict],
+        detections_dict_list: List[DetectionsDict],
+        dtype: Any = np.float32,
+        class_names: Optional[Sequence[ClassName]] = None,
+    ) -> "ColumnarDataset":
+        """Build a columnar dataset once from lists of ground truth and detections dicts. Detections with a class
+        label not found in ground truth (or in `class_names`, if given) are dropped, since they never contribute to
+        any AP.
+
+        Coordinates and scores are stored as float32 by default. Integer pixel coordinates are exact in float32, but
+        float coordinates, or confidence scores that only differ beyond float32 precision, may give slightly
+        different APs from the dict inputs. Pass `dtype=np.float64` to keep full precision.
+
+        Args:
+            ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+                class labels and file IDs
+            detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
+                class labels, confidence scores and file IDs
+            dtype (Any, optional): Float dtype of coordinates and scores. Defaults to np.float32.
+            class_names (Optional[Sequence[ClassName]], optional): Class names to encode, in place of the sorted class
+                labels of ground truth. Must include every ground truth class label. Defaults to None.
+
+        Returns:
+            ColumnarDataset: Columnar dataset containing all ground truths and detections
+        """
+        gt_file_ids = set([gt_dict["file_id"] for gt_dict in ground_truth_dict_list])
+        dt_file_ids = set([dt_dict["file_id"] for dt_dict in detections_dict_list])
+        for gt_dict in ground_truth_dict_list:
+            # check if there is a corresponding detection-results file id
+            if gt_dict["file_id"] not in dt_file_ids:
+                raise ValueError(f"File ID {gt_dict['file_id']} not found in detections list")
+        for dt_dict in detections_dict_list:
+            # check if there is a corresponding ground truth file id
+            if dt_dict["file_id"] not in gt_file_ids:
+                raise ValueError(f"File ID {dt_dict['file_id']} not found in ground truth list")
+
+        if class_names is None:
+            class_names = sorted(set(label for gt_dict in ground_truth_dict_list for label in gt_dict["class_labels"]))
+        class_codes = {class_name: code for code, class_name in enumerate(class_names)}
+        file_ids = sorted(gt_file_ids)
+        file_codes = {file_id: code for code, file_id in enumerate(file_ids)}
+
+        gt_coordinates, gt_class_codes, gt_image_codes = _build_gt_arrays(
+            ground_truth_dict_list, class_codes, file_codes, dtype
+        )
+        dt_coordinates, dt_scores, dt_class_codes, dt_image_codes = _build_dt_arrays(
+            detections_dict_list, class_codes, file_codes, dtype
+        )
+        keep = dt_class_codes >= 0
+        if not keep.all():
+            dt_coordinates, dt_scores = dt_coordinates[keep], dt_scores[keep]
+            dt_class_codes, dt_image_codes = dt_class_codes[keep], dt_image_codes[keep]
+
+        dataset = cls(
+            gt_coordinates,
+            gt_class_codes,
+            gt_image_codes,
+            dt_coordinates,
+            dt_scores,
+            dt_class_codes,
+            dt_image_codes,
+            class_names,
+            file_ids,
+        )
+        dataset.gt_ignore = _build_gt_ignore(ground_truth_dict_list)
+        return dataset
+
+    @classmethod
+    def from_detections(
+        cls, ground_truth_dict_list: List[GroundTruthDict], detections: "ColumnarDetections"
+    ) -> "ColumnarDataset":
+        """Build a columnar dataset from a list of ground truth dicts and columnar detections. The detection
+        coordinates and scores are used as they are, so memory-mapped detections are not copied into memory, and only
+        the class and image codes are re-encoded when their tables differ from those of ground truth. Detections with
+        a class label not found in ground truth get a class code of -1 instead of being dropped, and are ignored.
+
+        Args:
+            ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+                class labels and file IDs
+            detections (ColumnarDetections): Columnar detections
+
+        Returns:
+            ColumnarDataset: Columnar dataset containing all ground truths and detections
+        """
+        gt_file_ids = set([gt_dict["file_id"] for gt_dict in ground_truth_dict_list])
+        dt_file_ids = set(detections.file_ids)
+        for file_id in gt_file_ids:
+            # check if there is a corresponding detection-results file id
+            if file_id not in dt_file_ids:
+                raise ValueError(f"File ID {file_id} not found in detections list")
+        for file_id in detections.file_ids:
+            # check if there is a corresponding ground truth file id
+            if file_id not in gt_file_ids:
+                raise ValueError(f"File ID {file_id} not found in ground truth list")
+
+        class_names = sorted(set(label for gt_dict in ground_truth_dict_list for label in gt_dict["class_labels"]))
+        class_codes = {class_name: code for code, class_name in enumerate(class_names)}
+        file_ids = sorted(gt_file_ids)
+        file_codes = {file_id: code for code, file_id in enumerate(file_ids)}
+        gt_coordinates, gt_class_codes, gt_image_codes = _build_gt_arrays(
+            ground_truth_dict_list, class_codes, file_codes, detections.coordinates.dtype
+        )
+
+        dt_class_codes = detections.class_codes
+        if detections.class_names != class_names:
+            class_code_map = np.array([class_codes.get(name, -1) for name in detections.class_names], dtype=np.int32)
+            dt_class_codes = class_code_map[dt_class_codes]
+        dt_image_codes = detections.image_codes
+        if detections.file_ids != file_ids:
+            image_code_map = np.array([file_codes[file_id] for file_id in detections.file_ids], dtype=np.int32)
+            dt_image_codes = image_code_map[dt_image_codes]
+
+        dataset = cls(
+            gt_coordinates,
+            gt_class_codes,
+            gt_image_codes,
+            detections.coordinates,
+            detections.scores,
+            dt_class_codes,
+            dt_image_codes,
+            class_names,
+            file_ids,
+        )
+        dataset.gt_ignore = _build_gt_ignore(ground_truth_dict_list)
+        return dataset
+
+
+def _build_gt_arrays(
+    ground_truth_dict_list: List[GroundTruthDict],
+    class_codes: Dict[ClassName, int],
+    file_codes: Dict[str, int],
+    dtype: Any,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Helper function to fill preallocated arrays of ground truth coordinates, class codes and image codes from a
+    list of ground truth dicts
+
+    Args:
+        ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+            class labels and file IDs
+        class_codes (Dict[ClassName, int]): Dict mapping each class name to its code
+        file_codes (Dict[str, int]): Dict mapping each file ID to its image code
+        dtype (Any): Float dtype of coordinates
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Contains coordinates, class codes and image codes
+    """
+    n_gt = sum(len(gt_dict["class_labels"]) for gt_dict in ground_truth_dict_list)
+    gt_coordinates = np.empty((n_gt, 4), dtype=dtype)
+    gt_class_codes = np.empty(n_gt, dtype=np.int32)
+    gt_image_codes = np.empty(n_gt, dtype=np.int32)
+    start = 0
+    for gt_dict in ground_truth_dict_list:
+        end = start + len(gt_dict["class_labels"])
+        if end > start:
+            gt_coordinates[start:end] = gt_dict["coordinates"]
+            gt_class_codes[start:end] = [class_codes[label] for label in gt_dict["class_labels"]]
+            gt_image_codes[start:end] = file_codes[gt_dict["file_id"]]
+        start = end
+    return gt_coordinates, gt_class_codes, gt_image_codes
+
+
+def _build_gt_ignore(ground_truth_dict_list: List[GroundTruthDict]) -> Optional[np.ndarray]:
+    """Helper function to gather the optional `ignore_flags` of ground truth dicts into one array, aligned with the
+    arrays of `_build_gt_arrays`. Dicts without the key have no ignored ground truth.
+
+    Args:
+        ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+            class labels, file IDs and optionally ignore flags
+
+    Returns:
+        Optional[np.ndarray]: Boolean array of shape (n_gt,) flagging ignored ground truths, or None if none is ignored
+    """
+    if not any(np.any(gt_dict.get("ignore_flags", False)) for gt_dict in ground_truth_dict_list):
+        return None
+    gt_ignore = np.zeros(sum(len(gt_dict["class_labels"]) for gt_dict in ground_truth_dict_list), dtype=bool)
+    start = 0
+    for gt_dict in ground_truth_dict_list:
+        end = start + len(gt_dict["class_labels"])
+        if "ignore_flags" in gt_dict and end > start:
+            gt_ignore[start:end] = gt_dict["ignore_flags"]
+        start = end
+    return gt_ignore
+
+
+def _build_dt_arrays(
+    detections_dict_list: List[DetectionsDict],
+    class_codes: Dict[ClassName, int],
+    file_codes: Dict[str, int],
+    dtype: Any,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Helper function to fill preallocated arrays of detection coordinates, confidence scores, class codes and image
+    codes from a list of detections dicts. Class labels not found in `class_codes` get a class code of -1.
+
+    Args:
+        detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
+            class labels, confidence scores and file IDs
+        class_codes (Dict[ClassName, int]): Dict mapping each class name to its code
+        file_codes (Dict[str, int]): Dict mapping each file ID to its image code
+        dtype (Any): Float dtype of coordinates and scores
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Contains coordinates, confidence scores, class codes
+            and image codes
+    """
+    n_dt = sum(len(dt_dict["class_labels"]) for dt_dict in detections_dict_list)
+    dt_coordinates = np.empty((n_dt, 4), dtype=dtype)
+    dt_scores = np.empty(n_dt, dtype=dtype)
+    dt_class_codes = np.empty(n_dt, dtype=np.int32)
+    dt_image_codes = np.empty(n_dt, dtype=np.int32)
+    start = 0
+    for dt_dict in detections_dict_list:
+        end = start + len(dt_dict["class_labels"])
+        if end > start:
+            dt_coordinates[start:end] = dt_dict["coordinates"]
+            dt_scores[start:end] = dt_dict["conf_scores"]
+            dt_class_codes[start:end] = [class_codes.get(label, -1) for label in dt_dict["class_labels"]]
+            dt_image_codes[start:end] = file_codes[dt_dict["file_id"]]
+        start = end
+    return dt_coordinates, dt_scores, dt_class_codes, dt_image_codes
+
+
+class ColumnarDetections:
+    def __init__(
+        self,
+        coordinates: np.ndarray,
+        scores: np.ndarray,
+        class_codes: np.ndarray,
+        image_codes: np.ndarray,
+        class_names: Sequence[ClassName],
+        file_ids: Sequence[str],
+    ) -> None:
+        """Initialize class variables. Detections alone are stored as contiguous arrays, with their own tables of
+        class names and file IDs, e.g. as read from a detections file. The arrays may be memory-mapped.
+
+        Args:
+            coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates, in the form
+                [xmin, ymin, xmax, ymax]
+            scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+            class_codes (np.ndarray): Array of shape (n_dt,) of detection class codes, indexing into `class_names`
+            image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes, indexing into `file_ids`
+            class_names (Sequence[ClassName]): Class names, indexed by class code
+            file_ids (Sequence[str]): File IDs of all images, including those without detections
+        """
+        self.coordinates = coordinates
+        self.scores = scores
+        self.class_codes = class_codes
+        self.image_codes = image_codes
+        self.class_names = list(class_names)
+        self.file_ids = list(file_ids)
+
+    @classmethod
+    def from_dicts(cls, detections_dict_list: List[DetectionsDict], dtype: Any = np.float32) -> "ColumnarDetections":
+        """Build columnar detections from a list of detections dicts, keeping the input order. Class names and file
+        IDs are encoded in order of first appearance.
+
+        Args:
+            detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
+                class labels, confidence scores and file IDs
+            dtype (Any, optional): Float dtype of coordinates and scores. Defaults to np.float32.
+
+        Returns:
+            ColumnarDetections: Columnar detections
+        """
+        class_names = list(
+            dict.fromkeys(label for dt_dict in detections_dict_list for label in dt_dict["class_labels"])
+        )
+        file_ids = list(dict.fromkeys(dt_dict["file_id"] for dt_dict in detections_dict_list))
+        class_codes = {class_name: code for code, class_name in enumerate(class_names)}
+        file_codes = {file_id: code for code, file_id in enumerate(file_ids)}
+        return cls(*_build_dt_arrays(detections_dict_list, class_codes, file_codes, dtype), class_names, file_ids)
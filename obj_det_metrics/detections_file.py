@@ -0,0 +1,71 @@
+from typing import Any, List, Union
+
+import numpy as np
+
+from obj_det_metrics.binary_io import _read_array_file, _write_array_file
+from obj_det_metrics.columnar import ColumnarDetections
+from obj_det_metrics.variables import DetectionsDict
+
+_FORMAT_NAME = "detections"
+_FORMAT_VERSION = 1
+
+
+def write_detections_file(
+    filepath: str, detections: Union[List[DetectionsDict], ColumnarDetections], dtype: Any = np.float32
+):
+    """Overall function to write detections to a single binary file, holding packed arrays of coordinates, confidence
+    scores, class codes and image codes, plus a string table of class names and file IDs. Detections keep their input
+    order.
+
+    Coordinates and scores of dicts are stored as float32 by default. Integer pixel coordinates are exact in float32,
+    but float coordinates, or confidence scores that only differ beyond float32 precision, may give slightly different
+    APs from the dict inputs, since such scores become tied. Pass `dtype=np.float64` to keep full precision, so that
+    evaluating the file gives the same outputs as evaluating the dicts.
+
+    Args:
+        filepath (str): Path of file to write
+        detections (Union[List[DetectionsDict], ColumnarDetections]): List of dicts containing detection coordinates,
+            class labels, confidence scores and file IDs, or columnar detections
+        dtype (Any, optional): Float dtype of coordinates and scores, if dicts are given. Defaults to np.float32.
+    """
+    if not isinstance(detections, ColumnarDetections):
+        detections = ColumnarDetections.from_dicts(detections, dtype=dtype)
+    _write_array_file(
+        filepath,
+        {
+            "coordinates": detections.coordinates,
+            "scores": detections.scores,
+            "class_codes": detections.class_codes.astype(np.int32),
+            "image_codes": detections.image_codes.astype(np.int32),
+        },
+        {
+            "format": _FORMAT_NAME,
+            "version": _FORMAT_VERSION,
+            "class_names": detections.class_names,
+            "file_ids": detections.file_ids,
+        },
+    )
+
+
+def read_detections_file(filepath: str, mmap: bool = True) -> ColumnarDetections:
+    """Overall function to read detections from a file written by `write_detections_file`. By default the arrays are
+    memory-mapped with `numpy.memmap`, so pages are only read from disk when evaluation touches them.
+
+    Args:
+        filepath (str): Path of file to read
+        mmap (bool, optional): Flag to memory-map the arrays instead of reading them into memory. Defaults to True.
+
+    Returns:
+        ColumnarDetections: Columnar detections, which can be passed to `compute_ap_map` with ground truth dicts
+    """
+    arrays, metadata = _read_array_file(filepath, mmap=mmap)
+    if metadata.get("format") != _FORMAT_NAME or metadata.get("version") != _FORMAT_VERSION:
+        raise ValueError(f"{filepath} is not a detections file of version {_FORMAT_VERSION}")
+    return ColumnarDetections(
+        arrays["coordinates"],
+        arrays["scores"],
+        arrays["class_codes"],
+        arrays["image_codes"],
+        metadata["class_names"],
+        metadata["file_ids"],
+    )
@@ -0,0 +1,290 @@
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from obj_det_metrics.ap_map import _average_outputs_dicts, _compute_outputs_dicts
+from obj_det_metrics.columnar import ColumnarDataset
+from obj_det_metrics.utils import _match_detections
+from obj_det_metrics.variables import (
+    ClassName,
+    DetectionsDict,
+    GroundTruthDict,
+    OutputsDict,
+)
+
+
+def _keep_threshold_tps(
+    class_tps: List[np.ndarray], class_ignored: List[Optional[np.ndarray]], thr_idx: int
+) -> List[np.ndarray]:
+    """Helper function to take the true positive flags of a single IoU threshold, leaving out the detections absorbed
+    by an ignored ground truth at that threshold
+
+    Args:
+        class_tps (List[np.ndarray]): Boolean arrays of shape (n_thr, n_dt) flagging true positive detections of each
+            class
+        class_ignored (List[Optional[np.ndarray]]): Boolean arrays of shape (n_thr, n_dt) flagging ignored detections
+            of each class, or None for classes without any
+        thr_idx (int): Index of IoU threshold
+
+    Returns:
+        List[np.ndarray]: Boolean arrays of shape (1, n_kept) flagging true positive detections of each class
+    """
+    threshold_tps = []
+    for tps, ignored in zip(class_tps, class_ignored):
+        kept = np.ones(tps.shape[1], dtype=bool) if ignored is None else ~ignored[thr_idx]
+        threshold_tps.append(tps[thr_idx, kept][None, :])
+    return threshold_tps
+
+
+class APEvaluator:
+    def __init__(self, iou_threshold: float = 0.5, iou_thresholds: Optional[Sequence[float]] = None) -> None:
+        """Initialize class variables. The evaluator accumulates ground truths and detections batch by batch with
+        `update`, matching each batch immediately and keeping only compact per-class records of confidence scores and
+        true positive flags, so raw detections do not need to be held for the whole dataset. `compute` can be called
+        at any time to get the APs and mAP of all batches seen so far.
+
+        Args:
+            iou_threshold (float, optional): IoU threshold to determine if detection is true positive. Defaults to 0.5.
+            iou_thresholds (Optional[Sequence[float]], optional): If given, overrides `iou_threshold`, and all
+                thresholds are evaluated in a single matching pass, as in `compute_ap_map`. Defaults to None.
+        """
+        if iou_thresholds is not None and len(iou_thresholds) == 0:
+            raise ValueError("iou_thresholds must contain at least one threshold")
+        self._iou_thresholds = list(iou_thresholds) if iou_thresholds is not None else [iou_threshold]
+        self._multi_threshold = iou_thresholds is not None
+        self.reset()
+
+    def reset(self):
+        """Method to clear all accumulated records"""
+        self._gt_counts: Dict[ClassName, int] = defaultdict(lambda: 0)
+        self._scores: Dict[ClassName, List[np.ndarray]] = defaultdict(lambda: [])
+        self._tps: Dict[ClassName, List[np.ndarray]] = defaultdict(lambda: [])
+        # flags of detections absorbed by an ignored ground truth, parallel to `_tps`, or None for chunks without any
+        self._ignored: Dict[ClassName, List[Optional[np.ndarray]]] = defaultdict(lambda: [])
+        self._file_ids: Set[str] = set()
+
+    def update(self, ground_truth_dict_list: List[GroundTruthDict], detections_dict_list: List[DetectionsDict]):
+        """Method to match a batch of images and accumulate their records. Each batch must contain both the ground
+        truths and the detections of its images, and an image must not appear in more than one batch. Ignored ground
+        truths (see `compute_ap_map`) are not counted, and the detections they absorb are flagged in the records, per
+        threshold, to be left out of the precision/recall curves.
+
+        Args:
+            ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+                class labels and file IDs
+            detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
+                class labels, confidence scores and file IDs
+        """
+        batch_file_ids = set([gt_dict["file_id"] for gt_dict in ground_truth_dict_list])
+        repeated_file_ids = batch_file_ids & self._file_ids
+        if repeated_file_ids:
+            raise ValueError(f"File ID(s) {sorted(repeated_file_ids)} already found in a previous batch")
+
+        # detections of classes without ground truth in this batch are kept, since later batches may have some
+        batch_classes = list(
+            dict.fromkeys(
+                label
+                for dict_list in (ground_truth_dict_list, detections_dict_list)
+                for input_dict in dict_list
+                for label in input_dict["class_labels"]
+            )
+        )
+        dataset = ColumnarDataset.from_dicts(
+            ground_truth_dict_list, detections_dict_list, dtype=np.float64, class_names=batch_classes
+        )
+        dt_ignored = None
+        if dataset.gt_ignore is not None:
+            dt_ignored = np.zeros((len(self._iou_thresholds), len(dataset.dt_scores)), dtype=bool)
+        tp = _match_detections(
+            dataset.dt_coordinates,
+            dataset.dt_scores,
+            dataset.dt_class_codes,
+            dataset.dt_image_codes,
+            dataset.gt_coordinates,
+            dataset.gt_class_codes,
+            dataset.gt_image_codes,
+            np.asarray(self._iou_thresholds, dtype=np.float64),
+            gt_ignore=dataset.gt_ignore,
+            dt_ignored=dt_ignored,
+        )
+
+        counted_gt_class_codes = dataset.gt_class_codes
+        if dataset.gt_ignore is not None:
+            counted_gt_class_codes = counted_gt_class_codes[~dataset.gt_ignore]
+        gt_count_per_class = np.bincount(counted_gt_class_codes, minlength=len(batch_classes))
+        dt_order = np.argsort(dataset.dt_class_codes, kind="stable")
+        class_bounds = np.searchsorted(dataset.dt_class_codes[dt_order], np.arange(len(batch_classes) + 1))
+        for code, class_name in enumerate(batch_classes):
+            if gt_count_per_class[code] > 0:
+                self._gt_counts[class_name] += int(gt_count_per_class[code])
+            start, end = class_bounds[code], class_bounds[code + 1]
+            if end > start:
+                dt_idxs = dt_order[start:end]
+                self._scores[class_name].append(dataset.dt_scores[dt_idxs])
+                self._tps[class_name].append(tp[:, dt_idxs])
+                self._ignored[class_name].append(None if dt_ignored is None else dt_ignored[:, dt_idxs])
+        self._file_ids.update(batch_file_ids)
+
+    def update_from_pairs(self, dict_pairs: Iterable[Tuple[GroundTruthDict, DetectionsDict]], batch_size: int = 256):
+        """Method to match the images of an iterable, e.g. a lazy reader such as
+        `ingest.iter_paired_dicts_from_txts`, in batches of `batch_size` images. Only one batch of dicts is held at a
+        time, so memory does not grow with the number of images beyond the compact records.
+
+        Args:
+            dict_pairs (Iterable[Tuple[GroundTruthDict, DetectionsDict]]): Ground truth and detections dicts of each
+                image
+            batch_size (int, optional): Number of images in each batch. Defaults to 256.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, but got {batch_size}")
+        iterator = iter(dict_pairs)
+        batch = list(islice(iterator, batch_size))
+        while batch:
+            self.update([gt_dict for gt_dict, _ in batch], [dt_dict for _, dt_dict in batch])
+            batch = list(islice(iterator, batch_size))
+
+    def _consolidate(self, class_name: ClassName):
+        """Helper method to merge the records of a class into a single chunk sorted by descending confidence score.
+        The sort is stable, so detections with equal scores stay in the order they were added.
+
+        Args:
+            class_name (ClassName): Class name of records to merge
+        """
+        tp_chunks, ignored_chunks = self._tps[class_name], self._ignored[class_name]
+        scores = np.concatenate(self._scores[class_name])
+        tps = np.concatenate(tp_chunks, axis=1)
+        order = np.argsort(-scores, kind="stable")
+        self._scores[class_name] = [scores[order]]
+        self._tps[class_name] = [tps[:, order]]
+        if all(chunk is None for chunk in ignored_chunks):
+            self._ignored[class_name] = [None]
+        else:
+            ignored = np.concatenate(
+                [np.zeros_like(tp) if chunk is None else chunk for tp, chunk in zip(tp_chunks, ignored_chunks)], axis=1
+            )
+            self._ignored[class_name] = [ignored[:, order]]
+
+    def compute(self) -> OutputsDict:
+        """Method to compute APs and mAP of all batches seen so far. When batches are slices of the same dict lists,
+        the outputs are identical to those of `compute_ap_map`.
+
+        Returns:
+            OutputsDict: Dict containing APs for each class, and mAP
+        """
+        class_names = sorted(self._gt_counts)
+        gt_counts = [self._gt_counts[name] for name in class_names]
+        class_tps, class_ignored = [], []
+        for class_name in class_names:
+            if self._tps[class_name]:
+                self._consolidate(class_name)
+                class_tps.append(self._tps[class_name][0])
+                class_ignored.append(self._ignored[class_name][0])
+            else:
+                class_tps.append(np.zeros((len(self._iou_thresholds), 0), dtype=bool))
+                class_ignored.append(None)
+        if all(ignored is None for ignored in class_ignored):
+            outputs_dict_list = _compute_outputs_dicts(class_names, gt_counts, class_tps)
+        else:
+            # absorbed detections differ between thresholds, so each threshold gets its own precision/recall curves
+            outputs_dict_list = [
+                _compute_outputs_dicts(class_names, gt_counts, _keep_threshold_tps(class_tps, class_ignored, thr_idx))[
+                    0
+                ]
+                for thr_idx in range(len(self._iou_thresholds))
+            ]
+        if not self._multi_threshold:
+            return outputs_dict_list[0]
+        return _average_outputs_dicts(self._iou_thresholds, outputs_dict_list)
+
+    def merge(self, other: "APEvaluator") -> "APEvaluator":
+        """Method to merge the records of another evaluator into this one, e.g. the state of another inference
+        shard. Merging is associative, and detections with equal scores are ordered with this evaluator's records
+        first, so merging shards in their original order gives outputs identical to a single evaluator fed with all
+        batches.
+
+        Args:
+            other (APEvaluator): Evaluator whose records are merged in. It is left unchanged.
+
+        Returns:
+            APEvaluator: This evaluator, after merging
+        """
+        if other._iou_thresholds != self._iou_thresholds or other._multi_threshold != self._multi_threshold:
+            raise ValueError("Cannot merge evaluators with different IoU thresholds")
+        repeated_file_ids = self._file_ids & other._file_ids
+        if repeated_file_ids:
+            raise ValueError(f"File ID(s) {sorted(repeated_file_ids)} found in both evaluators")
+        for class_name, gt_count in other._gt_counts.items():
+            self._gt_counts[class_name] += gt_count
+        for class_name in list(other._tps):
+            self._scores[class_name].extend(other._scores[class_name])
+            self._tps[class_name].extend(other._tps[class_name])
+            self._ignored[class_name].extend(other._ignored[class_name])
+        self._file_ids.update(other._file_ids)
+        return self
+
+    def to_bytes(self) -> bytes:
+        """Method to serialize the records into a compact blob, which can be sent to another process or node and
+        loaded with `from_bytes`. Records of each class are stored sorted by descending confidence score, with true
+        positive flags packed into bits.
+
+        Returns:
+            bytes: Serialized records
+        """
+        class_names = [class_name for class_name in self._tps if self._tps[class_name]]
+        arrays: Dict[str, Any] = {}
+        for idx, class_name in enumerate(class_names):
+            self._consolidate(class_name)
+            arrays[f"scores_{idx}"] = self._scores[class_name][0]
+            arrays[f"tps_{idx}"] = np.packbits(self._tps[class_name][0], axis=1)
+            ignored = self._ignored[class_name][0]
+            if ignored is not None:
+                arrays[f"ignored_{idx}"] = np.packbits(ignored, axis=1)
+        header = {
+            "iou_thresholds": self._iou_thresholds,
+            "multi_threshold": self._multi_threshold,
+            "gt_counts": list(self._gt_counts.items()),
+            "class_names": class_names,
+            "file_ids": sorted(self._file_ids),
+        }
+        arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "APEvaluator":
+        """Load an evaluator from records serialized with `to_bytes`
+
+        Args:
+            blob (bytes): Serialized records
+
+        Returns:
+            APEvaluator: Evaluator holding the deserialized records
+        """
+        with np.load(io.BytesIO(blob), allow_pickle=False) as arrays:
+            header = json.loads(arrays["header"].tobytes().decode("utf-8"))
+            if header["multi_threshold"]:
+                evaluator = cls(iou_thresholds=header["iou_thresholds"])
+            else:
+                evaluator = cls(iou_threshold=header["iou_thresholds"][0])
+            for class_name, gt_count in header["gt_counts"]:
+                evaluator._gt_counts[class_name] = gt_count
+            for idx, class_name in enumerate(header["class_names"]):
+                scores = arrays[f"scores_{idx}"]
+                evaluator._scores[class_name] = [scores]
+                evaluator._tps[class_name] = [
+                    np.unpackbits(arrays[f"tps_{idx}"], axis=1, count=len(scores)).astype(bool)
+                ]
+                evaluator._ignored[class_name] = [
+                    (
+                        np.unpackbits(arrays[f"ignored_{idx}"], axis=1, count=len(scores)).astype(bool)
+                        if f"ignored_{idx}" in arrays
+                        else None
+                    )
+                ]
+            evaluator._file_ids = set(header["file_ids"])
+        return evaluator
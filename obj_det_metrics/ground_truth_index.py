@@ -0,0 +1,202 @@
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from obj_det_metrics.columnar import (
+    ColumnarDataset,
+    ColumnarDetections,
+    _build_dt_arrays,
+    _build_gt_arrays,
+    _build_gt_ignore,
+)
+from obj_det_metrics.variables import ClassName, DetectionsDict, GroundTruthDict
+
+# number of prepared ground truths kept by `GroundTruthIndex.from_dicts(..., use_cache=True)`
+_INDEX_CACHE_SIZE = 8
+# cached indexes keyed by the id of their list of ground truth dicts, with the list itself and its signature
+_index_cache: "OrderedDict[int, Tuple[List[GroundTruthDict], Tuple[Any, ...], GroundTruthIndex]]" = OrderedDict()
+
+
+class GroundTruthIndex:
+    def __init__(
+        self,
+        coordinates: np.ndarray,
+        class_codes: np.ndarray,
+        image_codes: np.ndarray,
+        class_names: Sequence[ClassName],
+        file_ids: Sequence[str],
+        ignore_flags: Optional[np.ndarray] = None,
+    ) -> None:
+        """Initialize class variables. Ground truths are prepared once, to evaluate any number of detection sets
+        against them with `compute_ap_map`: boxes are stored as float64 arrays grouped by image, together with their
+        areas and the number of boxes of each class. The index is never modified by evaluation, since each
+        evaluation tracks matched ground truths in a fresh array.
+
+        Args:
+            coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates, in the form
+                [xmin, ymin, xmax, ymax]
+            class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+            image_codes (np.ndarray): Array of shape (n_gt,) of ground truth image codes
+            class_names (Sequence[ClassName]): Sorted class names of ground truth, indexed by class code
+            file_ids (Sequence[str]): File IDs of images, indexed by image code
+            ignore_flags (Optional[np.ndarray], optional): Boolean array of shape (n_gt,) flagging ignored ground
+                truths, e.g. crowd regions, which are not counted in `gt_counts`. Defaults to None.
+        """
+        # a stable sort keeps the input order of ground truths within each image, which breaks ties between them
+        order = np.argsort(image_codes, kind="stable")
+        self.coordinates = np.ascontiguousarray(coordinates[order], dtype=np.float64)
+        self.class_codes = class_codes[order].astype(np.int32)
+        self.image_codes = image_codes[order].astype(np.int32)
+        self.areas = (self.coordinates[:, 2] - self.coordinates[:, 0] + 1) * (
+            self.coordinates[:, 3] - self.coordinates[:, 1] + 1
+        )
+        self.class_names = list(class_names)
+        self.file_ids = list(file_ids)
+        self.ignore_flags = None if ignore_flags is None else ignore_flags[order].astype(bool)
+        counted_class_codes = self.class_codes if self.ignore_flags is None else self.class_codes[~self.ignore_flags]
+        self.gt_counts = np.bincount(counted_class_codes, minlength=len(self.class_names))
+        self._class_codes = {class_name: code for code, class_name in enumerate(self.class_names)}
+        self._file_codes = {file_id: code for code, file_id in enumerate(self.file_ids)}
+
+    @classmethod
+    def from_dicts(cls, ground_truth_dict_list: List[GroundTruthDict], use_cache: bool = False) -> "GroundTruthIndex":
+        """Prepare ground truth from a list of ground truth dicts
+
+        Args:
+            ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+                class labels and file IDs
+            use_cache (bool, optional): Flag to look up the index in a cache of recently prepared ground truths,
+                keyed by the identity of the list, and to add it there if it is not found. Replacing a dict or one of
+                its fields, or changing their lengths, invalidates the cached index, but editing coordinates or
+                labels in place does not: call `clear_ground_truth_index_cache` after such edits. Defaults to False.
+
+        Returns:
+            GroundTruthIndex: Prepared ground truth
+        """
+        if use_cache:
+            signature = _shallow_signature(ground_truth_dict_list)
+            cached = _index_cache.get(id(ground_truth_dict_list))
+            # the cache holds a reference to each list, so that its id cannot be reused by another list
+            if cached is not None and cached[0] is ground_truth_dict_list and cached[1] == signature:
+                _index_cache.move_to_end(id(ground_truth_dict_list))
+                return cached[2]
+
+        class_names = sorted(set(label for gt_dict in ground_truth_dict_list for label in gt_dict["class_labels"]))
+        file_ids = sorted(set(gt_dict["file_id"] for gt_dict in ground_truth_dict_list))
+        class_codes = {class_name: code for code, class_name in enumerate(class_names)}
+        file_codes = {file_id: code for code, file_id in enumerate(file_ids)}
+        gt_index = cls(
+            *_build_gt_arrays(ground_truth_dict_list, class_codes, file_codes, np.float64),
+            class_names,
+            file_ids,
+            _build_gt_ignore(ground_truth_dict_list),
+        )
+
+        if use_cache:
+            _index_cache[id(ground_truth_dict_list)] = (ground_truth_dict_list, signature, gt_index)
+            _index_cache.move_to_end(id(ground_truth_dict_list))
+            if len(_index_cache) > _INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+        return gt_index
+
+    @property
+    def n_classes(self) -> int:
+        """Returns number of ground truth classes
+
+        Returns:
+            int: Number of ground truth classes
+        """
+        return len(self.class_names)
+
+    @property
+    def n_images(self) -> int:
+        """Returns number of images
+
+        Returns:
+            int: Number of images
+        """
+        return len(self.file_ids)
+
+    def build_dataset(self, detections: Union[List[DetectionsDict], ColumnarDetections]) -> ColumnarDataset:
+        """Method to combine the prepared ground truth with a set of detections into a columnar dataset. Ground
+        truth arrays are shared with the index, while matched flags are fresh for each dataset.
+
+        Args:
+            detections (Union[List[DetectionsDict], ColumnarDetections]): List of dicts containing detection
+                coordinates, class labels, confidence scores and file IDs, or columnar detections
+
+        Returns:
+            ColumnarDataset: Columnar dataset containing the prepared ground truths and the detections
+        """
+        if isinstance(detections, ColumnarDetections):
+            dt_file_ids = set(detections.file_ids)
+        else:
+            dt_file_ids = set([dt_dict["file_id"] for dt_dict in detections])
+        for file_id in self.file_ids:
+            # check if there is a corresponding detection-results file id
+            if file_id not in dt_file_ids:
+                raise ValueError(f"File ID {file_id} not found in detections list")
+        for file_id in dt_file_ids:
+            # check if there is a corresponding ground truth file id
+            if file_id not in self._file_codes:
+                raise ValueError(f"File ID {file_id} not found in ground truth list")
+
+        if isinstance(detections, ColumnarDetections):
+            dt_coordinates, dt_scores = detections.coordinates, detections.scores
+            # detections with a class label not found in ground truth get a class code of -1, and are ignored
+            class_code_map = np.array([self._class_codes.get(name, -1) for name in detections.class_names], np.int32)
+            image_code_map = np.array([self._file_codes[file_id] for file_id in detections.file_ids], np.int32)
+            dt_class_codes = class_code_map[detections.class_codes]
+            dt_image_codes = image_code_map[detections.image_codes]
+        else:
+            dt_coordinates, dt_scores, dt_class_codes, dt_image_codes = _build_dt_arrays(
+                detections, self._class_codes, self._file_codes, np.float64
+            )
+
+        dataset = ColumnarDataset(
+            self.coordinates,
+            self.class_codes,
+            self.image_codes,
+            dt_coordinates,
+            dt_scores,
+            dt_class_codes,
+            dt_image_codes,
+            self.class_names,
+            self.file_ids,
+        )
+        dataset.gt_areas = self.areas
+        dataset.gt_ignore = self.ignore_flags
+        dataset.gt_counts = self.gt_counts
+        return dataset
+
+
+def _shallow_signature(ground_truth_dict_list: List[GroundTruthDict]) -> Tuple[Any, ...]:
+    """Helper function to get a cheap signature of a list of ground truth dicts, from the identities and lengths of
+    its dicts and their fields rather than from their contents
+
+    Args:
+        ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+            class labels and file IDs
+
+    Returns:
+        Tuple[Any, ...]: Signature, which changes when a dict or one of its fields is replaced, or a field changes
+            length
+    """
+    return tuple(
+        (
+            id(gt_dict),
+            gt_dict["file_id"],
+            id(gt_dict["class_labels"]),
+            len(gt_dict["class_labels"]),
+            id(gt_dict["coordinates"]),
+            len(gt_dict["coordinates"]),
+            id(gt_dict.get("ignore_flags")),
+        )
+        for gt_dict in ground_truth_dict_list
+    )
+
+
+def clear_ground_truth_index_cache():
+    """Overall function to empty the cache of ground truths prepared by `GroundTruthIndex.from_dicts`"""
+    _index_cache.clear()
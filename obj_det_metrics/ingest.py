@@ -1,11 +1,33 @@
 import os
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
 
+import numpy as np
 import pipe
 
+from obj_det_metrics.cache import (
+    GtTable,
+    _fingerprint_txt_dir,
+    _read_cached_gt_table,
+    _write_cached_gt_table,
+)
+from obj_det_metrics.columnar import ColumnarDataset
+from obj_det_metrics.profiling import PipelineStats, _profile_stage
 from obj_det_metrics.utils import _generate_empty_dt_dict, _generate_empty_gt_dict
 from obj_det_metrics.variables import DetectionsDict, GroundTruthDict
 
+ParsedFile = TypeVar("ParsedFile")
+# file ID, class labels, coordinates of shape (n, 4), ignore flags
+ParsedGtFile = Tuple[str, np.ndarray, np.ndarray, np.ndarray]
+# file ID, class labels, confidence scores, coordinates of shape (n, 4)
+ParsedDtFile = Tuple[str, np.ndarray, np.ndarray, np.ndarray]
+
+# trailing token of ground truth lines flagging ignored boxes, e.g. crowd regions
+_IGNORE_TOKEN = "ignore"
+# lookup table of ASCII whitespace bytes, which separate fields
+_IS_SPACE_BYTE = np.zeros(256, dtype=bool)
+_IS_SPACE_BYTE[list(b" \t\n\r\x0b\x0c")] = True
+
 
 def _read_file_lines(filepath: str) -> List[str]:
     """Helper function to read in lines from a text file, and strip whitespaces before and after each line
@@ -17,47 +39,344 @@ def _read_file_lines(filepath: str) -> List[str]:
         List[str]: Lines contained in text file
     """
     with open(filepath, "r") as f:
-        lines = [line.strip() for line in f.readlines()]
+        lines = [line.strip() for line in f]
     return lines
 
 
 def _generate_gt_dict_from_txt(filepath: str) -> GroundTruthDict:
     """Helper function to generate a dict containing ground truth from a text file, where each line is in the format
-    "<class name> <xmin> <ymin> <xmax> <ymax>" (adapted from https://github.com/Cartucho/mAP).
+    "<class name> <xmin> <ymin> <xmax> <ymax>" (adapted from https://github.com/Cartucho/mAP), optionally followed by
+    "ignore" for ignored boxes, e.g. crowd regions.
 
     Args:
         filepath (str): Path of text file to read lines from
 
     Returns:
-        GroundTruthDict: Dict containing coordinates, class labels and file ID of single image
+        GroundTruthDict: Dict containing coordinates, class labels and file ID of single image, and ignore flags if
+            any box is ignored
     """
     lines = _read_file_lines(filepath)
     gt_dict = _generate_empty_gt_dict()
     gt_dict["file_id"] = os.path.splitext(os.path.basename(filepath))[0]
+    ignore_flags = []
     for line in lines:
         line_contents = line.split()
+        ignore = line_contents[-1] == _IGNORE_TOKEN
+        if ignore:
+            line_contents = line_contents[:-1]
         class_label = line_contents[0]
         coordinates = [int(value) for value in line_contents[1:]]
         gt_dict["class_labels"].append(class_label)
         gt_dict["coordinates"].append(coordinates)
+        ignore_flags.append(ignore)
+    if any(ignore_flags):
+        gt_dict["ignore_flags"] = ignore_flags
     return gt_dict
 
 
-def generate_gt_dict_list_from_txts(txt_dir: str) -> List[GroundTruthDict]:
+def _scan_txt_files(txt_dir: str) -> List[str]:
+    """Helper function to list the paths of text files in a directory with a single `os.scandir` call, sorted by
+    filename
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+
+    Returns:
+        List[str]: Sorted paths of text files
+    """
+    with os.scandir(txt_dir) as entries:
+        return sorted(entry.path for entry in entries if ".txt" in entry.name.lower() and entry.is_file())
+
+
+def _read_file_table(filepath: str, n_fields: int) -> Tuple[str, np.ndarray]:
+    """Helper function to read in a whole text file at once and split it into a 2D array of string fields
+
+    Args:
+        filepath (str): Path of text file to read
+        n_fields (int): Number of whitespace-separated fields on each line
+
+    Returns:
+        Tuple[str, np.ndarray]: Contains file ID and array of shape (n_lines, n_fields) of string fields
+    """
+    with open(filepath, "r") as f:
+        text = f.read()
+    file_id = os.path.splitext(os.path.basename(filepath))[0]
+    return file_id, _split_table(text, n_fields, filepath)
+
+
+def _split_table(text: str, n_fields: int, filepath: str) -> np.ndarray:
+    """Helper function to split the contents of a text file into a 2D array of string fields. The whole text is split
+    at once, so the number of fields of each non-blank line is checked separately, with a vectorized pass over its
+    bytes, so that a malformed line cannot shift fields into the next one.
+
+    Args:
+        text (str): Contents of text file
+        n_fields (int): Number of whitespace-separated fields on each line
+        filepath (str): Path of text file, for error messages
+
+    Returns:
+        np.ndarray: Array of shape (n_lines, n_fields) of string fields
+    """
+    tokens = text.split()
+    chars = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    is_space = _IS_SPACE_BYTE[chars]
+    # a field starts at each non-whitespace byte following whitespace or the start of the text
+    field_starts = ~is_space & np.concatenate([[True], is_space[:-1]])
+    line_codes = np.cumsum(chars == ord("\n"))
+    fields_per_line = np.bincount(line_codes[field_starts])
+    if len(tokens) % n_fields != 0 or np.any((fields_per_line != 0) & (fields_per_line != n_fields)):
+        raise ValueError(f"Expected {n_fields} values on each line of {filepath}")
+    return np.array(tokens, dtype=str).reshape(-1, n_fields)
+
+
+def _parse_gt_txt(filepath: str) -> ParsedGtFile:
+    """Helper function to parse a ground truth text file in bulk, where each line is in the format
+    "<class name> <xmin> <ymin> <xmax> <ymax>", optionally followed by "ignore" for ignored boxes. Files without the
+    token are split in one go, and only those with it are split line by line.
+
+    Args:
+        filepath (str): Path of text file to read
+
+    Returns:
+        ParsedGtFile: Contains file ID, class labels, coordinates and ignore flags of single image
+    """
+    with open(filepath, "r") as f:
+        text = f.read()
+    file_id = os.path.splitext(os.path.basename(filepath))[0]
+    if _IGNORE_TOKEN not in text:
+        table = _split_table(text, 5, filepath)
+        return file_id, table[:, 0], table[:, 1:].astype(np.int64), np.zeros(len(table), dtype=bool)
+    rows = [line.split() for line in text.splitlines() if line.strip()]
+    ignore_flags = np.array([len(row) == 6 and row[5] == _IGNORE_TOKEN for row in rows], dtype=bool)
+    for row, ignore in zip(rows, ignore_flags):
+        if len(row) != 5 + ignore:
+            raise ValueError(f"Expected 5 values, optionally followed by '{_IGNORE_TOKEN}', on each line of {filepath}")
+    table = np.array([row[:5] for row in rows], dtype=str).reshape(-1, 5)
+    return file_id, table[:, 0], table[:, 1:].astype(np.int64), ignore_flags
+
+
+def _parse_dt_txt(filepath: str) -> ParsedDtFile:
+    """Helper function to parse a detections text file in bulk, where each line is in the format
+    "<class name> <conf_score> <xmin> <ymin> <xmax> <ymax>"
+
+    Args:
+        filepath (str): Path of text file to read
+
+    Returns:
+        ParsedDtFile: Contains file ID, class labels, confidence scores and coordinates of single image
+    """
+    file_id, table = _read_file_table(filepath, 6)
+    return file_id, table[:, 0], table[:, 1].astype(np.float64), table[:, 2:].astype(np.int64)
+
+
+def _build_gt_dict(gt_file: ParsedGtFile) -> GroundTruthDict:
+    """Helper function to convert a parsed ground truth file into a ground truth dict, as read by
+    `_generate_gt_dict_from_txt`
+
+    Args:
+        gt_file (ParsedGtFile): Parsed ground truth file
+
+    Returns:
+        GroundTruthDict: Dict containing coordinates, class labels and file ID of single image, and ignore flags if
+            any box is ignored
+    """
+    file_id, class_labels, coordinates, ignore_flags = gt_file
+    gt_dict: GroundTruthDict = {
+        "coordinates": coordinates.tolist(),
+        "class_labels": class_labels.tolist(),
+        "file_id": file_id,
+    }
+    if ignore_flags.any():
+        gt_dict["ignore_flags"] = ignore_flags.tolist()
+    return gt_dict
+
+
+def _build_dt_dict(dt_file: ParsedDtFile) -> DetectionsDict:
+    """Helper function to convert a parsed detections file into a detections dict, as read by
+    `_generate_dt_dict_from_txt`
+
+    Args:
+        dt_file (ParsedDtFile): Parsed detections file
+
+    Returns:
+        DetectionsDict: Dict containing coordinates, class labels, confidence scores and file ID of single image
+    """
+    file_id, class_labels, conf_scores, coordinates = dt_file
+    return {
+        "coordinates": coordinates.tolist(),
+        "class_labels": class_labels.tolist(),
+        "conf_scores": conf_scores.tolist(),
+        "file_id": file_id,
+    }
+
+
+def _read_gt_txt(filepath: str) -> GroundTruthDict:
+    """Helper function to read a ground truth text file into a ground truth dict, in bulk
+
+    Args:
+        filepath (str): Path of text file to read
+
+    Returns:
+        GroundTruthDict: Dict containing coordinates, class labels and file ID of single image
+    """
+    return _build_gt_dict(_parse_gt_txt(filepath))
+
+
+def _read_dt_txt(filepath: str) -> DetectionsDict:
+    """Helper function to read a detections text file into a detections dict, in bulk
+
+    Args:
+        filepath (str): Path of text file to read
+
+    Returns:
+        DetectionsDict: Dict containing coordinates, class labels, confidence scores and file ID of single image
+    """
+    return _build_dt_dict(_parse_dt_txt(filepath))
+
+
+def _parse_txts_threaded(txt_dir: str, parse_fn: Callable[[str], ParsedFile], n_threads: int) -> List[ParsedFile]:
+    """Helper function to parse all text files of a directory in a thread pool, which hides the latency of opening
+    many small files (e.g. on network filesystems)
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+        parse_fn (Callable[[str], ParsedFile]): Function parsing a single text file
+        n_threads (int): Number of threads
+
+    Returns:
+        List[ParsedFile]: Parsed files, sorted by filename
+    """
+    filepaths = _scan_txt_files(txt_dir)
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        return list(executor.map(parse_fn, filepaths))
+
+
+def _build_gt_table(gt_files: List[ParsedGtFile]) -> GtTable:
+    """Helper function to concatenate parsed ground truth files into a single table of arrays
+
+    Args:
+        gt_files (List[ParsedGtFile]): Parsed ground truth files
+
+    Returns:
+        GtTable: Contains file IDs, sorted class names, class codes, coordinates, number of boxes in each file and
+            ignore flags
+    """
+    class_labels = np.concatenate([np.array([], dtype=str)] + [gt_file[1] for gt_file in gt_files])
+    class_names, class_codes = np.unique(class_labels, return_inverse=True)
+    return (
+        [gt_file[0] for gt_file in gt_files],
+        class_names.tolist(),
+        class_codes.astype(np.int32),
+        np.concatenate([np.empty((0, 4), dtype=np.int64)] + [gt_file[2] for gt_file in gt_files]),
+        np.array([len(gt_file[1]) for gt_file in gt_files], dtype=np.int64),
+        np.concatenate([np.empty(0, dtype=bool)] + [gt_file[3] for gt_file in gt_files]),
+    )
+
+
+def _parse_gt_table(txt_dir: str, n_threads: int, stats: Optional[PipelineStats]) -> GtTable:
+    """Helper function to parse the ground truth text files of a directory into a single table of arrays
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+        n_threads (int): Number of threads reading files
+        stats (Optional[PipelineStats]): Stats to record the "parse_gt_txts" stage in, or None to disable profiling
+
+    Returns:
+        GtTable: Contains file IDs, sorted class names, class codes, coordinates, number of boxes in each file and
+            ignore flags
+    """
+    with _profile_stage(stats, "parse_gt_txts") as stage:
+        gt_table = _build_gt_table(_parse_txts_threaded(txt_dir, _parse_gt_txt, n_threads))
+        stage.n_items = len(gt_table[2])
+        stage.nbytes = gt_table[2].nbytes + gt_table[3].nbytes + gt_table[4].nbytes
+    return gt_table
+
+
+def _load_gt_table(
+    txt_dir: str, n_threads: int, cache_dir: Optional[str], stats: Optional[PipelineStats] = None
+) -> GtTable:
+    """Helper function to load the ground truth table of a directory, from the cache if the directory is unchanged
+    since it was cached, or else by parsing its text files (and caching the result, if `cache_dir` is given)
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+        n_threads (int): Number of threads reading files
+        cache_dir (Optional[str]): Directory containing cache files, or None to disable caching
+        stats (Optional[PipelineStats], optional): Stats to record the stages in, or None to disable profiling.
+            Defaults to None.
+
+    Returns:
+        GtTable: Contains file IDs, sorted class names, class codes, coordinates, number of boxes in each file and
+            ignore flags
+    """
+    if cache_dir is None:
+        return _parse_gt_table(txt_dir, n_threads, stats)
+    with _profile_stage(stats, "read_gt_cache") as stage:
+        # fingerprint before parsing, so that files modified in the meantime invalidate the cache on the next run
+        fingerprint = _fingerprint_txt_dir(txt_dir)
+        gt_table = _read_cached_gt_table(cache_dir, fingerprint)
+        stage.n_items = 0 if gt_table is None else len(gt_table[2])
+    if gt_table is None:
+        gt_table = _parse_gt_table(txt_dir, n_threads, stats)
+        with _profile_stage(stats, "write_gt_cache") as stage:
+            _write_cached_gt_table(cache_dir, fingerprint, gt_table)
+            stage.n_items = len(gt_table[2])
+    return gt_table
+
+
+def generate_gt_dict_list_from_txts(
+    txt_dir: str,
+    n_threads: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    stats: Optional[PipelineStats] = None,
+) -> List[GroundTruthDict]:
     """Overall function to read in text files from the inputted directory and return a list of ground truth dicts
 
     Args:
         txt_dir (str): Directory containing text files to be read
+        n_threads (Optional[int], optional): If given, files are listed with `os.scandir`, read in a pool of
+            `n_threads` threads and parsed in bulk, and the dicts are sorted by filename. Defaults to None.
+        cache_dir (Optional[str], optional): If given, parsed ground truth is cached in this directory as a
+            memory-mappable binary file, keyed by a fingerprint of the names, sizes and modification times of the text
+            files, and reused while they are unchanged. Implies the `n_threads` mode, with 8 threads if not given.
+            Defaults to None.
+        stats (Optional[PipelineStats], optional): If given, the wall time, item count and allocation size of each
+            stage (reading the cache, parsing text files and building dicts) are recorded in it. Defaults to None.
 
     Returns:
         List[GroundTruthDict]: List of ground truth dicts
     """
-    gt_dict_list = list(
-        os.listdir(txt_dir)
-        | pipe.where(lambda filename: ".txt" in filename.lower())
-        | pipe.select(lambda filename: os.path.join(txt_dir, filename))
-        | pipe.select(_generate_gt_dict_from_txt)
-    )
+    if n_threads is not None or cache_dir is not None:
+        file_ids, class_names, class_codes, coordinates, box_counts, ignore_flags = _load_gt_table(
+            txt_dir, n_threads or 8, cache_dir, stats
+        )
+        with _profile_stage(stats, "build_gt_dicts") as stage:
+            class_labels = np.array(class_names, dtype=object)[class_codes].tolist()
+            coordinates_list = coordinates.tolist()
+            bounds = np.concatenate([[0], np.cumsum(box_counts)]).tolist()
+            gt_dict_list: List[GroundTruthDict] = [
+                {
+                    "coordinates": coordinates_list[start:end],
+                    "class_labels": class_labels[start:end],
+                    "file_id": file_id,
+                }
+                for file_id, start, end in zip(file_ids, bounds[:-1], bounds[1:])
+            ]
+            # as with line-by-line parsing, only files with ignored boxes get ignore flags
+            for image_code in np.unique(np.repeat(np.arange(len(file_ids)), box_counts)[ignore_flags]):
+                start, end = bounds[image_code], bounds[image_code + 1]
+                gt_dict_list[image_code]["ignore_flags"] = ignore_flags[start:end].tolist()
+            stage.n_items = len(class_labels)
+        return gt_dict_list
+    with _profile_stage(stats, "parse_gt_txts") as stage:
+        gt_dict_list = list(
+            os.listdir(txt_dir)
+            | pipe.where(lambda filename: ".txt" in filename.lower())
+            | pipe.select(lambda filename: os.path.join(txt_dir, filename))
+            | pipe.select(_generate_gt_dict_from_txt)
+        )
+        if stats is not None:
+            stage.n_items = sum(len(gt_dict["class_labels"]) for gt_dict in gt_dict_list)
     return gt_dict_list
 
 
@@ -85,19 +404,240 @@ def _generate_dt_dict_from_txt(filepath: str) -> DetectionsDict:
     return dt_dict
 
 
-def generate_dt_dict_list_from_txts(txt_dir: str) -> List[DetectionsDict]:
+def generate_dt_dict_list_from_txts(
+    txt_dir: str, n_threads: Optional[int] = None, stats: Optional[PipelineStats] = None
+) -> List[DetectionsDict]:
     """Overall function to read in text files from the inputted directory and return a list of detections dicts
 
     Args:
         txt_dir (str): Directory containing text files to be read
+        n_threads (Optional[int], optional): If given, files are listed with `os.scandir`, read in a pool of
+            `n_threads` threads and parsed in bulk, and the dicts are sorted by filename. Defaults to None.
+        stats (Optional[PipelineStats], optional): If given, the wall time, item count and allocation size of each
+            stage (parsing text files and building dicts) are recorded in it. Defaults to None.
 
     Returns:
         List[DetectionsDict]: List of ground truth dicts
     """
-    dt_dict_list = list(
-        os.listdir(txt_dir)
-        | pipe.where(lambda filename: ".txt" in filename.lower())
-        | pipe.select(lambda filename: os.path.join(txt_dir, filename))
-        | pipe.select(_generate_dt_dict_from_txt)
-    )
+    if n_threads is not None:
+        with _profile_stage(stats, "parse_dt_txts") as stage:
+            dt_files = _parse_txts_threaded(txt_dir, _parse_dt_txt, n_threads)
+            if stats is not None:
+                stage.n_items = sum(len(dt_file[1]) for dt_file in dt_files)
+                stage.nbytes = sum(dt_file[2].nbytes + dt_file[3].nbytes for dt_file in dt_files)
+        with _profile_stage(stats, "build_dt_dicts") as stage:
+            dt_dict_list: List[DetectionsDict] = [_build_dt_dict(dt_file) for dt_file in dt_files]
+            if stats is not None:
+                stage.n_items = sum(len(dt_file[1]) for dt_file in dt_files)
+        return dt_dict_list
+    with _profile_stage(stats, "parse_dt_txts") as stage:
+        dt_dict_list = list(
+            os.listdir(txt_dir)
+            | pipe.where(lambda filename: ".txt" in filename.lower())
+            | pipe.select(lambda filename: os.path.join(txt_dir, filename))
+            | pipe.select(_generate_dt_dict_from_txt)
+        )
+        if stats is not None:
+            stage.n_items = sum(len(dt_dict["class_labels"]) for dt_dict in dt_dict_list)
     return dt_dict_list
+
+
+def _scan_txt_files_by_file_id(txt_dir: str) -> List[Tuple[str, str]]:
+    """Helper function to list the text files of a directory with their file IDs, sorted by file ID
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+
+    Returns:
+        List[Tuple[str, str]]: File ID and path of each text file, sorted by file ID
+    """
+    return sorted((os.path.splitext(os.path.basename(filepath))[0], filepath) for filepath in _scan_txt_files(txt_dir))
+
+
+def iter_gt_dicts_from_txts(txt_dir: str) -> Iterator[GroundTruthDict]:
+    """Overall function to lazily read in text files from the inputted directory, yielding one ground truth dict at
+    a time, sorted by file ID. Only the file being read is held in memory, instead of the whole list of dicts.
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+
+    Yields:
+        GroundTruthDict: Dict containing coordinates, class labels and file ID of single image
+    """
+    for _, filepath in _scan_txt_files_by_file_id(txt_dir):
+        yield _read_gt_txt(filepath)
+
+
+def iter_dt_dicts_from_txts(txt_dir: str) -> Iterator[DetectionsDict]:
+    """Overall function to lazily read in text files from the inputted directory, yielding one detections dict at a
+    time, sorted by file ID. Only the file being read is held in memory, instead of the whole list of dicts.
+
+    Args:
+        txt_dir (str): Directory containing text files to be read
+
+    Yields:
+        DetectionsDict: Dict containing coordinates, class labels, confidence scores and file ID of single image
+    """
+    for _, filepath in _scan_txt_files_by_file_id(txt_dir):
+        yield _read_dt_txt(filepath)
+
+
+def iter_paired_dicts_from_txts(
+    gt_txt_dir: str, dt_txt_dir: str, on_missing: Optional[Callable[[str, str], None]] = None
+) -> Iterator[Tuple[GroundTruthDict, DetectionsDict]]:
+    """Overall function to lazily read in text files of ground truths and detections from the inputted directories,
+    yielding the ground truth and detections dicts of one image at a time, sorted by file ID. Files of both
+    directories are paired by file ID as they are streamed, so an image missing from either directory is reported as
+    soon as it is reached, instead of after all files are read.
+
+    Args:
+        gt_txt_dir (str): Directory containing text files of ground truths
+        dt_txt_dir (str): Directory containing text files of detections
+        on_missing (Optional[Callable[[str, str], None]], optional): Function called with the file ID of an image
+            and the name of the list it is missing from ("ground truth" or "detections"), after which the image is
+            skipped. If None, an AssertionError is raised instead, as when evaluating dicts. Defaults to None.
+
+    Yields:
+        Tuple[GroundTruthDict, DetectionsDict]: Ground truth and detections dicts of single image
+    """
+    gt_files = _scan_txt_files_by_file_id(gt_txt_dir)
+    dt_files = _scan_txt_files_by_file_id(dt_txt_dir)
+    gt_idx, dt_idx = 0, 0
+    while gt_idx < len(gt_files) or dt_idx < len(dt_files):
+        gt_file_id = gt_files[gt_idx][0] if gt_idx < len(gt_files) else None
+        dt_file_id = dt_files[dt_idx][0] if dt_idx < len(dt_files) else None
+        if dt_file_id is None or (gt_file_id is not None and gt_file_id < dt_file_id):
+            _report_missing_file_id(gt_files[gt_idx][0], "detections", on_missing)
+            gt_idx += 1
+        elif gt_file_id is None or dt_file_id < gt_file_id:
+            _report_missing_file_id(dt_file_id, "ground truth", on_missing)
+            dt_idx += 1
+        else:
+            yield _read_gt_txt(gt_files[gt_idx][1]), _read_dt_txt(dt_files[dt_idx][1])
+            gt_idx += 1
+            dt_idx += 1
+
+
+def _report_missing_file_id(file_id: str, list_name: str, on_missing: Optional[Callable[[str, str], None]]):
+    """Helper function to report an image missing from the ground truth or detections list
+
+    Args:
+        file_id (str): File ID of image
+        list_name (str): Name of the list the image is missing from
+        on_missing (Optional[Callable[[str, str], None]]): Function to call with the file ID and list name, or None
+            to raise an AssertionError
+    """
+    if on_missing is None:
+        # same message as the check on file IDs of dicts in `_generate_gt_objs`
+        raise AssertionError(f"File ID {file_id} not found in {list_name} list")
+    on_missing(file_id, list_name)
+
+
+def generate_columnar_dataset_from_txts(
+    gt_txt_dir: str,
+    dt_txt_dir: str,
+    n_threads: int = 8,
+    dtype: Any = np.float32,
+    cache_dir: Optional[str] = None,
+    stats: Optional[PipelineStats] = None,
+) -> ColumnarDataset:
+    """Overall function to read in text files of ground truths and detections from the inputted directories straight
+    into a `ColumnarDataset`, without building intermediate dicts. Files are read in a thread pool and parsed in bulk.
+
+    Args:
+        gt_txt_dir (str): Directory containing text files of ground truths
+        dt_txt_dir (str): Directory containing text files of detections
+        n_threads (int, optional): Number of threads reading files. Defaults to 8.
+        dtype (Any, optional): Float dtype of coordinates and scores. Defaults to np.float32.
+        cache_dir (Optional[str], optional): If given, parsed ground truth is cached in this directory, as in
+            `generate_gt_dict_list_from_txts`. Defaults to None.
+        stats (Optional[PipelineStats], optional): If given, the wall time, item count and allocation size of each
+            stage (reading the cache, parsing text files and building the dataset) are recorded in it. Defaults to
+            None.
+
+    Returns:
+        ColumnarDataset: Columnar dataset containing all ground truths and detections
+    """
+    file_ids, class_names, gt_class_codes, gt_coordinates, box_counts, gt_ignore = _load_gt_table(
+        gt_txt_dir, n_threads, cache_dir, stats
+    )
+    with _profile_stage(stats, "parse_dt_txts") as stage:
+        dt_files = _parse_txts_threaded(dt_txt_dir, _parse_dt_txt, n_threads)
+        if stats is not None:
+            stage.n_items = sum(len(dt_file[1]) for dt_file in dt_files)
+            stage.nbytes = sum(dt_file[2].nbytes + dt_file[3].nbytes for dt_file in dt_files)
+    with _profile_stage(stats, "build_dataset") as stage:
+        dataset = _build_columnar_dataset(
+            file_ids, class_names, gt_class_codes, gt_coordinates, box_counts, dt_files, dtype, gt_ignore
+        )
+        stage.n_items = len(dataset.gt_class_codes) + len(dataset.dt_class_codes)
+        stage.nbytes = dataset.nbytes
+    return dataset
+
+
+def _build_columnar_dataset(
+    file_ids: List[str],
+    class_names: List[str],
+    gt_class_codes: np.ndarray,
+    gt_coordinates: np.ndarray,
+    box_counts: np.ndarray,
+    dt_files: List[ParsedDtFile],
+    dtype: Any,
+    gt_ignore: Optional[np.ndarray] = None,
+) -> ColumnarDataset:
+    """Helper function to build a `ColumnarDataset` from a ground truth table and parsed detections files
+
+    Args:
+        file_ids (List[str]): File IDs of ground truth files
+        class_names (List[str]): Sorted class names of ground truth
+        gt_class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates
+        box_counts (np.ndarray): Number of ground truth boxes in each file
+        dt_files (List[ParsedDtFile]): Parsed detections files
+        dtype (Any): Float dtype of coordinates and scores
+        gt_ignore (Optional[np.ndarray], optional): Boolean array of shape (n_gt,) flagging ignored ground truths.
+            Defaults to None.
+
+    Returns:
+        ColumnarDataset: Columnar dataset containing all ground truths and detections
+    """
+    dt_file_ids = set(dt_file[0] for dt_file in dt_files)
+    for file_id in file_ids:
+        # check if there is a corresponding detection-results file id
+        if file_id not in dt_file_ids:
+            raise ValueError(f"File ID {file_id} not found in detections list")
+    file_codes = {file_id: code for code, file_id in enumerate(file_ids)}
+    for dt_file in dt_files:
+        # check if there is a corresponding ground truth file id
+        if dt_file[0] not in file_codes:
+            raise ValueError(f"File ID {dt_file[0]} not found in ground truth list")
+    gt_image_codes = np.repeat(np.arange(len(file_ids)), box_counts)
+
+    class_names_array = np.array(class_names, dtype=str)
+    dt_labels = np.concatenate([np.array([], dtype=str)] + [dt_file[1] for dt_file in dt_files])
+    dt_class_codes = np.minimum(np.searchsorted(class_names_array, dt_labels), max(len(class_names) - 1, 0))
+    # detections with a class label not found in ground truth are dropped
+    if len(class_names):
+        keep = class_names_array[dt_class_codes] == dt_labels
+    else:
+        keep = np.zeros(len(dt_labels), dtype=bool)
+    dt_image_codes = np.repeat(
+        [file_codes[dt_file[0]] for dt_file in dt_files], [len(dt_file[1]) for dt_file in dt_files]
+    )
+    dt_scores = np.concatenate([np.empty(0)] + [dt_file[2] for dt_file in dt_files])
+    dt_coordinates = np.concatenate([np.empty((0, 4))] + [dt_file[3] for dt_file in dt_files])
+
+    dataset = ColumnarDataset(
+        gt_coordinates.astype(dtype),
+        gt_class_codes.astype(np.int32),
+        gt_image_codes.astype(np.int32),
+        dt_coordinates[keep].astype(dtype),
+        dt_scores[keep].astype(dtype),
+        dt_class_codes[keep].astype(np.int32),
+        dt_image_codes[keep].astype(np.int32),
+        class_names,
+        file_ids,
+    )
+    if gt_ignore is not None and gt_ignore.any():
+        dataset.gt_ignore = np.array(gt_ignore, dtype=bool)
+    return dataset
@@ -0,0 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from obj_det_metrics.utils import _match_detections
+
+# Arrays of a shard: dt_coordinates, dt_scores, dt_class_codes, dt_image_codes, gt_coordinates, gt_class_codes,
+# gt_image_codes, iou_thresholds, and optional gt_ignore
+Shard = Tuple[
+    np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]
+]
+
+
+def _match_shard(shard: Shard) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Helper function run in worker processes to match the detections of a shard of images
+
+    Args:
+        shard (Shard): Arrays of detections and ground truths of the shard, IoU thresholds and ignore flags
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Contains true positive flags of shape (n_thr, n_dt), matched flags
+            of shape (n_thr, n_gt) and ignored flags of shape (n_thr, n_dt) for the shard
+    """
+    iou_thresholds = shard[7]
+    gt_matched = np.zeros((len(iou_thresholds), len(shard[5])), dtype=bool)
+    dt_ignored = np.zeros((len(iou_thresholds), len(shard[1])), dtype=bool)
+    tp = _match_detections(*shard[:8], gt_matched=gt_matched, gt_ignore=shard[8], dt_ignored=dt_ignored)
+    return tp, gt_matched, dt_ignored
+
+
+def _split_images(dt_image_codes: np.ndarray, n_images: int, n_shards: int) -> np.ndarray:
+    """Helper function to split image codes into contiguous ranges holding roughly equal numbers of detections
+
+    Args:
+        dt_image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+        n_images (int): Total number of images
+        n_shards (int): Number of ranges to split images into
+
+    Returns:
+        np.ndarray: Array of shape (n_shards + 1,) of image code boundaries
+    """
+    dt_count_cumsum = np.cumsum(np.bincount(dt_image_codes, minlength=n_images))
+    targets = dt_count_cumsum[-1] * np.arange(1, n_shards) / n_shards if n_images else np.zeros(n_shards - 1)
+    # each inner boundary falls right after the image holding the target-th detection
+    inner_bounds = np.minimum(np.searchsorted(dt_count_cumsum, targets) + 1, n_images)
+    return np.unique(np.concatenate([[0], inner_bounds, [n_images]]))
+
+
+def _match_detections_parallel(
+    dt_coordinates: np.ndarray,
+    dt_scores: np.ndarray,
+    dt_class_codes: np.ndarray,
+    dt_image_codes: np.ndarray,
+    gt_coordinates: np.ndarray,
+    gt_class_codes: np.ndarray,
+    gt_image_codes: np.ndarray,
+    iou_thresholds: np.ndarray,
+    gt_matched: np.ndarray,
+    n_workers: int,
+    gt_ignore: Optional[np.ndarray] = None,
+    dt_ignored: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Helper function with the same inputs and outputs as `_match_detections`, which shards images into contiguous
+    ranges and matches each shard in a pool of `n_workers` processes. Shards are sent to workers as compact arrays,
+    and since images are matched independently, the merged outputs are identical to the serial ones.
+
+    Args:
+        dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates
+        dt_scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+        dt_class_codes (np.ndarray): Array of shape (n_dt,) of detection class codes
+        dt_image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates
+        gt_class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+        gt_image_codes (np.ndarray): Array of shape (n_gt,) of ground truth image codes
+        iou_thresholds (np.ndarray): Array of shape (n_thr,) of IoU thresholds to determine if detection is true
+            positive
+        gt_matched (np.ndarray): Boolean array of shape (n_thr, n_gt) which is set in-memory to flag ground truths
+            matched by a detection
+        n_workers (int): Number of worker processes
+        gt_ignore (Optional[np.ndarray], optional): Boolean array of shape (n_gt,) flagging ignored ground truths.
+            Defaults to None.
+        dt_ignored (Optional[np.ndarray], optional): Boolean array of shape (n_thr, n_dt) which, if given, is set
+            in-memory to flag detections absorbed by an ignored ground truth. Defaults to None.
+
+    Returns:
+        np.ndarray: Boolean array of shape (n_thr, n_dt) flagging true positive detections, in input order
+    """
+    n_images = int(max(dt_image_codes.max(initial=-1), gt_image_codes.max(initial=-1))) + 1
+    image_bounds = _split_images(dt_image_codes, n_images, n_workers)
+    dt_order = np.argsort(dt_image_codes, kind="stable")
+    gt_order = np.argsort(gt_image_codes, kind="stable")
+    dt_bounds = np.searchsorted(dt_image_codes[dt_order], image_bounds)
+    gt_bounds = np.searchsorted(gt_image_codes[gt_order], image_bounds)
+
+    shard_idxs: List[Tuple[np.ndarray, np.ndarray]] = []
+    shards: List[Shard] = []
+    for shard_idx in range(len(image_bounds) - 1):
+        dt_start, dt_end = dt_bounds[shard_idx], dt_bounds[shard_idx + 1]
+        gt_start, gt_end = gt_bounds[shard_idx], gt_bounds[shard_idx + 1]
+        dt_idxs, gt_idxs = dt_order[dt_start:dt_end], gt_order[gt_start:gt_end]
+        # image codes are rebased so that each worker only loops over the images of its shard
+        first_image_code = image_bounds[shard_idx]
+        shard_idxs.append((dt_idxs, gt_idxs))
+        shards.append(
+            (
+                dt_coordinates[dt_idxs],
+                dt_scores[dt_idxs],
+                dt_class_codes[dt_idxs],
+                dt_image_codes[dt_idxs] - first_image_code,
+                gt_coordinates[gt_idxs],
+                gt_class_codes[gt_idxs],
+                gt_image_codes[gt_idxs] - first_image_code,
+                iou_thresholds,
+                None if gt_ignore is None else gt_ignore[gt_idxs],
+            )
+        )
+
+    tp = np.zeros((len(iou_thresholds), len(dt_scores)), dtype=bool)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        for (dt_idxs, gt_idxs), (shard_tp, shard_gt_matched, shard_dt_ignored) in zip(
+            shard_idxs, executor.map(_match_shard, shards)
+        ):
+            tp[:, dt_idxs] = shard_tp
+            gt_matched[:, gt_idxs] = shard_gt_matched
+            if dt_ignored is not None:
+                dt_ignored[:, dt_idxs] = shard_dt_ignored
+    return tp
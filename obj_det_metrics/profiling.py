@@ -0,0 +1,131 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+
+class StageStats:
+    def __init__(self, name: str) -> None:
+        """Initialize class variables. A stage is a step of the evaluation pipeline, e.g. parsing text files or
+        matching detections. The stage sets `n_items` and `nbytes` itself, while timing is done by `PipelineStats`.
+
+        Args:
+            name (str): Name of stage
+        """
+        self.name = name
+        self.n_calls = 0
+        self.wall_time_s = 0.0
+        # number of items (e.g. boxes, files or classes) processed by the stage
+        self.n_items = 0
+        # size of the arrays allocated by the stage, where known
+        self.nbytes = 0
+        # growth of memory traced by `tracemalloc` over the stage, if it was tracing when the stage started
+        self.traced_bytes: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns stats of stage as a dict, e.g. to be serialized to JSON
+
+        Returns:
+            Dict[str, Any]: Dict containing stats of stage
+        """
+        return {
+            "n_calls": self.n_calls,
+            "wall_time_s": self.wall_time_s,
+            "n_items": self.n_items,
+            "nbytes": self.nbytes,
+            "traced_bytes": self.traced_bytes,
+        }
+
+
+class PipelineStats:
+    def __init__(self, callback: Optional[Callable[[StageStats], None]] = None) -> None:
+        """Initialize class variables. Pass an instance as the `stats` argument of `compute_ap_map` or of the ingest
+        functions to record the wall time, item count and allocation size of each of their stages. Stages that run
+        several times (e.g. matching, once per class with the "python" engine) are summed up into one entry. The same
+        instance can be passed to several calls to collect the stats of a whole job.
+
+        Allocation sizes are reported as `nbytes` for arrays whose size is known, and additionally as `traced_bytes`
+        if `tracemalloc` was started by the caller.
+
+        Args:
+            callback (Optional[Callable[[StageStats], None]], optional): Function called with the stats of each run
+                of a stage as soon as it ends, e.g. to send them to a metrics pipeline. Defaults to None.
+        """
+        self.stages: Dict[str, StageStats] = {}
+        self._callback = callback
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Method to time a run of a stage, used as a context manager. The yielded stats can be updated with the
+        number of items processed and the size of the arrays allocated by the stage.
+
+        Args:
+            name (str): Name of stage
+
+        Yields:
+            Iterator[StageStats]: Stats of this run of the stage
+        """
+        stage_stats = StageStats(name)
+        tracing = tracemalloc.is_tracing()
+        traced_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+        try:
+            yield stage_stats
+        finally:
+            stage_stats.wall_time_s = time.perf_counter() - start
+            stage_stats.n_calls = 1
+            if tracing:
+                stage_stats.traced_bytes = tracemalloc.get_traced_memory()[0] - traced_start
+            self._add(stage_stats)
+            if self._callback is not None:
+                self._callback(stage_stats)
+
+    def _add(self, stage_stats: StageStats):
+        """Helper method to sum up the stats of a run of a stage into the totals of the stage
+
+        Args:
+            stage_stats (StageStats): Stats of a run of a stage
+        """
+        if stage_stats.name not in self.stages:
+            self.stages[stage_stats.name] = StageStats(stage_stats.name)
+        total = self.stages[stage_stats.name]
+        total.n_calls += stage_stats.n_calls
+        total.wall_time_s += stage_stats.wall_time_s
+        total.n_items += stage_stats.n_items
+        total.nbytes += stage_stats.nbytes
+        if stage_stats.traced_bytes is not None:
+            total.traced_bytes = (total.traced_bytes or 0) + stage_stats.traced_bytes
+
+    @property
+    def total_wall_time_s(self) -> float:
+        """Returns total wall time of all stages
+
+        Returns:
+            float: Total wall time in seconds
+        """
+        return sum(stage_stats.wall_time_s for stage_stats in self.stages.values())
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Returns stats of all stages as a dict, in the order that the stages first ran
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Dict containing stats of each stage, keyed by stage name
+        """
+        return {name: stage_stats.as_dict() for name, stage_stats in self.stages.items()}
+
+
+def _profile_stage(stats: Optional[PipelineStats], name: str) -> ContextManager[StageStats]:
+    """Helper function to time a stage if profiling is enabled. If it is disabled, a no-op context yields a throwaway
+    `StageStats`, fresh for each stage so that no state is shared between threads. Counts which take a pass over the
+    data should only be computed when `stats` is not None.
+
+    Args:
+        stats (Optional[PipelineStats]): Stats to record the stage in, or None if profiling is disabled
+        name (str): Name of stage
+
+    Returns:
+        ContextManager[StageStats]: Context manager timing the stage, or a no-op one if profiling is disabled
+    """
+    if stats is None:
+        return nullcontext(StageStats(name))
+    return stats.stage(name)
@@ -0,0 +1,75 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List
+
+from obj_det_metrics.variables import BoundingBox, ClassName, Coordinates
+
+GtIndexDict = Dict[str, Dict[ClassName, "GtIntervalIndex"]]
+
+
+class GtIntervalIndex:
+    def __init__(self, gt_bboxes: List[BoundingBox]) -> None:
+        """Initialize class variables. The index sorts the ground truth bounding boxes of one class in one image by
+        xmin, and keeps the widest box width, so that boxes which can overlap a query box are found by bisection
+        instead of computing IoU against every box.
+
+        Args:
+            gt_bboxes (List[BoundingBox]): Ground truth bounding box objects of one class in one image
+        """
+        self._gt_bboxes = gt_bboxes
+        self._order = sorted(range(len(gt_bboxes)), key=lambda idx: gt_bboxes[idx].coordinates[0])
+        self._xmins = [gt_bboxes[idx].coordinates[0] for idx in self._order]
+        self._max_width = max((bbox.coordinates[2] - bbox.coordinates[0] for bbox in gt_bboxes), default=0)
+
+    def query(self, coordinates: Coordinates) -> List[BoundingBox]:
+        """Method to get the ground truth bounding boxes which can overlap the inputted box. Boxes that are not
+        returned are guaranteed to have an IoU of 0 with it. Returned boxes keep their original order, so that picking
+        the first box with the highest IoU gives the same box as a search over all boxes.
+
+        Args:
+            coordinates (Coordinates): Coordinates of query bounding box, in the form [xmin, ymin, xmax, ymax]
+
+        Returns:
+            List[BoundingBox]: Ground truth bounding box objects which can overlap the query box
+        """
+        xmin, ymin, xmax, ymax = coordinates
+        # with inclusive pixel coordinates (see `_compute_iou`), boxes intersect only if each one starts less than
+        # one pixel after the other one ends
+        start = bisect_right(self._xmins, xmin - 1 - self._max_width)
+        end = bisect_left(self._xmins, xmax + 1)
+        candidate_idxs = []
+        for idx in self._order[start:end]:
+            gt_coordinates = self._gt_bboxes[idx]._coordinates
+            if gt_coordinates[2] > xmin - 1 and gt_coordinates[1] < ymax + 1 and gt_coordinates[3] > ymin - 1:
+                candidate_idxs.append(idx)
+        candidate_idxs.sort()
+        return [self._gt_bboxes[idx] for idx in candidate_idxs]
+
+
+def _build_gt_index(gt_bboxes_dict: Dict[str, List[BoundingBox]], min_boxes: int) -> GtIndexDict:
+    """Helper function to build a `GtIntervalIndex` for each class of each image that has at least `min_boxes`
+    ground truth bounding boxes of that class. Smaller groups are cheaper to search exhaustively.
+
+    Args:
+        gt_bboxes_dict (Dict[str, List[BoundingBox]]): Dict containing list of ground truth bounding box objects for
+            each file ID
+        min_boxes (int): Minimum number of ground truth bounding boxes of a class in an image to index them
+
+    Returns:
+        GtIndexDict: Dict containing an index for each indexed class, for each file ID
+    """
+    gt_index: GtIndexDict = {}
+    for file_id, gt_bboxes in gt_bboxes_dict.items():
+        if len(gt_bboxes) < min_boxes:
+            continue
+        class_bboxes: Dict[ClassName, List[BoundingBox]] = defaultdict(lambda: [])
+        for gt_bbox in gt_bboxes:
+            class_bboxes[gt_bbox.class_name].append(gt_bbox)
+        file_index = {
+            class_name: GtIntervalIndex(bboxes)
+            for class_name, bboxes in class_bboxes.items()
+            if len(bboxes) >= min_boxes
+        }
+        if file_index:
+            gt_index[file_id] = file_index
+    return gt_index
@@ -0,0 +1,156 @@
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from obj_det_metrics.variables import DetectionsDict, GroundTruthDict
+
+SCORE_DISTRIBUTIONS = ("uniform", "beta")
+
+
+def _generate_boxes(rng: np.random.Generator, n_boxes: int, image_size: Tuple[int, int]) -> np.ndarray:
+    """Helper function to generate random boxes lying inside an image
+
+    Args:
+        rng (np.random.Generator): Random number generator
+        n_boxes (int): Number of boxes to generate
+        image_size (Tuple[int, int]): Width and height of image
+
+    Returns:
+        np.ndarray: Array of shape (n_boxes, 4) of integer coordinates, in the form [xmin, ymin, xmax, ymax]
+    """
+    width, height = image_size
+    box_width = rng.integers(4, max(width // 4, 5), size=n_boxes)
+    box_height = rng.integers(4, max(height // 4, 5), size=n_boxes)
+    xmin = rng.integers(0, np.maximum(width - box_width, 1))
+    ymin = rng.integers(0, np.maximum(height - box_height, 1))
+    return np.stack([xmin, ymin, xmin + box_width - 1, ymin + box_height - 1], axis=1)
+
+
+def _generate_scores(
+    rng: np.random.Generator, n_scores: int, score_distribution: str, true_positive: bool
+) -> np.ndarray:
+    """Helper function to generate confidence scores, which are higher on average for true positives when drawn from
+    a beta distribution
+
+    Args:
+        rng (np.random.Generator): Random number generator
+        n_scores (int): Number of scores to generate
+        score_distribution (str): Either "uniform" or "beta"
+        true_positive (bool): Flag to indicate if scores are for detections of ground truths
+
+    Returns:
+        np.ndarray: Array of shape (n_scores,) of confidence scores
+    """
+    if score_distribution == "uniform":
+        return rng.random(n_scores)
+    return rng.beta(5.0, 2.0, size=n_scores) if true_positive else rng.beta(2.0, 5.0, size=n_scores)
+
+
+def generate_synthetic_dict_lists(
+    n_images: int = 100,
+    boxes_per_image: float = 10.0,
+    n_classes: int = 5,
+    image_size: Tuple[int, int] = (640, 480),
+    score_distribution: str = "beta",
+    jitter: float = 0.1,
+    miss_rate: float = 0.1,
+    false_positive_rate: float = 0.3,
+    seed: int = 0,
+) -> Tuple[List[GroundTruthDict], List[DetectionsDict]]:
+    """Overall function to generate a seeded synthetic dataset of ground truths and detections. Each image has a
+    Poisson-distributed number of ground truths. Each ground truth is detected with probability `1 - miss_rate`, by a
+    box whose corners are shifted by up to `jitter` times the box size, and each image also gets
+    Poisson-distributed false positives at random locations and classes.
+
+    Args:
+        n_images (int, optional): Number of images. Defaults to 100.
+        boxes_per_image (float, optional): Mean number of ground truths per image. Defaults to 10.0.
+        n_classes (int, optional): Number of classes, named "class0", "class1", etc. Defaults to 5.
+        image_size (Tuple[int, int], optional): Width and height of images. Defaults to (640, 480).
+        score_distribution (str, optional): Distribution of confidence scores, either "uniform" or "beta" (true
+            positives score higher than false positives on average). Defaults to "beta".
+        jitter (float, optional): Maximum shift of detection corners, as a fraction of the box size. Defaults to 0.1.
+        miss_rate (float, optional): Probability that a ground truth has no detection. Defaults to 0.1.
+        false_positive_rate (float, optional): Mean number of false positives per ground truth. Defaults to 0.3.
+        seed (int, optional): Seed of random number generator. Defaults to 0.
+
+    Returns:
+        Tuple[List[GroundTruthDict], List[DetectionsDict]]: Contains ground truth dicts and detections dicts
+    """
+    if score_distribution not in SCORE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown score distribution {score_distribution}, expected one of {SCORE_DISTRIBUTIONS}")
+    rng = np.random.default_rng(seed)
+    ground_truth_dict_list: List[GroundTruthDict] = []
+    detections_dict_list: List[DetectionsDict] = []
+    for image_idx in range(n_images):
+        file_id = f"image{image_idx:07d}"
+        n_gt = int(rng.poisson(boxes_per_image))
+        gt_coordinates = _generate_boxes(rng, n_gt, image_size)
+        gt_class_codes = rng.integers(0, n_classes, size=n_gt)
+
+        detected = rng.random(n_gt) >= miss_rate
+        box_sizes = np.tile(gt_coordinates[detected, 2:] - gt_coordinates[detected, :2] + 1, (1, 2))
+        shifts = np.rint(rng.uniform(-jitter, jitter, size=box_sizes.shape) * box_sizes).astype(np.int64)
+        tp_coordinates = gt_coordinates[detected] + shifts
+        # keep boxes valid after shifting corners
+        tp_coordinates[:, 2:] = np.maximum(tp_coordinates[:, 2:], tp_coordinates[:, :2])
+        n_fp = int(rng.poisson(false_positive_rate * max(n_gt, 1)))
+        fp_coordinates = _generate_boxes(rng, n_fp, image_size)
+
+        dt_coordinates = np.concatenate([tp_coordinates, fp_coordinates])
+        dt_class_codes = np.concatenate([gt_class_codes[detected], rng.integers(0, n_classes, size=n_fp)])
+        dt_scores = np.concatenate(
+            [
+                _generate_scores(rng, len(tp_coordinates), score_distribution, True),
+                _generate_scores(rng, n_fp, score_distribution, False),
+            ]
+        )
+        ground_truth_dict_list.append(
+            {
+                "coordinates": gt_coordinates.tolist(),
+                "class_labels": [f"class{code}" for code in gt_class_codes.tolist()],
+                "file_id": file_id,
+            }
+        )
+        detections_dict_list.append(
+            {
+                "coordinates": dt_coordinates.tolist(),
+                "class_labels": [f"class{code}" for code in dt_class_codes.tolist()],
+                "conf_scores": dt_scores.tolist(),
+                "file_id": file_id,
+            }
+        )
+    return ground_truth_dict_list, detections_dict_list
+
+
+def write_dict_lists_to_txts(
+    ground_truth_dict_list: List[GroundTruthDict],
+    detections_dict_list: List[DetectionsDict],
+    gt_txt_dir: str,
+    dt_txt_dir: str,
+):
+    """Overall function to write ground truths and detections dicts to directories of text files, in the formats read
+    by `generate_gt_dict_list_from_txts` and `generate_dt_dict_list_from_txts`. Confidence scores are written with
+    `repr`, so that they are read back exactly.
+
+    Args:
+        ground_truth_dict_list (List[GroundTruthDict]): List of dicts containing ground truth coordinates,
+            class labels and file IDs
+        detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
+            class labels, confidence scores and file IDs
+        gt_txt_dir (str): Directory to write text files of ground truths to
+        dt_txt_dir (str): Directory to write text files of detections to
+    """
+    os.makedirs(gt_txt_dir, exist_ok=True)
+    os.makedirs(dt_txt_dir, exist_ok=True)
+    for gt_dict in ground_truth_dict_list:
+        with open(os.path.join(gt_txt_dir, f"{gt_dict['file_id']}.txt"), "w") as f:
+            for class_label, coordinates in zip(gt_dict["class_labels"], gt_dict["coordinates"]):
+                f.write(f"{class_label} {' '.join(str(value) for value in coordinates)}\n")
+    for dt_dict in detections_dict_list:
+        with open(os.path.join(dt_txt_dir, f"{dt_dict['file_id']}.txt"), "w") as f:
+            for class_label, conf_score, coordinates in zip(
+                dt_dict["class_labels"], dt_dict["conf_scores"], dt_dict["coordinates"]
+            ):
+                f.write(f"{class_label} {conf_score!r} {' '.join(str(value) for value in coordinates)}\n")
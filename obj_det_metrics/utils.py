@@ -1,8 +1,11 @@
 # Adpated from https://github.com/Cartucho/mAP
 
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Any, Container, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+import numpy as np
+
+from obj_det_metrics.spatial_index import GtIndexDict
 from obj_det_metrics.variables import (
     BoundingBox,
     ClassName,
@@ -49,42 +52,182 @@ def _generate_gt_objs(
     return gt_count_per_class, gt_bboxes_dict
 
 
+def _select_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Helper function to select the `k` highest scores by partial selection, in O(n) instead of sorting. Among equal
+    scores at the cut-off, the earliest ones are selected, as a stable sort by descending score would.
+
+    Args:
+        scores (np.ndarray): Array of shape (n,) of confidence scores
+        k (int): Number of scores to select
+
+    Returns:
+        np.ndarray: Boolean array of shape (n,) flagging the selected scores
+    """
+    n_scores = len(scores)
+    if n_scores <= k:
+        return np.ones(n_scores, dtype=bool)
+    if k == 0:
+        return np.zeros(n_scores, dtype=bool)
+    kth_score = np.partition(scores, n_scores - k)[n_scores - k]
+    selected = scores > kth_score
+    n_ties = k - np.count_nonzero(selected)
+    selected[np.flatnonzero(scores == kth_score)[:n_ties]] = True
+    return selected
+
+
+def _select_detections(
+    scores: np.ndarray,
+    image_codes: np.ndarray,
+    max_detections_per_image: Optional[int],
+    min_score: Optional[float],
+    candidates: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
+    """Helper function to select the detections kept for evaluation: those scoring at least `min_score`, and then at
+    most the `max_detections_per_image` highest scoring ones of each image. Only images with more detections than
+    the limit are partially sorted.
+
+    Args:
+        scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+        image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+        max_detections_per_image (Optional[int]): Maximum number of detections kept in each image, or None for no
+            limit
+        min_score (Optional[float]): Minimum confidence score of kept detections, or None for no minimum
+        candidates (Optional[np.ndarray], optional): Boolean array of shape (n_dt,) flagging the detections that can
+            be kept, e.g. those of ground truth classes, or None if all can be kept. Defaults to None.
+
+    Returns:
+        Optional[np.ndarray]: Boolean array of shape (n_dt,) flagging kept detections, or None if all are kept
+    """
+    keep = np.ones(len(scores), dtype=bool) if candidates is None else candidates.copy()
+    if min_score is not None:
+        keep &= scores >= min_score
+    if max_detections_per_image is not None:
+        kept_idxs = np.flatnonzero(keep)
+        kept_image_codes = image_codes[kept_idxs]
+        counts = np.bincount(kept_image_codes) if len(kept_idxs) else np.zeros(0, dtype=np.int64)
+        crowded_image_codes = np.flatnonzero(counts > max_detections_per_image)
+        if len(crowded_image_codes):
+            # a stable argsort keeps the detections of each image in input order, to break ties by input order
+            image_idxs = kept_idxs[np.argsort(kept_image_codes, kind="stable")]
+            bounds = np.concatenate([[0], np.cumsum(counts)])
+            for image_code in crowded_image_codes:
+                start, end = bounds[image_code], bounds[image_code + 1]
+                idxs = image_idxs[start:end]
+                keep[idxs[~_select_top_k(scores[idxs], max_detections_per_image)]] = False
+    return None if keep.all() else keep
+
+
+def _prune_detections_dict(
+    dt_dict: DetectionsDict,
+    gt_classes: Container[ClassName],
+    max_detections_per_image: Optional[int],
+    min_score: Optional[float],
+) -> List[Tuple[Coordinates, ClassName, Any]]:
+    """Helper function to list the detections of one image that are kept for evaluation by `_select_detections`,
+    among those of ground truth classes
+
+    Args:
+        dt_dict (DetectionsDict): Dict containing detection coordinates, class labels, confidence scores and file ID
+            of single image
+        gt_classes (Container[ClassName]): Unique class labels in ground truth
+        max_detections_per_image (Optional[int]): Maximum number of detections kept, or None for no limit
+        min_score (Optional[float]): Minimum confidence score of kept detections, or None for no minimum
+
+    Returns:
+        List[Tuple[Coordinates, ClassName, Any]]: Coordinates, class label and confidence score of kept detections,
+            in input order
+    """
+    detections = list(zip(dt_dict["coordinates"], dt_dict["class_labels"], dt_dict["conf_scores"]))
+    candidates = np.array([class_label in gt_classes for class_label in dt_dict["class_labels"]], dtype=bool)
+    keep = _select_detections(
+        np.array(dt_dict["conf_scores"], dtype=np.float64),
+        np.zeros(len(detections), dtype=np.int64),
+        max_detections_per_image,
+        min_score,
+        candidates,
+    )
+    if keep is None:
+        return detections
+    return [detections[idx] for idx in np.flatnonzero(keep)]
+
+
+def _group_detections(
+    gt_classes: List[ClassName],
+    detections_dict_list: List[DetectionsDict],
+    gt_file_ids: Set[str],
+    max_detections_per_image: Optional[int] = None,
+    min_score: Optional[float] = None,
+) -> Dict[ClassName, List[BoundingBox]]:
+    """Helper function to partition detections by class in a single pass over `detections_dict_list`. Detections of
+    classes not found in ground truth are skipped. Within each class, bounding box objects keep their input order, so
+    they are laid out image by image. If `max_detections_per_image` or `min_score` is given, the detections of each
+    image are pruned before their bounding box objects are built.
+
+    Args:
+        gt_classes (List[ClassName]): List of unique class labels in ground truth
+        detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
+            class labels, confidence scores and file IDs
+        gt_file_ids (Set[str]): Set of unique file IDs for ground truth
+        max_detections_per_image (Optional[int], optional): Maximum number of detections of ground truth classes
+            kept in each image, by descending confidence score. Defaults to None.
+        min_score (Optional[float], optional): Minimum confidence score of kept detections. Defaults to None.
+
+    Returns:
+        Dict[ClassName, List[BoundingBox]]: Dict containing list of detection bounding box objects for each class,
+            in input order
+    """
+    dt_bboxes_dict: Dict[ClassName, List[BoundingBox]] = {class_name: [] for class_name in gt_classes}
+    prune = max_detections_per_image is not None or min_score is not None
+    for dt_dict in detections_dict_list:
+        file_id = dt_dict["file_id"]
+        # check if there is a corresponding ground truth file id
+        assert file_id in gt_file_ids, f"File ID {file_id} not found in ground truth list"
+        detections: Iterable[Tuple[Coordinates, ClassName, Any]]
+        if prune:
+            detections = _prune_detections_dict(dt_dict, dt_bboxes_dict, max_detections_per_image, min_score)
+        else:
+            detections = zip(dt_dict["coordinates"], dt_dict["class_labels"], dt_dict["conf_scores"])
+        for coordinates, class_label, conf_score in detections:
+            dt_bboxes = dt_bboxes_dict.get(class_label)
+            if dt_bboxes is not None:
+                dt_bboxes.append(
+                    BoundingBox(coordinates=coordinates, class_name=class_label, file_id=file_id, conf_score=conf_score)
+                )
+    return dt_bboxes_dict
+
+
 def _generate_dt_objs(
-    gt_classes: List[ClassName], detections_dict_list: List[DetectionsDict], gt_file_ids: Set[str]
+    gt_classes: List[ClassName],
+    detections_dict_list: List[DetectionsDict],
+    gt_file_ids: Set[str],
+    max_detections_per_image: Optional[int] = None,
+    min_score: Optional[float] = None,
 ) -> Dict[ClassName, List[BoundingBox]]:
     """Helper function to generate:
     - `dt_bboxes_dict`: : Dict containing list of detection bounding box objects for each class
 
+    Detections are grouped in a single pass by `_group_detections`, then each class is sorted by descending
+    confidence score. The sort is stable and detects already-sorted runs, so when each image's detections come
+    presorted by score (as most models output them), sorting a class only merges one run per image.
+
     Args:
         gt_classes (List[ClassName]): List of unique class labels in ground truth
         detections_dict_list (List[DetectionsDict]): List of dicts containing detection coordinates,
             class labels, confidence scores and file IDs
         gt_file_ids (Set[str]): Set of unique file IDs for ground truth
+        max_detections_per_image (Optional[int], optional): Maximum number of detections of ground truth classes
+            kept in each image, by descending confidence score. Defaults to None.
+        min_score (Optional[float], optional): Minimum confidence score of kept detections. Defaults to None.
 
     Returns:
         Dict[ClassName, List[BoundingBox]]: Dict `dt_bboxes_dict` containing list of detection bounding box objects
             for each class
     """
-    dt_bboxes_dict: Dict[ClassName, List[BoundingBox]] = defaultdict(lambda: [])
-    for class_name in gt_classes:
-        for dt_dict in detections_dict_list:
-            # check if there is a corresponding ground truth file id
-            assert dt_dict["file_id"] in gt_file_ids, f"File ID {dt_dict['file_id']} not found in ground truth list"
-            dt_len = len(dt_dict["class_labels"])
-            dt_bboxes_dict[class_name].extend(
-                [
-                    BoundingBox(
-                        coordinates=dt_dict["coordinates"][i],
-                        class_name=dt_dict["class_labels"][i],
-                        file_id=dt_dict["file_id"],
-                        conf_score=dt_dict["conf_scores"][i],
-                    )
-                    for i in range(dt_len)
-                    if dt_dict["class_labels"][i] == class_name
-                ]
-            )
-        dt_bboxes_dict[class_name].sort(key=lambda bbox: bbox.conf_score, reverse=True)
-
+    dt_bboxes_dict = _group_detections(
+        gt_classes, detections_dict_list, gt_file_ids, max_detections_per_image, min_score
+    )
+    for dt_bboxes in dt_bboxes_dict.values():
+        dt_bboxes.sort(key=lambda bbox: bbox._conf_score, reverse=True)
     return dt_bboxes_dict
 
 
@@ -114,45 +257,367 @@ def _compute_iou(dt_coordinates: Coordinates, gt_coordinates: Coordinates) -> fl
 
 
 def _get_best_gt_bbox(
-    dt_bbox: BoundingBox, class_name: ClassName, gt_bboxes_dict: Dict[str, List[BoundingBox]]
-) -> Tuple[BoundingBox, float]:
+    dt_bbox: BoundingBox,
+    class_name: ClassName,
+    gt_bboxes_dict: Dict[str, List[BoundingBox]],
+    gt_index: Optional[GtIndexDict] = None,
+) -> Tuple[Optional[BoundingBox], float]:
     """Helper function to select best ground truth bounding box and compute best IoU score for
-    inputted detecton bounding box
+    inputted detecton bounding box. IoU is computed inline from the precomputed box areas, with the same arithmetic
+    as `_compute_iou`.
 
     Args:
         dt_bbox (BoundingBox): Detection bounding box object
         class_name (ClassName): Class name to be used for comparison
         gt_bboxes_dict (Dict[str, List[BoundingBox]]): Dict containing list of ground truth bounding box objects for
             each file ID
+        gt_index (Optional[GtIndexDict], optional): Spatial indexes of ground truth bounding boxes, built by
+            `_build_gt_index`. For indexed classes, only boxes which can overlap the detection are compared, and the
+            best IoU score is -1.0 instead of 0.0 when none overlaps, so the index must only be used with a positive
+            IoU threshold. Defaults to None.
 
     Returns:
-        Tuple[BoundingBox, float]: Contains best ground truth bounding box object and best IoU score
+        Tuple[Optional[BoundingBox], float]: Contains best ground truth bounding box object and best IoU score, or
+            None and -1.0 if there is no ground truth box of the class to compare with
     """
-    dt_file_id = dt_bbox.file_id
-    gt_bboxes = gt_bboxes_dict[dt_file_id]
+    # the private slots are read directly instead of through the read-only properties, since this runs once per
+    # detection and candidate ground truth
+    dt_file_id = dt_bbox._file_id
+    dt_coordinates = dt_bbox._coordinates
+    class_index = gt_index.get(dt_file_id, {}).get(class_name) if gt_index is not None else None
+    if class_index is not None:
+        gt_bboxes = class_index.query(dt_coordinates)
+    else:
+        gt_bboxes = gt_bboxes_dict[dt_file_id]
+    dt_xmin, dt_ymin, dt_xmax, dt_ymax = dt_coordinates
+    dt_area = dt_bbox._area
     max_iou = -1.0
-    gt_match = BoundingBox([0, 0, 0, 0], class_name="empty", file_id=dt_file_id, conf_score=0.0)
-    dt_coordinates = dt_bbox.coordinates
+    gt_match = None
     for gt_bbox in gt_bboxes:
-        if gt_bbox.class_name == class_name:
-            gt_coordinates = gt_bbox.coordinates
-            iou = _compute_iou(dt_coordinates, gt_coordinates)
+        if gt_bbox._class_name == class_name:
+            gt_xmin, gt_ymin, gt_xmax, gt_ymax = gt_bbox._coordinates
+            int_width = max(min(dt_xmax, gt_xmax) - max(dt_xmin, gt_xmin) + 1, 0)
+            int_height = max(min(dt_ymax, gt_ymax) - max(dt_ymin, gt_ymin) + 1, 0)
+            int_area = int_width * int_height
+            iou = int_area / (dt_area + gt_bbox._area - int_area)
             if iou > max_iou:
                 max_iou = iou
                 gt_match = gt_bbox
     return gt_match, max_iou
 
 
-def _compute_counts_cumsum(values: List[int]):
-    """Helper function to compute cumulative sum of count values in-memory
+def _compute_iou_matrix(
+    dt_coordinates: np.ndarray, gt_coordinates: np.ndarray, gt_areas: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Helper function to compute IoU between every pair of detection and ground truth bounding boxes in one batched
+    operation. The arithmetic follows `_compute_iou` step by step, so each entry is bit-for-bit identical to the
+    scalar version.
+
+    Args:
+        dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates, in the form
+            [xmin, ymin, xmax, ymax]
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates, in the form
+            [xmin, ymin, xmax, ymax]
+        gt_areas (Optional[np.ndarray], optional): Array of shape (n_gt,) of precomputed ground truth areas, computed
+            with the same formula as here. Defaults to None.
+
+    Returns:
+        np.ndarray: Array of shape (n_dt, n_gt) of IoU scores
+    """
+    dt = dt_coordinates[:, None, :]
+    gt = gt_coordinates[None, :, :]
+    int_width = np.maximum(np.minimum(dt[..., 2], gt[..., 2]) - np.maximum(dt[..., 0], gt[..., 0]) + 1, 0)
+    int_height = np.maximum(np.minimum(dt[..., 3], gt[..., 3]) - np.maximum(dt[..., 1], gt[..., 1]) + 1, 0)
+    int_area = int_width * int_height
+    dt_area = (dt[..., 2] - dt[..., 0] + 1) * (dt[..., 3] - dt[..., 1] + 1)
+    if gt_areas is None:
+        gt_area = (gt[..., 2] - gt[..., 0] + 1) * (gt[..., 3] - gt[..., 1] + 1)
+    else:
+        gt_area = gt_areas[None, :]
+    union_area = dt_area + gt_area - int_area
+    return int_area / union_area
+
+
+def _compute_ioa_matrix(dt_coordinates: np.ndarray, gt_coordinates: np.ndarray) -> np.ndarray:
+    """Helper function to compute the intersection over detection area between every pair of detection and ground
+    truth bounding boxes, used for crowd regions, which a detection can lie within without overlapping much of them
+
+    Args:
+        dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates, in the form
+            [xmin, ymin, xmax, ymax]
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates, in the form
+            [xmin, ymin, xmax, ymax]
+
+    Returns:
+        np.ndarray: Array of shape (n_dt, n_gt) of intersection areas divided by detection areas, or 0 for detections
+            without area
+    """
+    dt = dt_coordinates[:, None, :]
+    gt = gt_coordinates[None, :, :]
+    int_width = np.maximum(np.minimum(dt[..., 2], gt[..., 2]) - np.maximum(dt[..., 0], gt[..., 0]) + 1, 0)
+    int_height = np.maximum(np.minimum(dt[..., 3], gt[..., 3]) - np.maximum(dt[..., 1], gt[..., 1]) + 1, 0)
+    int_area = int_width * int_height
+    dt_area = (dt[..., 2] - dt[..., 0] + 1) * (dt[..., 3] - dt[..., 1] + 1)
+    # degenerate detections without area lie within no ground truth
+    return np.divide(int_area, dt_area, out=np.zeros_like(int_area), where=dt_area > 0)
+
+
+def _mask_ignored_gts(
+    iou_matrix: np.ndarray,
+    dt_coordinates: np.ndarray,
+    dt_class_codes: np.ndarray,
+    gt_coordinates: np.ndarray,
+    gt_class_codes: np.ndarray,
+    gt_ignore: np.ndarray,
+) -> np.ndarray:
+    """Helper function to take the ignored ground truths (e.g. crowd regions) of an image out of its IoU matrix, so
+    that they are never matched, and to compute the intersection over detection area with each of them instead
+
+    Args:
+        iou_matrix (np.ndarray): Array of shape (n_dt, n_gt) of IoU scores, with entries for ground truths of a
+            different class set to -1.0. Entries for ignored ground truths are set to -1.0 in-memory
+        dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of float64 detection coordinates
+        dt_class_codes (np.ndarray): Array of shape (n_dt,) of detection class codes
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of float64 ground truth coordinates
+        gt_class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+        gt_ignore (np.ndarray): Boolean array of shape (n_gt,) flagging ignored ground truths
+
+    Returns:
+        np.ndarray: Array of shape (n_dt, n_ignored) of intersections over detection area with ignored ground
+            truths, set to -1.0 for ignored ground truths of a different class
+    """
+    ioa_matrix = _compute_ioa_matrix(dt_coordinates, gt_coordinates[gt_ignore])
+    ioa_matrix[dt_class_codes[:, None] != gt_class_codes[gt_ignore][None, :]] = -1.0
+    iou_matrix[:, gt_ignore] = -1.0
+    return ioa_matrix
+
+
+def _flag_ignored_detections(ioa_matrix: np.ndarray, tp: np.ndarray, iou_thresholds: np.ndarray) -> np.ndarray:
+    """Helper function to flag the detections of an image which are absorbed by an ignored ground truth: those which
+    are not true positives, and whose intersection over detection area with an ignored ground truth of their class
+    reaches the threshold. They count as neither true nor false positives.
+
+    Args:
+        ioa_matrix (np.ndarray): Array of shape (n_dt, n_ignored) of intersections over detection area with ignored
+            ground truths, set to -1.0 for ignored ground truths of a different class
+        tp (np.ndarray): Boolean array of shape (n_thr, n_dt) flagging true positive detections for each threshold
+        iou_thresholds (np.ndarray): Array of shape (n_thr,) of thresholds, shared by IoU and intersection over
+            detection area
+
+    Returns:
+        np.ndarray: Boolean array of shape (n_thr, n_dt) flagging ignored detections for each threshold
+    """
+    if ioa_matrix.shape[1] == 0:
+        return np.zeros_like(tp)
+    return ~tp & (ioa_matrix.max(axis=1)[None, :] >= iou_thresholds[:, None])
+
+
+def _greedy_match(iou_matrix: np.ndarray, iou_thresholds: np.ndarray) -> np.ndarray:
+    """Helper function to match detections of a single image to ground truths greedily, following the same rules as
+    the loop in `compute_ap_map`: each detection picks the ground truth with the highest IoU (first one on ties), and
+    is a true positive only if that IoU reaches the threshold and the ground truth has not been matched by a
+    higher-scoring detection. The best ground truth of each detection does not depend on the threshold, so it is
+    computed once and shared by all thresholds.
+
+    Args:
+        iou_matrix (np.ndarray): Array of shape (n_dt, n_gt) of IoU scores, with detections sorted by descending
+            confidence score. Entries for ground truths of a different class must be set to -1.0
+        iou_thresholds (np.ndarray): Array of shape (n_thr,) of IoU thresholds to determine if detection is true
+            positive
+
+    Returns:
+        np.ndarray: Boolean array of shape (n_thr, n_dt) flagging true positive detections for each threshold
+    """
+    n_dt, n_gt = iou_matrix.shape
+    tp = np.zeros((len(iou_thresholds), n_dt), dtype=bool)
+    if n_gt == 0:
+        return tp
+    best_gt = iou_matrix.argmax(axis=1)
+    max_iou = iou_matrix[np.arange(n_dt), best_gt]
+    for thr_idx, iou_threshold in enumerate(iou_thresholds):
+        candidates = np.flatnonzero(max_iou >= iou_threshold)
+        # only the first (highest-scoring) candidate for each ground truth gets to match it
+        _, first_idxs = np.unique(best_gt[candidates], return_index=True)
+        tp[thr_idx, candidates[first_idxs]] = True
+    return tp
+
+
+def _iter_images(
+    dt_scores: np.ndarray, dt_image_codes: np.ndarray, gt_image_codes: np.ndarray
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Helper function to iterate over the images holding detections, with the indices of their detections sorted by
+    descending confidence score and of their ground truths in input order
+
+    Args:
+        dt_scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+        dt_image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+        gt_image_codes (np.ndarray): Array of shape (n_gt,) of ground truth image codes
+
+    Yields:
+        Iterator[Tuple[np.ndarray, np.ndarray]]: Indices of detections and of ground truths of each image
+    """
+    # lexsort is stable, so detections with equal scores keep their input order within each image
+    dt_order = np.lexsort((-dt_scores, dt_image_codes))
+    gt_order = np.argsort(gt_image_codes, kind="stable")
+    n_images = int(max(dt_image_codes.max(initial=-1), gt_image_codes.max(initial=-1))) + 1
+    dt_bounds = np.searchsorted(dt_image_codes[dt_order], np.arange(n_images + 1))
+    gt_bounds = np.searchsorted(gt_image_codes[gt_order], np.arange(n_images + 1))
+    for image_code in range(n_images):
+        dt_start, dt_end = dt_bounds[image_code], dt_bounds[image_code + 1]
+        if dt_start == dt_end:
+            continue
+        gt_start, gt_end = gt_bounds[image_code], gt_bounds[image_code + 1]
+        yield dt_order[dt_start:dt_end], gt_order[gt_start:gt_end]
+
+
+def _match_detections(
+    dt_coordinates: np.ndarray,
+    dt_scores: np.ndarray,
+    dt_class_codes: np.ndarray,
+    dt_image_codes: np.ndarray,
+    gt_coordinates: np.ndarray,
+    gt_class_codes: np.ndarray,
+    gt_image_codes: np.ndarray,
+    iou_thresholds: np.ndarray,
+    gt_matched: Optional[np.ndarray] = None,
+    gt_areas: Optional[np.ndarray] = None,
+    gt_ignore: Optional[np.ndarray] = None,
+    dt_ignored: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Helper function to flag true positive detections, computing one IoU matrix per image between all of its
+    detections and ground truths. Coordinates are upcast to float64 before computing IoU, and each IoU matrix is
+    shared by all thresholds. Ignored ground truths are never matched, and absorb the detections that lie within
+    them instead (see `_flag_ignored_detections`).
 
     Args:
-        values (List[int]): List of counts to compute cumulative sum over
+        dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates
+        dt_scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+        dt_class_codes (np.ndarray): Array of shape (n_dt,) of detection class codes
+        dt_image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates
+        gt_class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+        gt_image_codes (np.ndarray): Array of shape (n_gt,) of ground truth image codes
+        iou_thresholds (np.ndarray): Array of shape (n_thr,) of IoU thresholds to determine if detection is true
+            positive
+        gt_matched (Optional[np.ndarray], optional): Boolean array of shape (n_thr, n_gt) which, if given, is set
+            in-memory to flag ground truths matched by a detection. Defaults to None.
+        gt_areas (Optional[np.ndarray], optional): Array of shape (n_gt,) of precomputed float64 ground truth areas.
+            Defaults to None.
+        gt_ignore (Optional[np.ndarray], optional): Boolean array of shape (n_gt,) flagging ignored ground truths,
+            e.g. crowd regions. Defaults to None.
+        dt_ignored (Optional[np.ndarray], optional): Boolean array of shape (n_thr, n_dt) which, if given, is set
+            in-memory to flag detections absorbed by an ignored ground truth. Defaults to None.
+
+    Returns:
+        np.ndarray: Boolean array of shape (n_thr, n_dt) flagging true positive detections, in input order
+    """
+    tp = np.zeros((len(iou_thresholds), len(dt_scores)), dtype=bool)
+    for dt_idxs, gt_idxs in _iter_images(dt_scores, dt_image_codes, gt_image_codes):
+        image_dt_coordinates = dt_coordinates[dt_idxs].astype(np.float64)
+        image_gt_coordinates = gt_coordinates[gt_idxs].astype(np.float64)
+        iou_matrix = _compute_iou_matrix(
+            image_dt_coordinates, image_gt_coordinates, None if gt_areas is None else gt_areas[gt_idxs]
+        )
+        iou_matrix[dt_class_codes[dt_idxs][:, None] != gt_class_codes[gt_idxs][None, :]] = -1.0
+        image_gt_ignore = None if gt_ignore is None else gt_ignore[gt_idxs]
+        if image_gt_ignore is not None and image_gt_ignore.any():
+            ioa_matrix = _mask_ignored_gts(
+                iou_matrix,
+                image_dt_coordinates,
+                dt_class_codes[dt_idxs],
+                image_gt_coordinates,
+                gt_class_codes[gt_idxs],
+                image_gt_ignore,
+            )
+        else:
+            ioa_matrix = np.empty((len(dt_idxs), 0))
+        image_tp = _greedy_match(iou_matrix, iou_thresholds)
+        tp[:, dt_idxs] = image_tp
+        if dt_ignored is not None:
+            dt_ignored[:, dt_idxs] = _flag_ignored_detections(ioa_matrix, image_tp, iou_thresholds)
+        if gt_matched is not None and image_tp.any():
+            best_gt_idxs = gt_idxs[iou_matrix.argmax(axis=1)]
+            for thr_idx in range(len(iou_thresholds)):
+                gt_matched[thr_idx, best_gt_idxs[image_tp[thr_idx]]] = True
+    return tp
+
+
+def _match_detections_per_area_range(
+    dt_coordinates: np.ndarray,
+    dt_scores: np.ndarray,
+    dt_class_codes: np.ndarray,
+    dt_image_codes: np.ndarray,
+    gt_coordinates: np.ndarray,
+    gt_class_codes: np.ndarray,
+    gt_image_codes: np.ndarray,
+    iou_thresholds: np.ndarray,
+    dt_range_masks: np.ndarray,
+    gt_range_masks: np.ndarray,
+    gt_areas: Optional[np.ndarray] = None,
+    gt_ignore: Optional[np.ndarray] = None,
+    dt_ignored: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Helper function to flag true positive detections separately for several subsets of boxes, e.g. area ranges,
+    as if each subset of detections were matched against the same subset of ground truths alone. The IoU matrix of
+    each image is computed once and shared by all subsets and thresholds.
+
+    Args:
+        dt_coordinates (np.ndarray): Array of shape (n_dt, 4) of detection coordinates
+        dt_scores (np.ndarray): Array of shape (n_dt,) of detection confidence scores
+        dt_class_codes (np.ndarray): Array of shape (n_dt,) of detection class codes
+        dt_image_codes (np.ndarray): Array of shape (n_dt,) of detection image codes
+        gt_coordinates (np.ndarray): Array of shape (n_gt, 4) of ground truth coordinates
+        gt_class_codes (np.ndarray): Array of shape (n_gt,) of ground truth class codes
+        gt_image_codes (np.ndarray): Array of shape (n_gt,) of ground truth image codes
+        iou_thresholds (np.ndarray): Array of shape (n_thr,) of IoU thresholds to determine if detection is true
+            positive
+        dt_range_masks (np.ndarray): Boolean array of shape (n_ranges, n_dt) flagging detections of each subset
+        gt_range_masks (np.ndarray): Boolean array of shape (n_ranges, n_gt) flagging ground truths of each subset
+        gt_areas (Optional[np.ndarray], optional): Array of shape (n_gt,) of precomputed float64 ground truth areas.
+            Defaults to None.
+        gt_ignore (Optional[np.ndarray], optional): Boolean array of shape (n_gt,) flagging ignored ground truths,
+            e.g. crowd regions. Defaults to None.
+        dt_ignored (Optional[np.ndarray], optional): Boolean array of shape (n_ranges, n_thr, n_dt) which, if given,
+            is set in-memory to flag detections of each subset absorbed by an ignored ground truth of the same subset.
+            Defaults to None.
+
+    Returns:
+        np.ndarray: Boolean array of shape (n_ranges, n_thr, n_dt) flagging true positive detections of each subset,
+            in input order
     """
-    cumsum = 0
-    for idx, val in enumerate(values):
-        values[idx] += cumsum
-        cumsum += val
+    tp = np.zeros((len(dt_range_masks), len(iou_thresholds), len(dt_scores)), dtype=bool)
+    for dt_idxs, gt_idxs in _iter_images(dt_scores, dt_image_codes, gt_image_codes):
+        image_dt_coordinates = dt_coordinates[dt_idxs].astype(np.float64)
+        image_gt_coordinates = gt_coordinates[gt_idxs].astype(np.float64)
+        iou_matrix = _compute_iou_matrix(
+            image_dt_coordinates, image_gt_coordinates, None if gt_areas is None else gt_areas[gt_idxs]
+        )
+        iou_matrix[dt_class_codes[dt_idxs][:, None] != gt_class_codes[gt_idxs][None, :]] = -1.0
+        image_gt_ignore = np.zeros(len(gt_idxs), dtype=bool) if gt_ignore is None else gt_ignore[gt_idxs]
+        ioa_matrix = np.empty((len(dt_idxs), 0))
+        if image_gt_ignore.any():
+            ioa_matrix = _mask_ignored_gts(
+                iou_matrix,
+                image_dt_coordinates,
+                dt_class_codes[dt_idxs],
+                image_gt_coordinates,
+                gt_class_codes[gt_idxs],
+                image_gt_ignore,
+            )
+        for range_idx, (dt_range_mask, gt_range_mask) in enumerate(zip(dt_range_masks, gt_range_masks)):
+            # rows keep their order, so detections of the subset stay sorted by descending score
+            rows = dt_range_mask[dt_idxs]
+            range_iou_matrix = iou_matrix[rows]
+            range_iou_matrix[:, ~gt_range_mask[gt_idxs]] = -1.0
+            range_tp = _greedy_match(range_iou_matrix, iou_thresholds)
+            tp[range_idx][:, dt_idxs[rows]] = range_tp
+            if dt_ignored is not None and ioa_matrix.shape[1]:
+                range_ioa_matrix = ioa_matrix[rows]
+                range_ioa_matrix[:, ~gt_range_mask[gt_idxs][image_gt_ignore]] = -1.0
+                dt_ignored[range_idx][:, dt_idxs[rows]] = _flag_ignored_detections(
+                    range_ioa_matrix, range_tp, iou_thresholds
+                )
+    return tp
 
 
 def _generate_empty_gt_dict() -> GroundTruthDict:
@@ -1,15 +1,26 @@
 # Adapted from https://github.com/LeMuecke/mapcalc
 
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Sequence, Union
 
 ClassName = Union[str, int]
 GroundTruthDict = Dict[str, Any]
 DetectionsDict = Dict[str, Any]
-Coordinates = List[Union[int, float]]
+Coordinates = Sequence[Union[int, float]]
 OutputsDict = Dict[str, Any]
 
+# IoU thresholds of COCO mAP@[.5:.95]
+COCO_IOU_THRESHOLDS = [0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95]
+
+# area ranges of COCO small, medium and large objects, in squared pixels
+COCO_AREA_RANGES = {"small": (0.0, 32.0**2), "medium": (32.0**2, 96.0**2), "large": (96.0**2, float("inf"))}
+
 
 class BoundingBox:
+    # slots instead of a per-instance dict, since boxes are created once per ground truth and detection. The
+    # properties keep the fields read-only, and the sorting and matching loops of the python engine read the slots
+    # directly
+    __slots__ = ("_coordinates", "_class_name", "_file_id", "_matched", "_conf_score", "_area")
+
     def __init__(
         self,
         coordinates: Coordinates,
@@ -18,7 +29,8 @@ class BoundingBox:
         matched: bool = False,
         conf_score: float = 1.0,
     ) -> None:
-        """Initialize class variables
+        """Initialize class variables. Coordinates are copied once into a tuple, so that the area of the box, which is
+        precomputed for IoU computations, cannot go stale.
 
         Args:
             coordinates (Coordinates): Coordinates of bounding box, in the form [xmin, ymin, xmax, ymax]
@@ -29,18 +41,20 @@ class BoundingBox:
             conf_score (float, optional): Applies to  detection bounding box only. Confidence score of bounding box.
                 Defaults to 1.0.
         """
-        self._coordinates = coordinates
+        self._coordinates = tuple(coordinates)
         self._class_name = class_name
         self._file_id = file_id
         self._matched = matched
         self._conf_score = conf_score
+        # same arithmetic as `_compute_iou`, so that IoU scores computed from it are identical
+        self._area = (coordinates[2] - coordinates[0] + 1) * (coordinates[3] - coordinates[1] + 1)
 
     @property
     def coordinates(self) -> Coordinates:
-        """Returns read-only bounding box coordinates in the form [xmin, ymin, xmax, ymax]
+        """Returns read-only bounding box coordinates in the form (xmin, ymin, xmax, ymax)
 
         Returns:
-            Coordinates: Bounding box in the form [xmin, ymin, xmax, ymax]
+            Coordinates: Bounding box in the form (xmin, ymin, xmax, ymax)
         """
         return self._coordinates
 
@@ -81,6 +95,15 @@ class BoundingBox:
         """
         return self._conf_score
 
+    @property
+    def area(self) -> float:
+        """Returns read-only area of bounding box, in squared pixels with inclusive coordinates
+
+        Returns:
+            float: Area of bounding box
+        """
+        return self._area
+
     def set_matched(self, matched: bool):
         """Method to set `matched` flag for ground truth bounding box
 
@@ -1,4 +1,16 @@
-from obj_det_metrics.ap_map import compute_ap_map
+import numpy as np
+import pytest
+
+from obj_det_metrics.ap_map import (
+    _compute_coco101_ap,
+    _compute_operating_points,
+    _compute_pr_curve,
+    _compute_voc07_ap,
+    _voc_ap_array,
+    compute_ap_map,
+)
+from obj_det_metrics.columnar import ColumnarDataset, ColumnarDetections
+from obj_det_metrics.variables import COCO_IOU_THRESHOLDS
 
 GROUND_TRUTH_DICT_LIST = [
     {
@@ -37,3 +49,361 @@ def test_compute_ap_map():
     assert 0.99 < output["ap"]["class2"] < 1.01, "Wrong AP for class2"
     assert 0.24 < output["ap"]["class3"] < 0.26, "Wrong AP for class3"
     assert 0.16 < output["ap"]["class4"] < 0.17, "Wrong AP for class4"
+
+
+def _generate_random_dict_lists(seed, n_images=20, n_classes=5):
+    rng = np.random.default_rng(seed)
+    ground_truth_dict_list, detections_dict_list = [], []
+    for image_idx in range(n_images):
+        n_gt = int(rng.integers(0, 8))
+        gt_xy = rng.integers(0, 100, size=(n_gt, 2))
+        gt_wh = rng.integers(1, 40, size=(n_gt, 2))
+        gt_coordinates = np.concatenate([gt_xy, gt_xy + gt_wh], axis=1)
+        ground_truth_dict_list.append(
+            {
+                "coordinates": gt_coordinates.tolist(),
+                "class_labels": [f"class{code}" for code in rng.integers(0, n_classes, size=n_gt)],
+                "file_id": f"image{image_idx}",
+            }
+        )
+        n_dt = int(rng.integers(0, 12))
+        jitter = rng.integers(-5, 6, size=(n_dt, 4))
+        source_idxs = rng.integers(0, max(n_gt, 1), size=n_dt)
+        dt_coordinates = gt_coordinates[source_idxs] + jitter if n_gt else np.abs(jitter) + [0, 0, 10, 10]
+        detections_dict_list.append(
+            {
+                "coordinates": dt_coordinates.tolist(),
+                "class_labels": [f"class{code}" for code in rng.integers(0, n_classes, size=n_dt)],
+                # rounded scores so that ties between detections occur
+                "conf_scores": np.round(rng.random(n_dt), 1).tolist(),
+                "file_id": f"image{image_idx}",
+            }
+        )
+    return ground_truth_dict_list, detections_dict_list
+
+
+def test_compute_ap_map_numpy_engine():
+    output = compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, iou_threshold=0.5, engine="numpy")
+    expected_output = compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, iou_threshold=0.5)
+    assert output == expected_output, "Outputs of numpy engine differ from python engine"
+
+
+@pytest.mark.parametrize("seed, iou_threshold", [(0, 0.5), (1, 0.3), (2, 0.75), (3, 0.0)])
+def test_compute_ap_map_numpy_engine_random(seed, iou_threshold):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(seed)
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_threshold, engine="numpy")
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_threshold)
+    assert output == expected_output, "Outputs of numpy engine differ from python engine"
+
+
+def test_compute_ap_map_unknown_engine():
+    with pytest.raises(ValueError):
+        compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, engine="unknown")
+
+
+def test_compute_ap_map_iou_thresholds():
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(4)
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS)
+    assert list(output["per_threshold"]) == COCO_IOU_THRESHOLDS, "Wrong thresholds in per_threshold outputs"
+    for iou_threshold in COCO_IOU_THRESHOLDS:
+        expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_threshold)
+        assert (
+            output["per_threshold"][iou_threshold] == expected_output
+        ), f"Wrong outputs for IoU threshold {iou_threshold}"
+    expected_map = np.mean([output["per_threshold"][thr]["map"] for thr in COCO_IOU_THRESHOLDS])
+    assert output["map"] == pytest.approx(expected_map), "Wrong averaged mAP"
+    assert output["map"] == pytest.approx(np.mean(list(output["ap"].values()))), "Wrong averaged APs"
+
+
+def test_compute_ap_map_empty_iou_thresholds():
+    with pytest.raises(ValueError):
+        compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, iou_thresholds=[])
+
+
+@pytest.mark.parametrize("n_workers", [2, 3])
+def test_compute_ap_map_n_workers(n_workers):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(5)
+    output = compute_ap_map(
+        ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS, n_workers=n_workers
+    )
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS)
+    assert output == expected_output, "Outputs of parallel evaluation differ from serial evaluation"
+
+
+def _voc_ap_reference(rec, prec):
+    # loop from the VOC2012 devkit
+    mrec = [0.0] + rec + [1.0]
+    mpre = [0.0] + prec + [0.0]
+    for i in range(len(mpre) - 2, -1, -1):
+        mpre[i] = max(mpre[i], mpre[i + 1])
+    ap = sum((mrec[i] - mrec[i - 1]) * mpre[i] for i in range(1, len(mrec)) if mrec[i] != mrec[i - 1])
+    return ap, mrec, mpre
+
+
+@pytest.mark.parametrize("seed, n_detections", [(0, 0), (1, 1), (2, 50), (3, 1000)])
+def test_voc_ap_array(seed, n_detections):
+    rng = np.random.default_rng(seed)
+    rec, prec = _compute_pr_curve(rng.random(n_detections) < 0.6, max(n_detections // 2, 1))
+    rec_copy, prec_copy = rec.copy(), prec.copy()
+    ap, mrec, mpre = _voc_ap_array(rec, prec)
+    expected_ap, expected_mrec, expected_mpre = _voc_ap_reference(rec.tolist(), prec.tolist())
+    assert ap == pytest.approx(expected_ap, rel=1e-12, abs=1e-15), "Wrong AP"
+    assert mrec.tolist() == expected_mrec, "Wrong interpolated recall values"
+    assert mpre.tolist() == expected_mpre, "Wrong interpolated precision values"
+    assert np.array_equal(rec, rec_copy) and np.array_equal(prec, prec_copy), "Inputs should not be modified"
+
+
+def _voc07_ap_reference(rec, prec):
+    # loop from the VOC2007 devkit
+    ap = 0.0
+    for t in np.arange(0.0, 1.1, 0.1):
+        p = np.max(prec[rec >= t]) if np.sum(rec >= t) else 0.0
+        ap = ap + p / 11.0
+    return ap
+
+
+def _coco101_ap_reference(rec, prec):
+    # loop from the COCO API
+    pr = prec.tolist()
+    for i in range(len(pr) - 1, 0, -1):
+        if pr[i] > pr[i - 1]:
+            pr[i - 1] = pr[i]
+    q = np.zeros(101)
+    inds = np.searchsorted(rec, np.linspace(0.0, 1.00, 101), side="left")
+    for ri, pi in enumerate(inds):
+        if pi < len(pr):
+            q[ri] = pr[pi]
+    return np.mean(q)
+
+
+@pytest.mark.parametrize("seed, n_detections", [(0, 0), (1, 1), (2, 50), (3, 1000)])
+def test_ap_integrators(seed, n_detections):
+    rng = np.random.default_rng(seed)
+    rec, prec = _compute_pr_curve(rng.random(n_detections) < 0.6, max(n_detections // 2, 1))
+    assert _compute_voc07_ap(rec, prec) == pytest.approx(_voc07_ap_reference(rec, prec)), "Wrong VOC2007 AP"
+    assert _compute_coco101_ap(rec, prec) == pytest.approx(_coco101_ap_reference(rec, prec)), "Wrong COCO AP"
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"engine": "numpy"}, {"spatial_index_min_boxes": None}, {"iou_thresholds": COCO_IOU_THRESHOLDS}]
+)
+def test_compute_ap_map_interpolations(kwargs):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(6)
+    interpolations = ["coco101", "voc2012", "voc07"]
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, interpolation=interpolations, **kwargs)
+    assert list(output["per_interpolation"]) == interpolations, "Wrong modes in per_interpolation outputs"
+    for interpolation in interpolations:
+        expected_output = compute_ap_map(
+            ground_truth_dict_list, detections_dict_list, interpolation=interpolation, **kwargs
+        )
+        assert output["per_interpolation"][interpolation] == expected_output, f"Wrong outputs for {interpolation}"
+    assert output["map"] == output["per_interpolation"]["coco101"]["map"], "Top-level outputs should be of first mode"
+    assert output["map"] != output["per_interpolation"]["voc07"]["map"]
+
+
+@pytest.mark.parametrize("interpolation", ["voc2010", []])
+def test_compute_ap_map_invalid_interpolation(interpolation):
+    with pytest.raises(ValueError):
+        compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, interpolation=interpolation)
+
+
+def _prune_dict_list(detections_dict_list, max_detections_per_image, min_score):
+    pruned_dict_list = []
+    for dt_dict in detections_dict_list:
+        idxs = [idx for idx, score in enumerate(dt_dict["conf_scores"]) if score >= min_score]
+        idxs = sorted(sorted(idxs, key=lambda idx: -dt_dict["conf_scores"][idx])[:max_detections_per_image])
+        pruned_dict_list.append(
+            {
+                "coordinates": [dt_dict["coordinates"][idx] for idx in idxs],
+                "class_labels": [dt_dict["class_labels"][idx] for idx in idxs],
+                "conf_scores": [dt_dict["conf_scores"][idx] for idx in idxs],
+                "file_id": dt_dict["file_id"],
+            }
+        )
+    return pruned_dict_list
+
+
+@pytest.mark.parametrize("max_detections_per_image, min_score", [(3, None), (None, 0.45), (4, 0.25), (1000, None)])
+def test_compute_ap_map_pruning(max_detections_per_image, min_score):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(7)
+    kwargs = {"max_detections_per_image": max_detections_per_image, "min_score": min_score}
+    expected_output = compute_ap_map(
+        ground_truth_dict_list,
+        _prune_dict_list(detections_dict_list, max_detections_per_image, min_score or 0.0),
+    )
+    assert compute_ap_map(ground_truth_dict_list, detections_dict_list, **kwargs) == expected_output
+    assert compute_ap_map(ground_truth_dict_list, detections_dict_list, engine="numpy", **kwargs) == expected_output
+    detections = ColumnarDetections.from_dicts(detections_dict_list, dtype=np.float64)
+    assert compute_ap_map(ground_truth_dict_list, detections, **kwargs) == expected_output
+    dataset = ColumnarDataset.from_dicts(ground_truth_dict_list, detections_dict_list, dtype=np.float64)
+    assert compute_ap_map(dataset, **kwargs) == expected_output
+    if max_detections_per_image == 1000:
+        assert expected_output == compute_ap_map(ground_truth_dict_list, detections_dict_list)
+
+
+def test_compute_ap_map_invalid_max_detections_per_image():
+    with pytest.raises(ValueError):
+        compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, max_detections_per_image=0)
+
+
+def test_compute_operating_points():
+    rec, prec = _compute_pr_curve(np.array([True, False, True, False]), 2)
+    operating_points = _compute_operating_points(np.array([0.9, 0.8, 0.8, 0.5]), rec, prec)
+    np.testing.assert_array_equal(operating_points["score_thresholds"], [0.9, 0.8, 0.5])
+    np.testing.assert_allclose(operating_points["precision"], [1.0, 2 / 3, 0.5])
+    np.testing.assert_allclose(operating_points["recall"], [0.5, 1.0, 1.0])
+    np.testing.assert_allclose(operating_points["f1"], [2 / 3, 0.8, 2 / 3])
+    assert operating_points["best_threshold"] == 0.8
+    assert operating_points["best_f1"] == pytest.approx(0.8)
+
+    operating_points = _compute_operating_points(np.array([]), *_compute_pr_curve(np.array([], dtype=bool), 2))
+    assert len(operating_points["f1"]) == 0
+    assert operating_points["best_threshold"] is None and operating_points["best_f1"] == 0.0
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_compute_ap_map_operating_points(seed):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(seed)
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, operating_points=True)
+    assert output["ap"] == compute_ap_map(ground_truth_dict_list, detections_dict_list)["ap"]
+    numpy_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, engine="numpy", operating_points=True)
+    for class_name, operating_points in output["operating_points"].items():
+        for key, values in operating_points.items():
+            np.testing.assert_array_equal(numpy_output["operating_points"][class_name][key], values)
+
+        # each operating point matches an evaluation of the detections scoring at least its threshold
+        for idx, score_threshold in enumerate(operating_points["score_thresholds"]):
+            filtered_output = compute_ap_map(
+                ground_truth_dict_list, detections_dict_list, min_score=score_threshold, operating_points=True
+            )
+            filtered_points = filtered_output["operating_points"][class_name]
+            assert filtered_points["score_thresholds"][-1] == score_threshold
+            for key in ("precision", "recall", "f1"):
+                assert filtered_points[key][-1] == operating_points[key][idx]
+        if len(operating_points["f1"]):
+            assert operating_points["best_f1"] == operating_points["f1"].max()
+
+    output = compute_ap_map(
+        ground_truth_dict_list, detections_dict_list, iou_thresholds=[0.5, 0.75], operating_points=True
+    )
+    assert "operating_points" not in output
+    assert all("operating_points" in outputs_dict for outputs_dict in output["per_threshold"].values())
+
+
+def _filter_dict_list_by_area(dict_list, lower, upper):
+    filtered_dict_list = []
+    for box_dict in dict_list:
+        idxs = [
+            idx
+            for idx, (xmin, ymin, xmax, ymax) in enumerate(box_dict["coordinates"])
+            if lower <= (xmax - xmin + 1) * (ymax - ymin + 1) < upper
+        ]
+        filtered_dict = {key: [values[idx] for idx in idxs] for key, values in box_dict.items() if key != "file_id"}
+        filtered_dict["file_id"] = box_dict["file_id"]
+        filtered_dict_list.append(filtered_dict)
+    return filtered_dict_list
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"iou_threshold": 0.3}, {"iou_thresholds": [0.5, 0.75]}, {"interpolation": ["coco101", "voc07"]}]
+)
+def test_compute_ap_map_area_ranges(kwargs):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(4, n_images=40)
+    area_ranges = {"small": (0.0, 150.0), "medium": (150.0, 600.0), "large": (600.0, float("inf"))}
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, area_ranges=area_ranges, **kwargs)
+    per_area_range = output.pop("per_area_range")
+    assert output == compute_ap_map(ground_truth_dict_list, detections_dict_list, engine="numpy", **kwargs)
+    assert list(per_area_range.keys()) == ["small", "medium", "large"]
+    for range_name, (lower, upper) in area_ranges.items():
+        expected_output = compute_ap_map(
+            _filter_dict_list_by_area(ground_truth_dict_list, lower, upper),
+            _filter_dict_list_by_area(detections_dict_list, lower, upper),
+            **kwargs,
+        )
+        assert per_area_range[range_name] == expected_output, f"Wrong outputs for area range {range_name}"
+
+
+def test_compute_ap_map_empty_area_range():
+    output = compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, area_ranges={"huge": (1e6, float("inf"))})
+    assert output["per_area_range"]["huge"]["ap"] == {}
+    assert np.isnan(output["per_area_range"]["huge"]["map"])
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"operating_points": True}, {"interpolation": ["voc2012", "coco101"]}, {"iou_thresholds": [0.5, 0.7]}],
+)
+def test_compute_ap_map_empty_ground_truths(kwargs):
+    ground_truth_dict_list = [{"coordinates": [], "class_labels": [], "file_id": "image"}]
+    detections_dict_list = [
+        {"coordinates": [[0, 0, 9, 9]], "class_labels": ["person"], "conf_scores": [0.5], "file_id": "image"}
+    ]
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, engine="python", **kwargs)
+    assert output["ap"] == {} and np.isnan(output["map"])
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, engine="numpy", **kwargs)
+    assert str(output) == str(expected_output), "Outputs of python engine differ from numpy engine"
+
+
+@pytest.mark.parametrize("area_ranges", [{}, {"small": (100, 100)}])
+def test_compute_ap_map_invalid_area_ranges(area_ranges):
+    with pytest.raises(ValueError):
+        compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, area_ranges=area_ranges)
+
+
+CROWD_GROUND_TRUTH_DICT_LIST = [
+    {
+        "coordinates": [[0, 0, 9, 9], [20, 0, 59, 39], [70, 70, 79, 79]],
+        "class_labels": ["person", "person", "car"],
+        "ignore_flags": [False, True, True],
+        "file_id": "image",
+    },
+]
+
+CROWD_DETECTIONS_DICT_LIST = [
+    {
+        "coordinates": [[25, 5, 34, 14], [0, 0, 9, 9], [100, 100, 109, 109], [70, 70, 79, 79]],
+        "class_labels": ["person", "person", "person", "car"],
+        "conf_scores": [0.95, 0.9, 0.7, 0.8],
+        "file_id": "image",
+    },
+]
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"engine": "numpy"}, {"n_workers": 2}, {"iou_thresholds": [0.5, 0.75]}])
+def test_compute_ap_map_ignore_flags(kwargs):
+    output = compute_ap_map(CROWD_GROUND_TRUTH_DICT_LIST, CROWD_DETECTIONS_DICT_LIST, **kwargs)
+    # the first detection lies within the crowd region, so it is neither a true nor a false positive, and the car
+    # class, with only an ignored ground truth, is not evaluated
+    assert output["ap"] == {"person": 1.0}, f"Wrong APs with ignored ground truths: {output['ap']}"
+    assert output["map"] == 1.0
+
+    ground_truth_dict_list = [dict(CROWD_GROUND_TRUTH_DICT_LIST[0], ignore_flags=[False, False, False])]
+    output = compute_ap_map(ground_truth_dict_list, CROWD_DETECTIONS_DICT_LIST, **kwargs)
+    assert output["ap"]["person"] == pytest.approx(0.5 * 0.5), "Ground truths without ignore flags should be matched"
+
+
+@pytest.mark.parametrize("seed", [2, 3])
+def test_compute_ap_map_ignore_flags_random(seed):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(seed, n_images=30)
+    rng = np.random.default_rng(seed)
+    for gt_dict in ground_truth_dict_list:
+        gt_dict["ignore_flags"] = (rng.random(len(gt_dict["class_labels"])) < 0.2).tolist()
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=[0.3, 0.5])
+    assert output == compute_ap_map(
+        ground_truth_dict_list, detections_dict_list, iou_thresholds=[0.3, 0.5], n_workers=2
+    )
+    area_output = compute_ap_map(
+        ground_truth_dict_list,
+        detections_dict_list,
+        iou_thresholds=[0.3, 0.5],
+        area_ranges={"all": (float("-inf"), float("inf"))},
+    )
+    per_area_range = area_output.pop("per_area_range")
+    assert area_output == output
+    assert per_area_range["all"] == output
+
+    # each threshold gives the same outputs when evaluated alone
+    for iou_threshold in [0.3, 0.5]:
+        dataset = ColumnarDataset.from_dicts(ground_truth_dict_list, detections_dict_list, dtype=np.float64)
+        threshold_output = compute_ap_map(dataset, iou_threshold=iou_threshold)
+        assert threshold_output == output["per_threshold"][iou_threshold]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.async_ingest import (
+    compute_ap_map_from_txts_async,
+    generate_dt_dicts_from_txts_async,
+    generate_gt_dicts_from_txts_async,
+    update_evaluator_async,
+)
+from obj_det_metrics.evaluator import APEvaluator
+from obj_det_metrics.ingest import (
+    generate_dt_dict_list_from_txts,
+    generate_gt_dict_list_from_txts,
+)
+from tests.test_ap_map import _generate_random_dict_lists
+
+GT_DIR = "tests/fixtures/test_ground_truths"
+DT_DIR = "tests/fixtures/test_detections"
+
+
+async def _collect(async_iterable):
+    return [item async for item in async_iterable]
+
+
+async def _iter_async(items):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_generate_dicts_from_txts_async(max_concurrency):
+    gt_output = asyncio.run(_collect(generate_gt_dicts_from_txts_async(GT_DIR, max_concurrency)))
+    assert gt_output == generate_gt_dict_list_from_txts(GT_DIR, n_threads=1), "Wrong ground truth dicts streamed"
+    dt_output = asyncio.run(_collect(generate_dt_dicts_from_txts_async(DT_DIR, max_concurrency)))
+    assert dt_output == generate_dt_dict_list_from_txts(DT_DIR, n_threads=1), "Wrong detections dicts streamed"
+
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(generate_gt_dicts_from_txts_async(GT_DIR, 0)))
+
+
+def test_generate_dicts_from_txts_async_early_stop():
+    async def first_dict():
+        async for gt_dict in generate_gt_dicts_from_txts_async(GT_DIR, max_concurrency=1):
+            return gt_dict
+
+    assert asyncio.run(first_dict())["file_id"] == "test1"
+
+
+def test_compute_ap_map_from_txts_async():
+    expected_output = compute_ap_map(generate_gt_dict_list_from_txts(GT_DIR), generate_dt_dict_list_from_txts(DT_DIR))
+    assert asyncio.run(compute_ap_map_from_txts_async(GT_DIR, DT_DIR, batch_size=1)) == expected_output
+
+
+def test_compute_ap_map_from_txts_async_ignore_flags(tmp_path):
+    gt_dir, dt_dir = tmp_path / "ground_truths", tmp_path / "detections"
+    gt_dir.mkdir()
+    dt_dir.mkdir()
+    (gt_dir / "image1.txt").write_text("p 0 0 9 9\np 20 20 59 59 ignore\n")
+    (gt_dir / "image2.txt").write_text("p 0 0 9 9 ignore\n")
+    (dt_dir / "image1.txt").write_text("p 0.9 0 0 9 9\np 0.8 25 25 34 34\n")
+    (dt_dir / "image2.txt").write_text("p 0.95 0 0 9 9\n")
+    expected_output = compute_ap_map(
+        generate_gt_dict_list_from_txts(str(gt_dir)), generate_dt_dict_list_from_txts(str(dt_dir))
+    )
+    assert expected_output == {"ap": {"p": 1.0}, "map": 1.0}
+    output = asyncio.run(compute_ap_map_from_txts_async(str(gt_dir), str(dt_dir), iou_thresholds=[0.5, 0.75]))
+    assert output == compute_ap_map(
+        generate_gt_dict_list_from_txts(str(gt_dir)),
+        generate_dt_dict_list_from_txts(str(dt_dir)),
+        iou_thresholds=[0.5, 0.75],
+    )
+    assert asyncio.run(compute_ap_map_from_txts_async(str(gt_dir), str(dt_dir), batch_size=1)) == expected_output
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 100])
+def test_update_evaluator_async(batch_size):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(4, n_images=30)
+    evaluator = asyncio.run(
+        update_evaluator_async(
+            APEvaluator(), _iter_async(ground_truth_dict_list), _iter_async(detections_dict_list), batch_size
+        )
+    )
+    assert evaluator.compute() == compute_ap_map(ground_truth_dict_list, detections_dict_list)
+
+
+def test_update_evaluator_async_mismatched_file_ids():
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(0, n_images=5)
+    with pytest.raises(ValueError, match="does not match"):
+        asyncio.run(
+            update_evaluator_async(
+                APEvaluator(), _iter_async(ground_truth_dict_list), _iter_async(detections_dict_list[1:])
+            )
+        )
+    with pytest.raises(ValueError):
+        asyncio.run(update_evaluator_async(APEvaluator(), _iter_async([]), _iter_async([]), batch_size=0))
+
+
+def test_update_evaluator_async_error_does_not_wait():
+    release = threading.Event()
+    updated = []
+
+    class SlowEvaluator(APEvaluator):
+        def update(self, ground_truth_dict_list, detections_dict_list):
+            release.wait(timeout=5)
+            updated.append(len(ground_truth_dict_list))
+
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(4, n_images=3)
+    detections_dict_list[1] = dict(detections_dict_list[1], file_id="other")
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(
+                update_evaluator_async(
+                    SlowEvaluator(), _iter_async(ground_truth_dict_list), _iter_async(detections_dict_list), 1
+                )
+            )
+        # the error is raised while the first batch is still being matched
+        assert not updated
+    finally:
+        release.set()
@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import numpy as np
+import pytest
+
+from obj_det_metrics.binary_io import _align, _read_array_file, _write_array_file
+
+
+@pytest.mark.parametrize("offset, expected_output", [(0, 0), (1, 64), (64, 64), (65, 128)])
+def test_align(offset, expected_output):
+    output = _align(offset)
+    assert output == expected_output, f"Expected aligned offset {expected_output} but got {output}"
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_write_read_array_file(tmp_path, mmap):
+    filepath = str(tmp_path / "arrays.odm")
+    arrays: Dict[str, np.ndarray] = {
+        "coordinates": np.arange(20, dtype=np.float32).reshape(5, 4),
+        "codes": np.array([3, 1, 2], dtype=np.int32),
+        "empty": np.empty((0, 4), dtype=np.float64),
+    }
+    metadata = {"class_names": ["class1", "class2"], "version": 1}
+    _write_array_file(filepath, arrays, metadata)
+    output_arrays, output_metadata = _read_array_file(filepath, mmap=mmap)
+    assert output_metadata == metadata, "Wrong metadata read from file"
+    for name, array in arrays.items():
+        assert output_arrays[name].dtype == array.dtype, f"Wrong dtype read for {name}"
+        assert np.array_equal(output_arrays[name], array), f"Wrong values read for {name}"
+    assert isinstance(output_arrays["codes"], np.memmap) == mmap, "Arrays should be memory-mapped only if requested"
+
+
+def test_write_array_file_threads(tmp_path):
+    filepath = str(tmp_path / "arrays.odm")
+    arrays = [{"values": np.full(1 << 16, idx, dtype=np.int64)} for idx in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda idx: _write_array_file(filepath, arrays[idx], {"idx": idx}), range(8)))
+    output_arrays, output_metadata = _read_array_file(filepath, mmap=False)
+    assert np.array_equal(output_arrays["values"], arrays[output_metadata["idx"]]["values"]), "File was corrupted"
+    assert os.listdir(tmp_path) == ["arrays.odm"], "Temporary files were left behind"
+
+
+def test_read_array_file_wrong_magic(tmp_path):
+    filepath = tmp_path / "arrays.odm"
+    filepath.write_bytes(b"not an array file")
+    with pytest.raises(ValueError):
+        _read_array_file(str(filepath))
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from obj_det_metrics import bootstrap
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.bootstrap import (
+    _RECALL_THRESHOLDS,
+    _bootstrap_class,
+    _build_class_records,
+    compute_bootstrap_intervals,
+)
+from obj_det_metrics.columnar import ColumnarDataset
+from tests.test_ap_map import (
+    CROWD_DETECTIONS_DICT_LIST,
+    CROWD_GROUND_TRUTH_DICT_LIST,
+    _generate_random_dict_lists,
+)
+
+
+@pytest.mark.parametrize("interpolation", ["voc2012", "coco101", "voc07"])
+def test_bootstrap_class_reweighting(interpolation):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(0, n_images=10)
+    dataset = ColumnarDataset.from_dicts(ground_truth_dict_list, detections_dict_list, dtype=np.float64)
+    records = _build_class_records(dataset, 0.5, 1)
+    draws = np.array([[1] * 10, [0, 3, 1, 0, 2, 0, 1, 1, 0, 2]])
+
+    for weights in draws:
+        # a resample is equivalent to evaluating each image as many times as it is drawn
+        resampled_gt, resampled_dt = [], []
+        for image_code, n_draws in enumerate(weights):
+            for draw_idx in range(n_draws):
+                resampled_gt.append(dict(ground_truth_dict_list[image_code], file_id=f"{image_code}_{draw_idx}"))
+                resampled_dt.append(dict(detections_dict_list[image_code], file_id=f"{image_code}_{draw_idx}"))
+        expected_aps = compute_ap_map(resampled_gt, resampled_dt, interpolation=interpolation)["ap"]
+        for code, class_name in enumerate(dataset.class_names):
+            aps = _bootstrap_class(weights[None, :], records[code], _RECALL_THRESHOLDS[interpolation])
+            if class_name in expected_aps:
+                assert aps[0] == pytest.approx(expected_aps[class_name])
+            else:
+                assert np.isnan(aps[0])
+
+
+def test_compute_bootstrap_intervals(monkeypatch):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(1, n_images=30)
+    outputs_dict = compute_ap_map(ground_truth_dict_list, detections_dict_list)
+    intervals = compute_bootstrap_intervals(ground_truth_dict_list, detections_dict_list, n_resamples=200)
+    assert list(intervals["ap"].keys()) == list(outputs_dict["ap"].keys())
+    assert len(intervals["map_samples"]) == 200
+    lower, upper = intervals["map"]
+    assert lower < outputs_dict["map"] < upper
+    for class_name, (lower, upper) in intervals["ap"].items():
+        assert 0.0 <= lower <= upper <= 1.0
+
+    # chunks of resamples split across workers give the same resamples as the serial loop
+    monkeypatch.setattr(bootstrap, "_CHUNK_ELEMENTS", 300)
+    serial_intervals = compute_bootstrap_intervals(ground_truth_dict_list, detections_dict_list, n_resamples=200)
+    parallel_intervals = compute_bootstrap_intervals(
+        ground_truth_dict_list, detections_dict_list, n_resamples=200, n_workers=2
+    )
+    assert parallel_intervals["ap"] == serial_intervals["ap"]
+    np.testing.assert_array_equal(parallel_intervals["map_samples"], serial_intervals["map_samples"])
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"n_resamples": 0}, {"confidence": 1.0}, {"interpolation": "coco"}, {"n_workers": 0}]
+)
+def test_compute_bootstrap_intervals_invalid_arguments(kwargs):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(0)
+    with pytest.raises(ValueError):
+        compute_bootstrap_intervals(ground_truth_dict_list, detections_dict_list, **kwargs)
+
+
+def test_compute_bootstrap_intervals_ignore_flags():
+    intervals = compute_bootstrap_intervals(CROWD_GROUND_TRUTH_DICT_LIST, CROWD_DETECTIONS_DICT_LIST, n_resamples=10)
+    # the detection within the crowd region is not a false positive, and the car class is not evaluated
+    assert intervals["ap"] == {"person": (1.0, 1.0)}
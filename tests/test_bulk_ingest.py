@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.bulk_ingest import (
+    _JsonStream,
+    generate_columnar_dataset_from_coco_json,
+    generate_columnar_dataset_from_csvs,
+    generate_dict_lists_from_coco_json,
+    generate_dict_lists_from_csvs,
+)
+from tests.test_ap_map import _generate_random_dict_lists
+
+COCO_ANNOTATIONS = {
+    "info": {"description": "test", "nested": [1, {"a": [2, 3]}]},
+    "annotations": [
+        {"id": 1, "image_id": 12, "category_id": 3, "bbox": [10.0, 20.0, 30.0, 40.0], "iscrowd": 0},
+        {"id": 2, "image_id": 7, "category_id": 1, "bbox": [0, 0, 5, 5], "iscrowd": 0},
+        {"id": 3, "image_id": 12, "category_id": 1, "bbox": [50, 50, 100, 100], "iscrowd": 1},
+    ],
+    "images": [{"id": 7, "file_name": "7.jpg"}, {"id": 12, "file_name": "12.jpg"}, {"id": 30, "file_name": "30.jpg"}],
+    "categories": [{"id": 3, "name": "person"}, {"id": 1, "name": "car"}],
+}
+COCO_RESULTS = [
+    {"image_id": 12, "category_id": 3, "bbox": [11.0, 20.0, 30.0, 40.0], "score": 0.9},
+    {"image_id": 7, "category_id": 1, "bbox": [0, 0, 5, 5], "score": 0.5},
+    {"image_id": 12, "category_id": 1, "bbox": [60, 60, 20, 20], "score": 0.75},
+]
+
+
+def _write_coco_files(tmp_path):
+    annotations_path, results_path = tmp_path / "annotations.json", tmp_path / "results.json"
+    annotations_path.write_text(json.dumps(COCO_ANNOTATIONS, indent=2))
+    results_path.write_text(json.dumps(COCO_RESULTS))
+    return str(annotations_path), str(results_path)
+
+
+def _write_csv(filepath, header, dict_list):
+    with open(filepath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for box_dict in dict_list:
+            for idx, (label, coordinates) in enumerate(zip(box_dict["class_labels"], box_dict["coordinates"])):
+                row = {"file_id": box_dict["file_id"], "class": label, "x1": coordinates[0], "y1": coordinates[1]}
+                row.update({"x2": coordinates[2], "y2": coordinates[3]})
+                if "conf_scores" in box_dict:
+                    row["score"] = box_dict["conf_scores"][idx]
+                writer.writerow([row[field] for field in header])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+def test_json_stream(chunk_size):
+    text = json.dumps({"values": [1.25, -3e-5, "a, b]", {"x": [None, True]}, 123456789], "empty": [], "other": {}})
+    stream = _JsonStream(io.StringIO(text), chunk_size=chunk_size)
+    output = {}
+    for key in stream.iter_object_keys():
+        output[key] = list(stream.iter_array()) if key != "other" else stream.decode_value()
+    assert output == json.loads(text)
+    assert stream.peek() == ""
+
+
+def test_generate_dict_lists_from_coco_json(tmp_path):
+    gt_dict_list, dt_dict_list = generate_dict_lists_from_coco_json(*_write_coco_files(tmp_path))
+    assert gt_dict_list == [
+        {
+            "coordinates": [[10.0, 20.0, 39.0, 59.0], [50.0, 50.0, 149.0, 149.0]],
+            "class_labels": ["person", "car"],
+            "file_id": "12",
+            "ignore_flags": [False, True],
+        },
+        {"coordinates": [], "class_labels": [], "file_id": "30"},
+        {"coordinates": [[0.0, 0.0, 4.0, 4.0]], "class_labels": ["car"], "file_id": "7"},
+    ]
+    assert dt_dict_list == [
+        {
+            "coordinates": [[11.0, 20.0, 40.0, 59.0], [60.0, 60.0, 79.0, 79.0]],
+            "class_labels": ["person", "car"],
+            "conf_scores": [0.9, 0.75],
+            "file_id": "12",
+        },
+        {"coordinates": [], "class_labels": [], "conf_scores": [], "file_id": "30"},
+        {"coordinates": [[0.0, 0.0, 4.0, 4.0]], "class_labels": ["car"], "conf_scores": [0.5], "file_id": "7"},
+    ]
+
+    annotations_path, results_path = _write_coco_files(tmp_path)
+    dataset = generate_columnar_dataset_from_coco_json(annotations_path, results_path, dtype=np.float64)
+    assert dataset.class_names == ["car", "person"]
+    assert dataset.file_ids == ["12", "30", "7"]
+    assert dataset.gt_ignore is not None and dataset.gt_ignore.tolist() == [False, True, False]
+    assert compute_ap_map(dataset) == compute_ap_map(gt_dict_list, dt_dict_list)
+
+
+def test_generate_dict_lists_from_coco_json_unknown_image(tmp_path):
+    annotations_path, results_path = _write_coco_files(tmp_path)
+    with open(results_path, "w") as f:
+        json.dump(COCO_RESULTS + [{"image_id": 99, "category_id": 1, "bbox": [0, 0, 1, 1], "score": 0.1}], f)
+    with pytest.raises(ValueError, match="Image ID 99 not found in annotations file"):
+        generate_dict_lists_from_coco_json(annotations_path, results_path)
+
+
+def test_generate_dict_lists_from_csvs(tmp_path):
+    gt_dict_list, dt_dict_list = _generate_random_dict_lists(4, n_images=30)
+    gt_csv_path, dt_csv_path = str(tmp_path / "ground_truths.csv"), str(tmp_path / "detections.csv")
+    _write_csv(gt_csv_path, ["file_id", "class", "x1", "y1", "x2", "y2"], gt_dict_list)
+    _write_csv(dt_csv_path, ["file_id", "x1", "y1", "x2", "y2", "score", "class"], dt_dict_list)
+
+    # images are sorted by file ID, which decides the order of tied detections
+    sort_key = lambda box_dict: box_dict["file_id"]  # noqa: E731
+    expected_output = compute_ap_map(
+        sorted(gt_dict_list, key=sort_key), sorted(dt_dict_list, key=sort_key), engine="numpy"
+    )
+    assert compute_ap_map(*generate_dict_lists_from_csvs(gt_csv_path, dt_csv_path), engine="numpy") == expected_output
+    dataset = generate_columnar_dataset_from_csvs(gt_csv_path, dt_csv_path, dtype=np.float64)
+    assert compute_ap_map(dataset) == expected_output
+
+
+def test_generate_dict_lists_from_csvs_ignore(tmp_path):
+    gt_csv_path, dt_csv_path = tmp_path / "ground_truths.csv", tmp_path / "detections.csv"
+    gt_csv_path.write_text("file_id,class,x1,y1,x2,y2,ignore\na,person,0,0,9,9,0\nb,person,0,0,9,9,true\n")
+    dt_csv_path.write_text("file_id,class,score,x1,y1,x2,y2\nc,person,0.5,0,0,9,9\n")
+    gt_dict_list, dt_dict_list = generate_dict_lists_from_csvs(str(gt_csv_path), str(dt_csv_path))
+    assert [gt_dict["file_id"] for gt_dict in gt_dict_list] == ["a", "b", "c"]
+    assert gt_dict_list[1]["ignore_flags"] == [True]
+    assert "ignore_flags" not in gt_dict_list[0]
+    assert dt_dict_list[0] == {"coordinates": [], "class_labels": [], "conf_scores": [], "file_id": "a"}
+
+    dt_csv_path.write_text("file_id,class,x1,y1,x2,y2\nc,person,0,0,9,9\n")
+    with pytest.raises(ValueError, match="missing column 'score'"):
+        generate_dict_lists_from_csvs(str(gt_csv_path), str(dt_csv_path))
+
+
+def test_generate_dict_lists_from_csvs_bom_blank_rows(tmp_path):
+    gt_csv_path, dt_csv_path = tmp_path / "ground_truths.csv", tmp_path / "detections.csv"
+    gt_csv_path.write_text("file_id,class,x1,y1,x2,y2\na,person,0,0,9,9\n\n", encoding="utf-8-sig")
+    dt_csv_path.write_text("file_id,class,score,x1,y1,x2,y2\n\na,person,0.5,0,0,9,9\n  \n")
+    gt_dict_list, dt_dict_list = generate_dict_lists_from_csvs(str(gt_csv_path), str(dt_csv_path))
+    assert gt_dict_list == [{"coordinates": [[0.0, 0.0, 9.0, 9.0]], "class_labels": ["person"], "file_id": "a"}]
+    assert dt_dict_list[0]["conf_scores"] == [0.5]
+
+    dt_csv_path.write_text("file_id,class,score,x1,y1,x2,y2\na,person,0.5,0,0,9\n")
+    with pytest.raises(ValueError, match="must have 7 fields"):
+        generate_dict_lists_from_csvs(str(gt_csv_path), str(dt_csv_path))
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pytest
+
+from obj_det_metrics import ingest
+from obj_det_metrics.cache import _fingerprint_txt_dir
+from obj_det_metrics.ingest import generate_gt_dict_list_from_txts
+
+GT_DIR = "tests/fixtures/test_ground_truths"
+
+
+@pytest.fixture
+def gt_dir(tmp_path):
+    return shutil.copytree(GT_DIR, str(tmp_path / "ground_truths"))
+
+
+def test_fingerprint_txt_dir(gt_dir):
+    fingerprint = _fingerprint_txt_dir(gt_dir)
+    assert _fingerprint_txt_dir(gt_dir) == fingerprint, "Fingerprint should not change for unchanged directory"
+    filepath = os.path.join(gt_dir, "test1.txt")
+    with open(filepath, "a") as f:
+        f.write("class1 1 2 3 4\n")
+    assert _fingerprint_txt_dir(gt_dir) != fingerprint, "Fingerprint should change when a file is modified"
+
+
+def test_generate_gt_dict_list_from_txts_cache(gt_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    expected_output = generate_gt_dict_list_from_txts(gt_dir, n_threads=1)
+    output = generate_gt_dict_list_from_txts(gt_dir, cache_dir=cache_dir)
+    assert output == expected_output, "Wrong ground truth dicts when creating cache"
+    assert len(os.listdir(cache_dir)) == 1, "Expected a single cache file"
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("Text files should not be parsed when cache is valid")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ingest, "_parse_txts_threaded", fail_parse)
+        output = generate_gt_dict_list_from_txts(gt_dir, cache_dir=cache_dir)
+    assert output == expected_output, "Wrong ground truth dicts when loading cache"
+
+    # modifying a file invalidates the cache
+    with open(os.path.join(gt_dir, "test2.txt"), "a") as f:
+        f.write("class5 1 2 3 4\n")
+    output = generate_gt_dict_list_from_txts(gt_dir, cache_dir=cache_dir)
+    assert output[1]["class_labels"][-1] == "class5", "Stale cache used after file was modified"
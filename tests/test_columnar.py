@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.columnar import ColumnarDataset
+
+GROUND_TRUTH_DICT_LIST = [
+    {
+        "coordinates": [[60, 80, 66, 92], [59, 94, 68, 97], [70, 87, 81, 94], [8, 34, 10, 36]],
+        "class_labels": ["class2", "class3", "class3", "class4"],
+        "file_id": "test1",
+    },
+    {
+        "coordinates": [[111, 82, 164, 94], [54, 114, 68, 120], [110, 88, 112, 98], [92, 30, 100, 38]],
+        "class_labels": ["class1", "class1", "class4", "class4"],
+        "file_id": "test2",
+    },
+]
+
+DETECTIONS_DICT_LIST = [
+    {
+        "coordinates": [[59, 82, 66, 94], [58, 94, 68, 95], [70, 88, 81, 93], [10, 34, 12, 38]],
+        "class_labels": ["class2", "class3", "class3", "class4"],
+        "conf_scores": [0.99056727, 0.98965424, 0.93990153, 0.9157755],
+        "file_id": "test1",
+    },
+    {
+        "coordinates": [[109, 82, 166, 94], [58, 114, 68, 115], [105, 88, 111, 98], [90, 30, 102, 38]],
+        "class_labels": ["class1", "class1", "class4", "class5"],
+        "conf_scores": [0.9823532, 0.8215353, 0.5923226, 0.9157755],
+        "file_id": "test2",
+    },
+]
+
+
+def test_columnar_dataset_from_dicts():
+    dataset = ColumnarDataset.from_dicts(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST)
+    assert dataset.class_names == ["class1", "class2", "class3", "class4"], "Wrong class names in dataset"
+    assert dataset.file_ids == ["test1", "test2"], "Wrong file IDs in dataset"
+    assert dataset.gt_coordinates.shape == (8, 4), f"Expected 8 ground truths but got {len(dataset.gt_coordinates)}"
+    # detection of class5 has no ground truth and is dropped
+    assert dataset.dt_coordinates.shape == (7, 4), f"Expected 7 detections but got {len(dataset.dt_coordinates)}"
+    assert dataset.gt_coordinates.dtype == np.float32, "Expected float32 coordinates"
+    assert dataset.dt_scores.dtype == np.float32, "Expected float32 scores"
+    assert dataset.gt_class_codes.dtype == np.int32, "Expected int32 class codes"
+    assert dataset.dt_image_codes.dtype == np.int32, "Expected int32 image codes"
+    assert dataset.gt_class_codes.tolist() == [1, 2, 2, 3, 0, 0, 3, 3], "Wrong ground truth class codes"
+    assert dataset.dt_image_codes.tolist() == [0, 0, 0, 0, 1, 1, 1], "Wrong detection image codes"
+    assert not dataset.gt_matched.any(), "Ground truths should not be matched before evaluation"
+
+
+def test_columnar_dataset_from_dicts_missing_file_id():
+    with pytest.raises(ValueError, match="File ID"):
+        ColumnarDataset.from_dicts(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST[:1])
+
+
+def test_compute_ap_map_columnar_dataset():
+    dataset = ColumnarDataset.from_dicts(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST)
+    output = compute_ap_map(dataset, iou_threshold=0.5)
+    expected_output = compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, iou_threshold=0.5)
+    assert output == expected_output, "Outputs of columnar dataset differ from dicts"
+    assert dataset.gt_matched.tolist() == [True, False, True, False, True, False, False, False], "Wrong matched flags"
+
+
+def test_compute_ap_map_columnar_dataset_with_detections():
+    dataset = ColumnarDataset.from_dicts(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST)
+    with pytest.raises(ValueError):
+        compute_ap_map(dataset, DETECTIONS_DICT_LIST)
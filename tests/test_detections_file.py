@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.columnar import ColumnarDataset, ColumnarDetections
+from obj_det_metrics.detections_file import read_detections_file, write_detections_file
+from obj_det_metrics.variables import COCO_IOU_THRESHOLDS
+from tests.test_ap_map import (
+    DETECTIONS_DICT_LIST,
+    GROUND_TRUTH_DICT_LIST,
+    _generate_random_dict_lists,
+)
+
+
+def test_columnar_detections_from_dicts():
+    detections = ColumnarDetections.from_dicts(DETECTIONS_DICT_LIST)
+    assert detections.class_names == ["class2", "class3", "class4", "class1"], "Wrong class names"
+    assert detections.file_ids == ["test1", "test2"], "Wrong file IDs"
+    assert detections.class_codes.tolist() == [0, 1, 1, 2, 3, 3, 2, 2], "Wrong class codes"
+    assert detections.image_codes.tolist() == [0, 0, 0, 0, 1, 1, 1, 1], "Wrong image codes"
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_write_read_detections_file(tmp_path, mmap):
+    filepath = str(tmp_path / "detections.odm")
+    write_detections_file(filepath, DETECTIONS_DICT_LIST)
+    detections = read_detections_file(filepath, mmap=mmap)
+    expected_detections = ColumnarDetections.from_dicts(DETECTIONS_DICT_LIST)
+    for name in ["coordinates", "scores", "class_codes", "image_codes"]:
+        assert np.array_equal(getattr(detections, name), getattr(expected_detections, name)), f"Wrong {name} read"
+    assert detections.class_names == expected_detections.class_names, "Wrong class names read"
+    assert detections.file_ids == expected_detections.file_ids, "Wrong file IDs read"
+    assert isinstance(detections.coordinates, np.memmap) == mmap, "Arrays should be memory-mapped only if requested"
+
+
+def test_compute_ap_map_detections_file(tmp_path):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(9)
+    filepath = str(tmp_path / "detections.odm")
+    write_detections_file(filepath, detections_dict_list, dtype=np.float64)
+    detections = read_detections_file(filepath)
+    output = compute_ap_map(ground_truth_dict_list, detections, iou_thresholds=COCO_IOU_THRESHOLDS)
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS)
+    assert output == expected_output, "Outputs of detections file differ from dicts"
+    # coordinates and scores are used without copying
+    dataset = ColumnarDataset.from_detections(ground_truth_dict_list, detections)
+    assert dataset.dt_coordinates is detections.coordinates, "Detection coordinates were copied"
+    assert dataset.dt_scores is detections.scores, "Detection scores were copied"
+
+
+@pytest.mark.parametrize("dtype, expected_ap", [(np.float32, 0.5), (np.float64, 1.0)])
+def test_compute_ap_map_detections_file_near_tied_scores(tmp_path, dtype, expected_ap):
+    ground_truth_dict_list = [{"coordinates": [[0, 0, 9, 9]], "class_labels": ["person"], "file_id": "image"}]
+    detections_dict_list = [
+        {
+            "coordinates": [[50, 50, 59, 59], [0, 0, 9, 9]],
+            "class_labels": ["person", "person"],
+            "conf_scores": [0.9, 0.9000000001],
+            "file_id": "image",
+        }
+    ]
+    filepath = str(tmp_path / "detections.odm")
+    write_detections_file(filepath, detections_dict_list, dtype=dtype)
+    output = compute_ap_map(ground_truth_dict_list, read_detections_file(filepath))
+    # scores only differ beyond float32 precision, so in float32 they tie and the false positive ranks first
+    assert compute_ap_map(ground_truth_dict_list, detections_dict_list)["map"] == 1.0
+    assert output["map"] == expected_ap, f"Expected mAP {expected_ap} but got {output['map']}"
+
+
+def test_read_detections_file_wrong_format(tmp_path):
+    filepath = tmp_path / "detections.odm"
+    filepath.write_bytes(b"not a detections file")
+    with pytest.raises(ValueError):
+        read_detections_file(str(filepath))
+
+
+def test_columnar_dataset_from_detections_missing_file_id():
+    detections = ColumnarDetections.from_dicts(DETECTIONS_DICT_LIST[:1])
+    with pytest.raises(ValueError, match="File ID"):
+        ColumnarDataset.from_detections(GROUND_TRUTH_DICT_LIST, detections)
@@ -0,0 +1,137 @@
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.evaluator import APEvaluator
+from obj_det_metrics.variables import COCO_IOU_THRESHOLDS
+from tests.test_ap_map import (
+    CROWD_DETECTIONS_DICT_LIST,
+    CROWD_GROUND_TRUTH_DICT_LIST,
+    DETECTIONS_DICT_LIST,
+    GROUND_TRUTH_DICT_LIST,
+    _generate_random_dict_lists,
+)
+
+
+def test_ap_evaluator():
+    evaluator = APEvaluator(iou_threshold=0.5)
+    for gt_dict, dt_dict in zip(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST):
+        evaluator.update([gt_dict], [dt_dict])
+    output = evaluator.compute()
+    expected_output = compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, iou_threshold=0.5)
+    assert output == expected_output, "Outputs of evaluator differ from compute_ap_map"
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 7])
+def test_ap_evaluator_batches(batch_size):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(6)
+    evaluator = APEvaluator(iou_thresholds=COCO_IOU_THRESHOLDS)
+    for start in range(0, len(ground_truth_dict_list), batch_size):
+        end = start + batch_size
+        evaluator.update(ground_truth_dict_list[start:end], detections_dict_list[start:end])
+        # snapshots mid-way must not change the final outputs
+        evaluator.compute()
+    output = evaluator.compute()
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS)
+    assert output == expected_output, "Outputs of evaluator differ from compute_ap_map"
+
+
+def test_ap_evaluator_repeated_file_id():
+    evaluator = APEvaluator()
+    evaluator.update(GROUND_TRUTH_DICT_LIST[:1], DETECTIONS_DICT_LIST[:1])
+    with pytest.raises(ValueError, match="File ID"):
+        evaluator.update(GROUND_TRUTH_DICT_LIST[:1], DETECTIONS_DICT_LIST[:1])
+
+
+def test_ap_evaluator_reset():
+    evaluator = APEvaluator()
+    evaluator.update(GROUND_TRUTH_DICT_LIST[:1], DETECTIONS_DICT_LIST[:1])
+    evaluator.reset()
+    evaluator.update(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST)
+    assert evaluator.compute() == compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST), "Records not cleared"
+
+
+def _evaluate_shard(shard_idx, n_shards):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(7)
+    evaluator = APEvaluator(iou_thresholds=COCO_IOU_THRESHOLDS)
+    evaluator.update(ground_truth_dict_list[shard_idx::n_shards], detections_dict_list[shard_idx::n_shards])
+    return evaluator.to_bytes()
+
+
+def test_ap_evaluator_to_bytes():
+    evaluator = APEvaluator(iou_threshold=0.3)
+    evaluator.update(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST)
+    loaded_evaluator = APEvaluator.from_bytes(evaluator.to_bytes())
+    assert loaded_evaluator.compute() == evaluator.compute(), "Outputs of deserialized evaluator differ"
+    assert loaded_evaluator._file_ids == {"test1", "test2"}, "Wrong file IDs in deserialized evaluator"
+
+
+def test_ap_evaluator_merge_processes():
+    n_shards = 3
+    with ProcessPoolExecutor(max_workers=n_shards) as executor:
+        blobs = list(executor.map(_evaluate_shard, range(n_shards), [n_shards] * n_shards))
+    evaluators = [APEvaluator.from_bytes(blob) for blob in blobs]
+    output = functools.reduce(APEvaluator.merge, evaluators).compute()
+
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(7)
+    # shards hold interleaved images, so the reference gets the images in the same order as the merged shards
+    ground_truth_dict_list = [gt for idx in range(n_shards) for gt in ground_truth_dict_list[idx::n_shards]]
+    detections_dict_list = [dt for idx in range(n_shards) for dt in detections_dict_list[idx::n_shards]]
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=COCO_IOU_THRESHOLDS)
+    assert output == expected_output, "Outputs of merged evaluators differ from compute_ap_map"
+
+
+def test_ap_evaluator_merge_associative():
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(8)
+    evaluators = []
+    for start, end in zip(range(0, 20, 5), range(5, 25, 5)):
+        evaluator = APEvaluator()
+        evaluator.update(ground_truth_dict_list[start:end], detections_dict_list[start:end])
+        evaluators.append(APEvaluator.from_bytes(evaluator.to_bytes()))
+    left = APEvaluator.from_bytes(evaluators[0].to_bytes()).merge(evaluators[1]).merge(evaluators[2])
+    right = APEvaluator.from_bytes(evaluators[1].to_bytes()).merge(evaluators[2])
+    right = APEvaluator.from_bytes(evaluators[0].to_bytes()).merge(right)
+    assert left.compute() == right.compute(), "Merging is not associative"
+    assert left.merge(evaluators[3]).compute() == compute_ap_map(ground_truth_dict_list, detections_dict_list)
+
+
+def test_ap_evaluator_merge_different_thresholds():
+    with pytest.raises(ValueError):
+        APEvaluator(iou_threshold=0.5).merge(APEvaluator(iou_threshold=0.75))
+
+
+def test_ap_evaluator_ignore_flags():
+    evaluator = APEvaluator()
+    evaluator.update(CROWD_GROUND_TRUTH_DICT_LIST, CROWD_DETECTIONS_DICT_LIST)
+    assert evaluator.compute() == compute_ap_map(CROWD_GROUND_TRUTH_DICT_LIST, CROWD_DETECTIONS_DICT_LIST)
+
+
+@pytest.mark.parametrize("seed", [2, 3])
+def test_ap_evaluator_ignore_flags_random(seed):
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(seed, n_images=30)
+    rng = np.random.default_rng(seed)
+    # only some batches have ignore flags
+    for gt_dict in ground_truth_dict_list[10:]:
+        gt_dict["ignore_flags"] = (rng.random(len(gt_dict["class_labels"])) < 0.2).tolist()
+    expected_output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_thresholds=[0.3, 0.5])
+    evaluators = []
+    for start in range(0, 30, 10):
+        end = start + 10
+        evaluator = APEvaluator(iou_thresholds=[0.3, 0.5])
+        evaluator.update_from_pairs(
+            zip(ground_truth_dict_list[start:end], detections_dict_list[start:end]), batch_size=4
+        )
+        evaluators.append(APEvaluator.from_bytes(evaluator.to_bytes()))
+    assert evaluators[0].merge(evaluators[1]).merge(evaluators[2]).compute() == expected_output
+
+
+def test_ap_evaluator_update_from_pairs():
+    ground_truth_dict_list, detections_dict_list = _generate_random_dict_lists(4, n_images=30)
+    evaluator = APEvaluator()
+    evaluator.update_from_pairs(zip(ground_truth_dict_list, detections_dict_list), batch_size=7)
+    assert evaluator.compute() == compute_ap_map(ground_truth_dict_list, detections_dict_list)
+    with pytest.raises(ValueError):
+        evaluator.update_from_pairs([], batch_size=0)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from obj_det_metrics import ground_truth_index
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.columnar import ColumnarDetections
+from obj_det_metrics.ground_truth_index import (
+    GroundTruthIndex,
+    clear_ground_truth_index_cache,
+)
+from obj_det_metrics.synthetic import generate_synthetic_dict_lists
+from obj_det_metrics.utils import _compute_iou_matrix
+from tests.test_columnar import DETECTIONS_DICT_LIST, GROUND_TRUTH_DICT_LIST
+
+
+def test_ground_truth_index_from_dicts():
+    gt_index = GroundTruthIndex.from_dicts(GROUND_TRUTH_DICT_LIST)
+    assert gt_index.class_names == ["class1", "class2", "class3", "class4"], "Wrong class names in index"
+    assert gt_index.file_ids == ["test1", "test2"], "Wrong file IDs in index"
+    assert gt_index.gt_counts.tolist() == [2, 1, 2, 3], "Wrong ground truth counts per class"
+    assert gt_index.coordinates.dtype == np.float64
+    assert gt_index.image_codes.tolist() == [0, 0, 0, 0, 1, 1, 1, 1]
+    assert gt_index.areas[0] == (66 - 60 + 1) * (92 - 80 + 1)
+
+    dataset = gt_index.build_dataset(DETECTIONS_DICT_LIST)
+    assert dataset.gt_coordinates is gt_index.coordinates, "Ground truth arrays should be shared with the index"
+    # class5 is not in ground truth, so its detection is ignored
+    assert dataset.dt_class_codes.tolist() == [1, 2, 2, 3, 0, 0, 3, -1]
+
+
+def test_ground_truth_index_compute_ap_map():
+    gt_dict_list, _ = generate_synthetic_dict_lists(n_images=20, n_classes=4, seed=0)
+    gt_index = GroundTruthIndex.from_dicts(gt_dict_list)
+    for seed in range(3):
+        _, dt_dict_list = generate_synthetic_dict_lists(n_images=20, n_classes=4, seed=seed)
+        expected = compute_ap_map(gt_dict_list, dt_dict_list)
+        # the index is evaluated twice to check that matched flags do not carry over between evaluations
+        assert compute_ap_map(gt_index, dt_dict_list) == expected
+        assert compute_ap_map(gt_index, dt_dict_list) == expected
+        assert compute_ap_map(gt_index, ColumnarDetections.from_dicts(dt_dict_list, dtype=np.float64)) == expected
+
+    with pytest.raises(ValueError, match="File ID"):
+        compute_ap_map(gt_index, DETECTIONS_DICT_LIST)
+
+
+def test_ground_truth_index_cache(monkeypatch):
+    clear_ground_truth_index_cache()
+    monkeypatch.setattr(ground_truth_index, "_INDEX_CACHE_SIZE", 2)
+    gt_index = GroundTruthIndex.from_dicts(GROUND_TRUTH_DICT_LIST, use_cache=True)
+    assert GroundTruthIndex.from_dicts(GROUND_TRUTH_DICT_LIST, use_cache=True) is gt_index
+    assert GroundTruthIndex.from_dicts(GROUND_TRUTH_DICT_LIST) is not gt_index
+
+    gt_dict_list = [dict(gt_dict) for gt_dict in GROUND_TRUTH_DICT_LIST]
+    copy_index = GroundTruthIndex.from_dicts(gt_dict_list, use_cache=True)
+    assert copy_index is not gt_index, "A different list should not share the cached index"
+    assert GroundTruthIndex.from_dicts(gt_dict_list, use_cache=True) is copy_index
+
+    gt_dict_list[0]["coordinates"] = (np.array(gt_dict_list[0]["coordinates"]) + 1).tolist()
+    edited_index = GroundTruthIndex.from_dicts(gt_dict_list, use_cache=True)
+    assert edited_index is not copy_index, "Replacing a field should invalidate the cached index"
+    assert edited_index.coordinates[0, 0] == gt_index.coordinates[0, 0] + 1
+    gt_dict_list.append({"coordinates": [[1, 2, 3, 4]], "class_labels": ["class1"], "file_id": "test3"})
+    assert GroundTruthIndex.from_dicts(gt_dict_list, use_cache=True).n_images == 3
+
+    GroundTruthIndex.from_dicts(list(GROUND_TRUTH_DICT_LIST), use_cache=True)
+    # the least recently used index has been evicted
+    assert GroundTruthIndex.from_dicts(GROUND_TRUTH_DICT_LIST, use_cache=True) is not gt_index
+    clear_ground_truth_index_cache()
+
+
+def test_compute_iou_matrix_gt_areas():
+    dt_coordinates = np.array([[59, 82, 66, 94], [10, 34, 12, 38]], dtype=np.float64)
+    gt_index = GroundTruthIndex.from_dicts(GROUND_TRUTH_DICT_LIST)
+    np.testing.assert_array_equal(
+        _compute_iou_matrix(dt_coordinates, gt_index.coordinates, gt_index.areas),
+        _compute_iou_matrix(dt_coordinates, gt_index.coordinates),
+    )
+
+
+def test_ground_truth_index_ignore_flags():
+    gt_dict_list = [dict(GROUND_TRUTH_DICT_LIST[0], ignore_flags=[False, True, False, False])] + list(
+        GROUND_TRUTH_DICT_LIST[1:]
+    )
+    gt_index = GroundTruthIndex.from_dicts(gt_dict_list)
+    assert gt_index.gt_counts.tolist() == [2, 1, 1, 3], "Ignored ground truths should not be counted"
+    assert gt_index.build_dataset(DETECTIONS_DICT_LIST).gt_counts is gt_index.gt_counts, "Counts should be shared"
+    assert compute_ap_map(gt_index, DETECTIONS_DICT_LIST) == compute_ap_map(gt_dict_list, DETECTIONS_DICT_LIST)
+    assert GroundTruthIndex.from_dicts(gt_dict_list, use_cache=True) is not GroundTruthIndex.from_dicts(
+        GROUND_TRUTH_DICT_LIST, use_cache=True
+    ), "Dicts with ignore flags should have a different hash"
+    clear_ground_truth_index_cache()
@@ -1,11 +1,22 @@
+import numpy as np
 import pytest
 
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.columnar import ColumnarDataset
+from obj_det_metrics.evaluator import APEvaluator
 from obj_det_metrics.ingest import (
     _generate_dt_dict_from_txt,
     _generate_gt_dict_from_txt,
+    _parse_gt_txt,
     _read_file_lines,
+    _read_file_table,
+    _scan_txt_files,
+    generate_columnar_dataset_from_txts,
     generate_dt_dict_list_from_txts,
     generate_gt_dict_list_from_txts,
+    iter_dt_dicts_from_txts,
+    iter_gt_dicts_from_txts,
+    iter_paired_dicts_from_txts,
 )
 
 GT_DIR = "tests/fixtures/test_ground_truths"
@@ -102,3 +113,153 @@ def test_generate_dt_dict_from_txt(filepath, expected_output):
 def test_generate_dt_dict_list_from_txts():
     output = generate_dt_dict_list_from_txts(DT_DIR)
     assert len(output) == 2, f"Expected 2 detections dicts but got {len(output)}"
+
+
+def test_scan_txt_files():
+    output = _scan_txt_files(GT_DIR)
+    assert output == [f"{GT_DIR}/test1.txt", f"{GT_DIR}/test2.txt"], f"Unexpected text files found: {output}"
+
+
+def test_read_file_table(tmp_path):
+    filepath = tmp_path / "image.txt"
+    filepath.write_text("class1 1 2 3 4\n\nclass2 5 6 7 8\n")
+    file_id, table = _read_file_table(str(filepath), 5)
+    assert file_id == "image", f"Expected file ID image but got {file_id}"
+    assert table.tolist() == [["class1", "1", "2", "3", "4"], ["class2", "5", "6", "7", "8"]], "Wrong fields read"
+    with pytest.raises(ValueError):
+        _read_file_table(str(filepath), 6)
+
+    # the total number of fields is a multiple of 5, but fields would shift from the first line into the second
+    filepath.write_text("1 0 0 9\n2 1 1 5 5 7")
+    with pytest.raises(ValueError, match="image.txt"):
+        _read_file_table(str(filepath), 5)
+    with pytest.raises(ValueError, match="image.txt"):
+        generate_gt_dict_list_from_txts(str(tmp_path), n_threads=1)
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_generate_dict_lists_from_txts_threaded(n_threads):
+    gt_output = generate_gt_dict_list_from_txts(GT_DIR, n_threads=n_threads)
+    expected_gt_output = sorted(generate_gt_dict_list_from_txts(GT_DIR), key=lambda gt_dict: gt_dict["file_id"])
+    assert gt_output == expected_gt_output, "Wrong ground truth dicts read with threads"
+    dt_output = generate_dt_dict_list_from_txts(DT_DIR, n_threads=n_threads)
+    expected_dt_output = sorted(generate_dt_dict_list_from_txts(DT_DIR), key=lambda dt_dict: dt_dict["file_id"])
+    assert dt_output == expected_dt_output, "Wrong detections dicts read with threads"
+
+
+def test_generate_columnar_dataset_from_txts():
+    dataset = generate_columnar_dataset_from_txts(GT_DIR, DT_DIR, n_threads=2)
+    expected_dataset = ColumnarDataset.from_dicts(
+        generate_gt_dict_list_from_txts(GT_DIR, n_threads=1), generate_dt_dict_list_from_txts(DT_DIR, n_threads=1)
+    )
+    for name in [
+        "gt_coordinates",
+        "gt_class_codes",
+        "gt_image_codes",
+        "dt_coordinates",
+        "dt_scores",
+        "dt_class_codes",
+        "dt_image_codes",
+    ]:
+        output, expected_output = getattr(dataset, name), getattr(expected_dataset, name)
+        assert output.dtype == expected_output.dtype, f"Wrong dtype for {name}"
+        assert np.array_equal(output, expected_output), f"Wrong values for {name}"
+    assert dataset.class_names == expected_dataset.class_names, "Wrong class names"
+    assert dataset.file_ids == expected_dataset.file_ids, "Wrong file IDs"
+    assert compute_ap_map(dataset) == compute_ap_map(expected_dataset), "Wrong outputs for columnar dataset"
+
+
+def test_generate_columnar_dataset_from_txts_missing_file_id(tmp_path):
+    gt_dir, dt_dir = tmp_path / "ground_truths", tmp_path / "detections"
+    gt_dir.mkdir()
+    dt_dir.mkdir()
+    (gt_dir / "a.txt").write_text("class1 1 2 3 4\n")
+    (dt_dir / "b.txt").write_text("class1 0.5 1 2 3 4\n")
+    with pytest.raises(ValueError, match="File ID a not found in detections list"):
+        generate_columnar_dataset_from_txts(str(gt_dir), str(dt_dir), n_threads=1)
+
+
+def test_parse_gt_txt_ignore_flags(tmp_path):
+    gt_dir = tmp_path / "ground_truths"
+    gt_dir.mkdir()
+    (gt_dir / "image1.txt").write_text("person 0 0 9 9\nperson 20 0 59 39 ignore\n")
+    (gt_dir / "image2.txt").write_text("car 1 2 3 4\n")
+    file_id, class_labels, coordinates, ignore_flags = _parse_gt_txt(str(gt_dir / "image1.txt"))
+    assert class_labels.tolist() == ["person", "person"]
+    assert coordinates.tolist() == [[0, 0, 9, 9], [20, 0, 59, 39]]
+    assert ignore_flags.tolist() == [False, True], "Wrong ignore flags parsed"
+
+    expected_output = [
+        {
+            "coordinates": [[0, 0, 9, 9], [20, 0, 59, 39]],
+            "class_labels": ["person", "person"],
+            "file_id": "image1",
+            "ignore_flags": [False, True],
+        },
+        {"coordinates": [[1, 2, 3, 4]], "class_labels": ["car"], "file_id": "image2"},
+    ]
+    assert _generate_gt_dict_from_txt(str(gt_dir / "image1.txt")) == expected_output[0]
+    assert _generate_gt_dict_from_txt(str(gt_dir / "image2.txt")) == expected_output[1]
+    output = generate_gt_dict_list_from_txts(str(gt_dir), n_threads=2, cache_dir=str(tmp_path / "cache"))
+    assert output == expected_output, "Wrong ground truth dicts with ignore flags"
+    cached_output = generate_gt_dict_list_from_txts(str(gt_dir), n_threads=2, cache_dir=str(tmp_path / "cache"))
+    assert cached_output == expected_output, "Wrong ground truth dicts with ignore flags read from cache"
+
+    (gt_dir / "image2.txt").write_text("car 1 2 3 4 crowd\n")
+    with pytest.raises(ValueError):
+        _parse_gt_txt(str(gt_dir / "image2.txt"))
+
+
+def test_iter_dicts_from_txts():
+    gt_output = iter_gt_dicts_from_txts(GT_DIR)
+    assert not isinstance(gt_output, list), "Dicts should be yielded lazily"
+    assert list(gt_output) == generate_gt_dict_list_from_txts(GT_DIR, n_threads=1), "Wrong ground truth dicts"
+    assert list(iter_dt_dicts_from_txts(DT_DIR)) == generate_dt_dict_list_from_txts(DT_DIR, n_threads=1)
+
+    pairs = list(iter_paired_dicts_from_txts(GT_DIR, DT_DIR))
+    assert [(gt_dict["file_id"], dt_dict["file_id"]) for gt_dict, dt_dict in pairs] == [
+        ("test1", "test1"),
+        ("test2", "test2"),
+    ]
+    evaluator = APEvaluator()
+    evaluator.update_from_pairs(pairs, batch_size=1)
+    expected_output = compute_ap_map(generate_gt_dict_list_from_txts(GT_DIR), generate_dt_dict_list_from_txts(DT_DIR))
+    assert evaluator.compute() == expected_output, "Wrong outputs for lazily read dicts"
+
+
+def test_iter_paired_dicts_from_txts_missing(tmp_path):
+    gt_dir, dt_dir = tmp_path / "ground_truths", tmp_path / "detections"
+    gt_dir.mkdir()
+    dt_dir.mkdir()
+    for file_id in ["a", "b", "d"]:
+        (gt_dir / f"{file_id}.txt").write_text("class1 1 2 3 4\n")
+    for file_id in ["b", "c", "d", "e"]:
+        (dt_dir / f"{file_id}.txt").write_text("class1 0.5 1 2 3 4\n")
+
+    missing = []
+    pairs = iter_paired_dicts_from_txts(str(gt_dir), str(dt_dir), lambda file_id, name: missing.append((file_id, name)))
+    # missing counterparts are reported as soon as they are reached
+    assert next(pairs)[0]["file_id"] == "b"
+    assert missing == [("a", "detections")]
+    assert [gt_dict["file_id"] for gt_dict, _ in pairs] == ["d"]
+    assert missing == [("a", "detections"), ("c", "ground truth"), ("e", "ground truth")]
+
+    with pytest.raises(AssertionError, match="File ID a not found in detections list"):
+        next(iter_paired_dicts_from_txts(str(gt_dir), str(dt_dir)))
+
+
+def test_iter_paired_dicts_from_txts_ignore_flags(tmp_path):
+    gt_dir, dt_dir = tmp_path / "ground_truths", tmp_path / "detections"
+    gt_dir.mkdir()
+    dt_dir.mkdir()
+    (gt_dir / "image1.txt").write_text("p 0 0 9 9\np 20 20 59 59 ignore\n")
+    (gt_dir / "image2.txt").write_text("p 0 0 9 9\n")
+    (dt_dir / "image1.txt").write_text("p 0.9 0 0 9 9\np 0.8 25 25 34 34\n")
+    (dt_dir / "image2.txt").write_text("p 0.7 0 0 9 9\n")
+    evaluator = APEvaluator()
+    evaluator.update_from_pairs(iter_paired_dicts_from_txts(str(gt_dir), str(dt_dir)), batch_size=1)
+    expected_output = compute_ap_map(
+        generate_gt_dict_list_from_txts(str(gt_dir)), generate_dt_dict_list_from_txts(str(dt_dir))
+    )
+    assert expected_output == {"ap": {"p": 1.0}, "map": 1.0}
+    assert evaluator.compute() == expected_output, "Wrong outputs for lazily read dicts with ignore flags"
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from obj_det_metrics.parallel import _split_images
+
+
+@pytest.mark.parametrize(
+    "dt_image_codes, n_images, n_shards, expected_output",
+    [
+        ([0, 0, 1, 1, 2, 2, 3, 3], 4, 2, [0, 2, 4]),
+        ([0, 0, 0, 0, 0, 0, 1, 2], 3, 2, [0, 1, 3]),
+        ([0, 1], 4, 8, [0, 1, 2, 4]),
+        ([], 0, 2, [0]),
+    ],
+)
+def test_split_images(dt_image_codes, n_images, n_shards, expected_output):
+    output = _split_images(np.array(dt_image_codes, dtype=np.int64), n_images, n_shards)
+    assert output.tolist() == expected_output, f"Expected image boundaries {expected_output} but got {output}"
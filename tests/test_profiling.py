@@ -0,0 +1,108 @@
+import tracemalloc
+
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.ingest import (
+    generate_columnar_dataset_from_txts,
+    generate_dt_dict_list_from_txts,
+    generate_gt_dict_list_from_txts,
+)
+from obj_det_metrics.profiling import PipelineStats, _profile_stage
+from tests.test_ap_map import DETECTIONS_DICT_LIST, GROUND_TRUTH_DICT_LIST
+
+GT_DIR = "tests/fixtures/test_ground_truths"
+DT_DIR = "tests/fixtures/test_detections"
+
+
+def test_pipeline_stats():
+    stage_names = []
+    stats = PipelineStats(callback=lambda stage_stats: stage_names.append(stage_stats.name))
+    for n_items in (3, 4):
+        with stats.stage("match") as stage:
+            stage.n_items = n_items
+            stage.nbytes = 10
+    with pytest.raises(RuntimeError):
+        with stats.stage("integrate"):
+            raise RuntimeError
+
+    assert stage_names == ["match", "match", "integrate"]
+    assert list(stats.as_dict().keys()) == ["match", "integrate"]
+    match_stats = stats.as_dict()["match"]
+    assert match_stats["n_calls"] == 2
+    assert match_stats["n_items"] == 7
+    assert match_stats["nbytes"] == 20
+    assert match_stats["traced_bytes"] is None
+    assert stats.total_wall_time_s == pytest.approx(match_stats["wall_time_s"] + stats.stages["integrate"].wall_time_s)
+
+    tracemalloc.start()
+    try:
+        with stats.stage("allocate"):
+            data = [0] * 100000
+    finally:
+        tracemalloc.stop()
+    traced_bytes = stats.stages["allocate"].traced_bytes
+    assert traced_bytes is not None and traced_bytes > 4 * len(data)
+
+
+def test_profile_stage_disabled():
+    with _profile_stage(None, "match") as stage:
+        stage.n_items = 1
+    with _profile_stage(None, "match") as other_stage:
+        # disabled stages are not shared, so that concurrent readers do not write into the same object
+        assert other_stage is not stage
+        assert other_stage.n_items == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_stages",
+    [
+        ({}, ["build_gt_objects", "build_spatial_index", "build_dt_objects", "match", "integrate"]),
+        ({"spatial_index_min_boxes": None}, ["build_gt_objects", "build_dt_objects", "match", "integrate"]),
+        ({"engine": "numpy"}, ["build_dataset", "match", "integrate"]),
+        ({"iou_thresholds": [0.5, 0.75]}, ["build_dataset", "match", "integrate"]),
+    ],
+)
+def test_compute_ap_map_stats(kwargs, expected_stages):
+    stats = PipelineStats()
+    outputs_dict = compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, stats=stats, **kwargs)
+    assert outputs_dict == compute_ap_map(GROUND_TRUTH_DICT_LIST, DETECTIONS_DICT_LIST, **kwargs)
+    assert list(stats.stages.keys()) == expected_stages
+
+    n_classes = len(outputs_dict["ap"])
+    if "build_gt_objects" in stats.stages:
+        assert stats.stages["build_gt_objects"].n_items == 8
+        assert stats.stages["match"].n_calls == n_classes
+        assert stats.stages["match"].n_items == stats.stages["build_dt_objects"].n_items
+    else:
+        assert stats.stages["build_dataset"].nbytes > 0
+        assert stats.stages["integrate"].n_items == n_classes * len(kwargs.get("iou_thresholds", [0.5]))
+
+
+def test_ingest_stats(tmp_path):
+    stats = PipelineStats()
+    gt_dict_list = generate_gt_dict_list_from_txts(GT_DIR, stats=stats)
+    dt_dict_list = generate_dt_dict_list_from_txts(DT_DIR, stats=stats)
+    assert list(stats.stages.keys()) == ["parse_gt_txts", "parse_dt_txts"]
+    assert stats.stages["parse_gt_txts"].n_items == sum(len(gt_dict["class_labels"]) for gt_dict in gt_dict_list)
+    assert stats.stages["parse_dt_txts"].n_items == sum(len(dt_dict["class_labels"]) for dt_dict in dt_dict_list)
+
+    stats = PipelineStats()
+    cache_dir = str(tmp_path / "cache")
+    generate_gt_dict_list_from_txts(GT_DIR, cache_dir=cache_dir, stats=stats)
+    generate_dt_dict_list_from_txts(DT_DIR, n_threads=2, stats=stats)
+    assert list(stats.stages.keys()) == [
+        "read_gt_cache",
+        "parse_gt_txts",
+        "write_gt_cache",
+        "build_gt_dicts",
+        "parse_dt_txts",
+        "build_dt_dicts",
+    ]
+    assert stats.stages["read_gt_cache"].n_items == 0
+
+    stats = PipelineStats()
+    dataset = generate_columnar_dataset_from_txts(GT_DIR, DT_DIR, cache_dir=cache_dir, stats=stats)
+    assert list(stats.stages.keys()) == ["read_gt_cache", "parse_dt_txts", "build_dataset"]
+    assert stats.stages["read_gt_cache"].n_items == len(dataset.gt_class_codes)
+    assert stats.stages["build_dataset"].nbytes == dataset.nbytes
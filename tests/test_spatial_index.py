@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.spatial_index import GtIntervalIndex, _build_gt_index
+from obj_det_metrics.utils import _compute_iou
+from obj_det_metrics.variables import BoundingBox
+
+
+def _generate_dense_dict_lists(seed, n_images=4, n_gt=120, n_dt=300):
+    rng = np.random.default_rng(seed)
+    ground_truth_dict_list, detections_dict_list = [], []
+    for image_idx in range(n_images):
+        gt_xy = rng.integers(0, 400, size=(n_gt, 2))
+        gt_wh = rng.integers(1, 30, size=(n_gt, 2))
+        gt_coordinates = np.concatenate([gt_xy, gt_xy + gt_wh], axis=1)
+        source_idxs = rng.integers(0, n_gt, size=n_dt)
+        dt_xy = gt_xy[source_idxs] + rng.integers(-4, 5, size=(n_dt, 2))
+        dt_wh = np.maximum(gt_wh[source_idxs] + rng.integers(-4, 5, size=(n_dt, 2)), 1)
+        dt_coordinates = np.concatenate([dt_xy, dt_xy + dt_wh], axis=1)
+        ground_truth_dict_list.append(
+            {
+                "coordinates": gt_coordinates.tolist(),
+                "class_labels": [f"class{code}" for code in rng.integers(0, 2, size=n_gt)],
+                "file_id": f"image{image_idx}",
+            }
+        )
+        detections_dict_list.append(
+            {
+                "coordinates": dt_coordinates.tolist(),
+                "class_labels": [f"class{code}" for code in rng.integers(0, 2, size=n_dt)],
+                "conf_scores": rng.random(n_dt).tolist(),
+                "file_id": f"image{image_idx}",
+            }
+        )
+    return ground_truth_dict_list, detections_dict_list
+
+
+def test_gt_interval_index_query():
+    rng = np.random.default_rng(0)
+    xy = rng.integers(0, 100, size=(200, 2))
+    coordinates = np.concatenate([xy, xy + rng.integers(0, 20, size=(200, 2))], axis=1).tolist()
+    gt_bboxes = [BoundingBox(coords, class_name="class1", file_id="image") for coords in coordinates]
+    index = GtIntervalIndex(gt_bboxes)
+    for query_coordinates in coordinates[:50]:
+        candidates = index.query(query_coordinates)
+        expected_candidates = [bbox for bbox in gt_bboxes if _compute_iou(query_coordinates, bbox.coordinates) > 0]
+        assert set(map(id, expected_candidates)) <= set(map(id, candidates)), "Overlapping box missing from query"
+        positions = [gt_bboxes.index(bbox) for bbox in candidates]
+        assert positions == sorted(positions), "Query results not in original order"
+
+
+def test_build_gt_index():
+    gt_bboxes_dict = {
+        "image1": [BoundingBox([0, 0, 1, 1], class_name=f"class{idx % 2}", file_id="image1") for idx in range(5)],
+        "image2": [BoundingBox([0, 0, 1, 1], class_name="class0", file_id="image2")],
+    }
+    gt_index = _build_gt_index(gt_bboxes_dict, min_boxes=3)
+    assert list(gt_index) == ["image1"], "Only images with enough ground truths should be indexed"
+    assert list(gt_index["image1"]) == ["class0"], "Only classes with enough ground truths should be indexed"
+
+
+@pytest.mark.parametrize("seed, iou_threshold", [(0, 0.5), (1, 0.1), (2, 0.0)])
+def test_compute_ap_map_spatial_index(seed, iou_threshold):
+    ground_truth_dict_list, detections_dict_list = _generate_dense_dict_lists(seed)
+    output = compute_ap_map(ground_truth_dict_list, detections_dict_list, iou_threshold, spatial_index_min_boxes=1)
+    expected_output = compute_ap_map(
+        ground_truth_dict_list, detections_dict_list, iou_threshold, spatial_index_min_boxes=None
+    )
+    assert output == expected_output, "Outputs with spatial index differ from exhaustive search"
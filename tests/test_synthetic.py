@@ -0,0 +1,44 @@
+import pytest
+
+from obj_det_metrics.ap_map import compute_ap_map
+from obj_det_metrics.ingest import (
+    generate_dt_dict_list_from_txts,
+    generate_gt_dict_list_from_txts,
+)
+from obj_det_metrics.synthetic import (
+    generate_synthetic_dict_lists,
+    write_dict_lists_to_txts,
+)
+
+
+def test_generate_synthetic_dict_lists():
+    ground_truth_dict_list, detections_dict_list = generate_synthetic_dict_lists(n_images=50, seed=3)
+    assert (ground_truth_dict_list, detections_dict_list) == generate_synthetic_dict_lists(n_images=50, seed=3)
+    assert ground_truth_dict_list != generate_synthetic_dict_lists(n_images=50, seed=4)[0]
+    assert len(ground_truth_dict_list) == len(detections_dict_list) == 50
+    for gt_dict, dt_dict in zip(ground_truth_dict_list, detections_dict_list):
+        assert gt_dict["file_id"] == dt_dict["file_id"]
+        assert len(gt_dict["coordinates"]) == len(gt_dict["class_labels"])
+        assert len(dt_dict["coordinates"]) == len(dt_dict["class_labels"]) == len(dt_dict["conf_scores"])
+        for xmin, ymin, xmax, ymax in gt_dict["coordinates"] + dt_dict["coordinates"]:
+            assert xmin <= xmax and ymin <= ymax
+        assert all(0.0 <= score <= 1.0 for score in dt_dict["conf_scores"])
+
+    # jittered detections of ground truths should give a high but imperfect mAP
+    outputs_dict = compute_ap_map(ground_truth_dict_list, detections_dict_list)
+    assert 0.5 < outputs_dict["map"] < 1.0
+
+
+def test_generate_synthetic_dict_lists_invalid_distribution():
+    with pytest.raises(ValueError):
+        generate_synthetic_dict_lists(score_distribution="normal")
+
+
+def test_write_dict_lists_to_txts(tmp_path):
+    ground_truth_dict_list, detections_dict_list = generate_synthetic_dict_lists(n_images=10, seed=1)
+    gt_txt_dir, dt_txt_dir = str(tmp_path / "ground_truths"), str(tmp_path / "detections")
+    write_dict_lists_to_txts(ground_truth_dict_list, detections_dict_list, gt_txt_dir, dt_txt_dir)
+
+    # files are read in directory listing order
+    assert sorted(generate_gt_dict_list_from_txts(gt_txt_dir), key=lambda d: d["file_id"]) == ground_truth_dict_list
+    assert sorted(generate_dt_dict_list_from_txts(dt_txt_dir), key=lambda d: d["file_id"]) == detections_dict_list
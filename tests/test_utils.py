@@ -1,16 +1,24 @@
 from typing import List
 
+import numpy as np
 import pytest
 
 from obj_det_metrics.utils import (
-    _compute_counts_cumsum,
+    _compute_ioa_matrix,
     _compute_iou,
+    _compute_iou_matrix,
     _generate_dt_objs,
     _generate_empty_dt_dict,
     _generate_empty_gt_dict,
     _generate_gt_objs,
+    _get_best_gt_bbox,
+    _greedy_match,
+    _group_detections,
+    _match_detections,
+    _select_detections,
+    _select_top_k,
 )
-from obj_det_metrics.variables import BoundingBox, ClassName
+from obj_det_metrics.variables import BoundingBox, ClassName, Coordinates
 
 GROUND_TRUTH_DICT_LIST = [
     {
@@ -72,6 +80,20 @@ def test_generate_dt_objs():
         assert conf_scores == sorted(conf_scores, reverse=True), "Bounding boxes in dt_bboxes not sorted by conf_score"
 
 
+def test_group_detections():
+    dt_bboxes_dict = _group_detections(["class1", "class4"], DETECTIONS_DICT_LIST, GT_FILE_IDS)
+    assert list(dt_bboxes_dict) == ["class1", "class4"], "Unexpected class name(s) found in dt_bboxes_dict"
+    conf_scores = [bbox.conf_score for bbox in dt_bboxes_dict["class4"]]
+    assert conf_scores == [0.9157755, 0.5923226, 0.9157755], "Bounding boxes in dt_bboxes not in input order"
+    file_ids = [bbox.file_id for bbox in dt_bboxes_dict["class4"]]
+    assert file_ids == ["test1", "test2", "test2"], "Bounding boxes in dt_bboxes not grouped by image"
+
+
+def test_group_detections_missing_file_id():
+    with pytest.raises(AssertionError):
+        _group_detections(GT_CLASSES, DETECTIONS_DICT_LIST, {"test1"})
+
+
 @pytest.mark.parametrize(
     "dt_coordinates, gt_coordinates, expected_output",
     [
@@ -88,10 +110,59 @@ def test_compute_iou(dt_coordinates, gt_coordinates, expected_output):
     ), f"Expected IoU ~{expected_output} but got {output}"
 
 
-@pytest.mark.parametrize("values, expected_output", [([0, 1, 2, 3], [0, 1, 3, 6]), ([1, 3, 5, 6], [1, 4, 9, 15])])
-def test_compute_counts_cumsum(values, expected_output):
-    _compute_counts_cumsum(values)
-    assert values == expected_output
+def test_compute_iou_matrix():
+    dt_coordinates: List[Coordinates] = [[0, 10, 20, 30], [0, 10, 20, 30], [5.5, 12, 18, 29.5]]
+    gt_coordinates: List[Coordinates] = [[0, 10, 20, 30], [30, 10, 50, 30], [0, 5, 10, 40]]
+    output = _compute_iou_matrix(np.array(dt_coordinates, dtype=float), np.array(gt_coordinates, dtype=float))
+    assert output.shape == (3, 3), f"Expected IoU matrix of shape (3, 3) but got {output.shape}"
+    for i, dt_coords in enumerate(dt_coordinates):
+        for j, gt_coords in enumerate(gt_coordinates):
+            expected_output = _compute_iou(dt_coords, gt_coords)
+            assert output[i, j] == expected_output, f"Expected IoU {expected_output} but got {output[i, j]}"
+
+
+def test_bounding_box():
+    bbox = BoundingBox((0, 10, 20.5, 30), class_name="class1", file_id="image")
+    assert bbox.area == (20.5 - 0 + 1) * (30 - 10 + 1), f"Wrong area {bbox.area}"
+    assert not hasattr(bbox, "__dict__"), "BoundingBox should not have a per-instance dict"
+    bbox.set_matched(True)
+    assert bbox.matched
+
+    coordinates = [0, 0, 9, 9]
+    bbox = BoundingBox(coordinates, class_name="class1", file_id="image")
+    coordinates[2] = 19
+    assert bbox.coordinates == (0, 0, 9, 9) and bbox.area == 100, "Coordinates should be copied"
+    for attribute in ["coordinates", "class_name", "file_id", "matched", "conf_score", "area"]:
+        with pytest.raises(AttributeError):
+            setattr(bbox, attribute, None)
+
+
+def test_get_best_gt_bbox():
+    gt_coordinates: List[Coordinates] = [[0, 10, 20, 30], [30, 10, 50, 30], [0, 5, 10, 40], (2.5, 11, 19, 31.5)]
+    gt_bboxes = [BoundingBox(coords, class_name="class1", file_id="image") for coords in gt_coordinates]
+    gt_bboxes.append(BoundingBox([1, 10, 20, 30], class_name="class2", file_id="image"))
+    dt_bbox = BoundingBox([1, 10, 20, 30], class_name="class1", file_id="image", conf_score=0.9)
+    gt_match, max_iou = _get_best_gt_bbox(dt_bbox, "class1", {"image": gt_bboxes})
+    expected_ious = [_compute_iou(dt_bbox.coordinates, coords) for coords in gt_coordinates]
+    assert gt_match is gt_bboxes[int(np.argmax(expected_ious))], "Wrong best ground truth bounding box"
+    assert max_iou == max(expected_ious), f"Expected IoU {max(expected_ious)} but got {max_iou}"
+
+    gt_match, max_iou = _get_best_gt_bbox(dt_bbox, "class3", {"image": gt_bboxes})
+    assert gt_match is None and max_iou == -1.0
+
+
+@pytest.mark.parametrize(
+    "iou_matrix, iou_thresholds, expected_output",
+    [
+        ([[0.9, 0.1], [0.8, 0.2], [0.1, 0.6]], [0.5], [[True, False, True]]),
+        ([[0.9, 0.1], [0.8, 0.2], [0.1, 0.6]], [0.5, 0.7], [[True, False, True], [True, False, False]]),
+        ([[-1.0, -1.0], [0.5, -1.0]], [0.0], [[False, True]]),
+        (np.zeros((2, 0)), [0.5], [[False, False]]),
+    ],
+)
+def test_greedy_match(iou_matrix, iou_thresholds, expected_output):
+    output = _greedy_match(np.array(iou_matrix, dtype=float), np.array(iou_thresholds))
+    assert output.tolist() == expected_output, f"Expected {expected_output} but got {output.tolist()}"
 
 
 def test_generate_empty_gt_dict():
@@ -117,3 +188,72 @@ def test_generate_empty_dt_dict():
     assert (
         len(dt_dict["conf_scores"]) == 0
     ), f"Expected number of confidence scores to be 0, but got {len(dt_dict['conf_scores'])} instead"
+
+
+@pytest.mark.parametrize(
+    "scores, k, expected_output",
+    [
+        ([0.5, 0.9, 0.1], 5, [True, True, True]),
+        ([0.5, 0.9, 0.1], 0, [False, False, False]),
+        ([0.5, 0.9, 0.1, 0.7], 2, [False, True, False, True]),
+        ([0.5, 0.9, 0.5, 0.5, 0.2], 3, [True, True, True, False, False]),
+    ],
+)
+def test_select_top_k(scores, k, expected_output):
+    assert _select_top_k(np.array(scores), k).tolist() == expected_output
+
+
+@pytest.mark.parametrize(
+    "max_detections_per_image, min_score, candidates, expected_output",
+    [
+        (None, None, None, None),
+        (4, None, None, None),
+        (2, None, None, [True, False, True, True, True, False, False]),
+        (None, 0.75, None, [True, False, True, True, False, True, False]),
+        (2, 0.5, [True, True, False, True, True, True, True], [True, False, False, True, False, True, False]),
+    ],
+)
+def test_select_detections(max_detections_per_image, min_score, candidates, expected_output):
+    scores = np.array([0.9, 0.2, 0.8, 0.8, 0.3, 0.8, 0.7])
+    image_codes = np.array([0, 0, 1, 1, 0, 1, 1])
+    if candidates is not None:
+        candidates = np.array(candidates)
+    keep = _select_detections(scores, image_codes, max_detections_per_image, min_score, candidates)
+    assert (keep if keep is None else keep.tolist()) == expected_output
+
+
+def test_generate_dt_objs_pruned():
+    gt_classes: List[ClassName] = ["class1", "class2", "class3", "class4"]
+    gt_file_ids = set(["test1", "test2"])
+    dt_bboxes_dict = _generate_dt_objs(gt_classes, DETECTIONS_DICT_LIST, gt_file_ids, max_detections_per_image=2)
+    kept = sorted((bbox.file_id, bbox.conf_score) for dt_bboxes in dt_bboxes_dict.values() for bbox in dt_bboxes)
+    assert kept == [("test1", 0.98965424), ("test1", 0.99056727), ("test2", 0.9157755), ("test2", 0.9823532)]
+
+
+def test_compute_ioa_matrix():
+    dt_coordinates = np.array([[25, 5, 34, 14], [0, 0, 9, 9], [15, 0, 24, 9]], dtype=np.float64)
+    gt_coordinates = np.array([[20, 0, 59, 39]], dtype=np.float64)
+    output = _compute_ioa_matrix(dt_coordinates, gt_coordinates)
+    np.testing.assert_array_equal(output, [[1.0], [0.0], [0.5]])
+
+
+def test_match_detections_ignored():
+    dt_coordinates = np.array([[25, 5, 34, 14], [0, 0, 9, 9], [15, 0, 24, 9]], dtype=np.float64)
+    gt_coordinates = np.array([[0, 0, 9, 9], [20, 0, 59, 39]], dtype=np.float64)
+    iou_thresholds = np.array([0.5, 0.75])
+    dt_ignored = np.zeros((2, 3), dtype=bool)
+    tp = _match_detections(
+        dt_coordinates,
+        np.array([0.9, 0.8, 0.7]),
+        np.zeros(3, dtype=np.int32),
+        np.zeros(3, dtype=np.int32),
+        gt_coordinates,
+        np.zeros(2, dtype=np.int32),
+        np.zeros(2, dtype=np.int32),
+        iou_thresholds,
+        gt_ignore=np.array([False, True]),
+        dt_ignored=dt_ignored,
+    )
+    assert tp.tolist() == [[False, True, False], [False, True, False]]
+    # half of the last detection lies within the crowd region
+    assert dt_ignored.tolist() == [[True, False, True], [True, False, False]]